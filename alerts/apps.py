@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AlertsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'alerts'
+
+    def ready(self):
+        from .signals import connect_alert_signals  # pylint: disable=import-outside-toplevel
+
+        connect_alert_signals()
@@ -0,0 +1,20 @@
+"""
+Alert settings, read from ``settings.ALERTS`` with defaults for missing keys.
+"""
+from django.conf import settings
+
+DEFAULTS = {
+    "RULES": [],
+    "SINKS": [],
+    "WORKERS": 4,
+    "BATCH_SIZE": 100,
+    "POLL_INTERVAL": 1.0,
+    "BACKOFF_BASE": 2.0,
+    "BACKOFF_MAX": 300.0,
+    "LEASE_SECONDS": 60.0,
+}
+
+
+def alert_settings():
+    """Return ``settings.ALERTS`` merged over ``DEFAULTS``."""
+    return {**DEFAULTS, **getattr(settings, "ALERTS", {})}
@@ -0,0 +1,235 @@
+"""
+Background delivery of alerts to the configured sinks.
+
+``AlertDispatcher`` claims batches of due alerts and hands them to a pool of
+worker threads. A claim stamps the rows with the worker's ID and a lease
+expiry in one UPDATE, so dispatchers in several processes never deliver the
+same batch concurrently, and the batch of a crashed worker is claimed again
+once its lease runs out. A batch that every sink accepted is marked
+delivered with one UPDATE; a failed batch is rescheduled with exponential
+backoff and jitter. Both only touch the rows still claimed by the worker, so
+a worker whose lease ran out mid-send leaves the new claim alone. Rows are
+only marked delivered after the sinks accepted them, so delivery is at
+least once.
+
+The dispatcher runs in its own process (``manage.py deliver_alerts``), so
+sink latency never reaches the ingest request path.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import F, Q, Subquery
+from django.utils import timezone
+from rest_framework import serializers
+
+from .conf import alert_settings
+from .models import Alert
+from .sinks import load_sinks
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id():
+    """Return an ID unique to this process: ``host:pid``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claimable_alerts(now):
+    """Return undelivered alerts that are due and not leased at ``now``."""
+    return (
+        Alert.objects
+        .filter(delivered=False)
+        .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+        .filter(Q(lease_until__isnull=True) | Q(lease_until__lte=now))
+    )
+
+
+def claim_alerts(worker_id, limit, lease_seconds):
+    """
+    Lease up to ``limit`` due alerts to ``worker_id`` and return their IDs.
+
+    The claim is a single UPDATE whose WHERE clause repeats the claimable
+    conditions, so rows claimed concurrently by another worker are skipped.
+    Both statements read through the partial ``alert_pending_idx`` index.
+    """
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=lease_seconds)
+    batch = claimable_alerts(now).order_by("id").values("pk")[:limit]
+    claimed = claimable_alerts(now).filter(pk__in=Subquery(batch)).update(
+        claimed_by=worker_id, lease_until=lease_until
+    )
+    if not claimed:
+        return []
+    return list(
+        Alert.objects
+        .filter(delivered=False, claimed_by=worker_id, lease_until=lease_until)
+        .order_by("id")
+        .values_list("pk", flat=True)
+    )
+
+
+def alert_payloads(ids):
+    """Return the JSON-ready payloads of the alerts in ``ids``."""
+    datetime_field = serializers.DateTimeField()
+    rows = (
+        Alert.objects
+        .filter(pk__in=ids)
+        .order_by("id")
+        .values(
+            "id", "message", "created_at", "detection_id",
+            "detection__object_class", "detection__confidence",
+            "detection__motion_event_id", "detection__camera_id",
+        )
+    )
+    return [
+        {
+            "id": row["id"],
+            "message": row["message"],
+            "created_at": datetime_field.to_representation(row["created_at"]),
+            "detection": row["detection_id"],
+            "object_class": row["detection__object_class"],
+            "confidence": row["detection__confidence"],
+            "motion_event": row["detection__motion_event_id"],
+            "camera": row["detection__camera_id"],
+        }
+        for row in rows
+    ]
+
+
+def backoff_delay(attempts, base, maximum):
+    """Return the retry delay after ``attempts`` failures, with up to 50% jitter."""
+    delay = min(maximum, base * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def schedule_retry(ids, worker_id, base, maximum):
+    """
+    Count a failed attempt for the alerts in ``ids`` still claimed by
+    ``worker_id`` and schedule each one's next attempt.
+    """
+    owned = Alert.objects.filter(pk__in=ids, claimed_by=worker_id)
+    by_attempts = defaultdict(list)
+    for pk, attempts in owned.values_list("pk", "attempts"):
+        by_attempts[attempts + 1].append(pk)
+    now = timezone.now()
+    for attempts, pks in by_attempts.items():
+        delay = backoff_delay(attempts, base, maximum)
+        Alert.objects.filter(pk__in=pks, claimed_by=worker_id).update(
+            attempts=F("attempts") + 1,
+            next_attempt_at=now + timedelta(seconds=delay),
+            lease_until=None,
+        )
+
+
+def deliver_batch(ids, sinks, worker_id, backoff_base=2.0, backoff_max=300.0):
+    """
+    Send the alerts in ``ids``, claimed by ``worker_id``, to every sink.
+
+    Returns ``True`` and marks them delivered when every sink accepted the
+    batch; otherwise schedules a retry and returns ``False``. Alerts claimed
+    by another worker since are left to it.
+    """
+    payloads = alert_payloads(ids)
+    try:
+        for sink in sinks:
+            sink.send(payloads)
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("Delivering %d alerts failed; retrying later.", len(ids))
+        schedule_retry(ids, worker_id, backoff_base, backoff_max)
+        return False
+    Alert.objects.filter(pk__in=ids, claimed_by=worker_id).update(
+        delivered=True, lease_until=None
+    )
+    return True
+
+
+class AlertDispatcher:
+    """
+    Deliver due alerts in batches through a pool of ``workers`` threads.
+
+    With ``workers=0`` batches are delivered in the calling thread. Options
+    default to ``settings.ALERTS``; ``worker_id`` defaults to ``host:pid``.
+    """
+
+    def __init__(self, sinks=None, workers=None, batch_size=None, poll_interval=None,
+                 backoff_base=None, backoff_max=None, lease_seconds=None, worker_id=None):
+        config = alert_settings()
+        self.worker_id = worker_id or default_worker_id()
+        self.sinks = load_sinks() if sinks is None else sinks
+        self.workers = config["WORKERS"] if workers is None else workers
+        self.batch_size = batch_size or config["BATCH_SIZE"]
+        self.poll_interval = config["POLL_INTERVAL"] if poll_interval is None else poll_interval
+        self.backoff_base = config["BACKOFF_BASE"] if backoff_base is None else backoff_base
+        self.backoff_max = config["BACKOFF_MAX"] if backoff_max is None else backoff_max
+        self.lease_seconds = lease_seconds or config["LEASE_SECONDS"]
+        self.stopped = threading.Event()
+
+    def _claim(self):
+        return claim_alerts(self.worker_id, self.batch_size, self.lease_seconds)
+
+    def _deliver(self, ids):
+        return deliver_batch(
+            ids, self.sinks, self.worker_id, self.backoff_base, self.backoff_max
+        )
+
+    def _deliver_in_worker(self, ids):
+        # Worker threads hold their own connections; drop them when stale.
+        close_old_connections()
+        try:
+            return self._deliver(ids)
+        finally:
+            close_old_connections()
+
+    def run_once(self):
+        """Deliver every alert that is due now; return ``(delivered, failed)`` counts."""
+        delivered = failed = 0
+        if not self.workers:
+            while True:
+                ids = self._claim()
+                if not ids:
+                    return delivered, failed
+                if self._deliver(ids):
+                    delivered += len(ids)
+                else:
+                    failed += len(ids)
+
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="alert-delivery") as pool:
+            in_flight = {}
+            while True:
+                while len(in_flight) < self.workers * 2:
+                    ids = self._claim()
+                    if not ids:
+                        break
+                    in_flight[pool.submit(self._deliver_in_worker, ids)] = len(ids)
+                if not in_flight:
+                    return delivered, failed
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    count = in_flight.pop(future)
+                    try:
+                        ok = future.result()
+                    except Exception:  # pylint: disable=broad-exception-caught
+                        # The rows stay undelivered and are picked up again.
+                        logger.exception("Alert delivery worker failed.")
+                        ok = False
+                    if ok:
+                        delivered += count
+                    else:
+                        failed += count
+
+    def run_forever(self):
+        """Deliver due alerts until ``stopped`` is set, polling when idle."""
+        while not self.stopped.is_set():
+            close_old_connections()
+            delivered, failed = self.run_once()
+            if delivered or failed:
+                logger.info("Delivered %d alerts, %d failed.", delivered, failed)
+            else:
+                self.stopped.wait(self.poll_interval)
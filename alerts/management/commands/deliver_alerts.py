@@ -0,0 +1,40 @@
+"""Deliver pending alerts to the configured sinks."""
+import logging
+
+from django.core.management.base import BaseCommand
+
+from alerts.delivery import AlertDispatcher
+
+
+class Command(BaseCommand):
+    help = "Deliver undelivered alerts through a worker pool, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Deliver the alerts that are due now and exit instead of polling.",
+        )
+        parser.add_argument(
+            "--workers", type=int,
+            help="Number of delivery threads (default ALERTS['WORKERS']).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int,
+            help="Alerts sent to the sinks per batch (default ALERTS['BATCH_SIZE']).",
+        )
+
+    def handle(self, *args, **options):
+        if options["verbosity"] > 1:
+            logging.basicConfig(level=logging.INFO)
+        dispatcher = AlertDispatcher(
+            workers=options["workers"], batch_size=options["batch_size"]
+        )
+        if options["once"]:
+            delivered, failed = dispatcher.run_once()
+            self.stdout.write(f"Delivered {delivered} alerts, {failed} failed.")
+            return
+        self.stdout.write("Delivering alerts; press CTRL-C to stop.")
+        try:
+            dispatcher.run_forever()
+        except KeyboardInterrupt:
+            dispatcher.stopped.set()
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0002_seed_example_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='alert',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0003_delivery_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='claimed_by',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='alert',
+            name='lease_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('delivered', False)), fields=['id'], name='alert_pending_idx'),
+        ),
+    ]
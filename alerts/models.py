@@ -11,4 +11,19 @@ class Alert(models.Model):
     )
     message = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
-    delivered = models.BooleanField(default=False)
\ No newline at end of file
+    delivered = models.BooleanField(default=False)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    claimed_by = models.CharField(max_length=100, blank=True, default="")
+    lease_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Queue index: only undelivered rows, so dequeue cost does not
+            # grow with the delivered history.
+            models.Index(
+                fields=["id"],
+                condition=models.Q(delivered=False),
+                name="alert_pending_idx",
+            ),
+        ]
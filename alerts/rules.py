@@ -0,0 +1,80 @@
+"""
+Alert rules: which new detections raise an alert.
+
+Rules are read from ``settings.ALERTS["RULES"]`` (see ``eyesedge/settings.py``)
+and evaluated in Python against each batch of new detections, so raising
+alerts costs the ingest path one INSERT and, when a rule is restricted to
+cameras, one query to map motion events to cameras.
+"""
+from motions.models import MotionEvent
+
+from .conf import alert_settings
+from .models import Alert
+
+DEFAULT_MESSAGE = "Detected {object_class} with confidence {confidence:.2f}"
+
+
+class AlertRule:
+    """A single alert rule; unset conditions match every detection."""
+
+    def __init__(self, name, object_classes=None, min_confidence=None, cameras=None,
+                 message=DEFAULT_MESSAGE):
+        self.name = name
+        self.object_classes = set(object_classes) if object_classes else None
+        self.min_confidence = min_confidence
+        self.cameras = set(cameras) if cameras else None
+        self.message = message
+
+    def matches(self, detection, camera_id):
+        """Return whether ``detection``, seen by ``camera_id``, raises this alert."""
+        if self.object_classes is not None and detection.object_class not in self.object_classes:
+            return False
+        if self.min_confidence is not None and detection.confidence < self.min_confidence:
+            return False
+        if self.cameras is not None and camera_id not in self.cameras:
+            return False
+        return True
+
+    def format_message(self, detection, camera_id):
+        """Return the alert message for ``detection``, at most 255 characters."""
+        return self.message.format(
+            object_class=detection.object_class,
+            confidence=detection.confidence,
+            camera=camera_id,
+            rule=self.name,
+        )[:255]
+
+
+def load_rules():
+    """Return the configured rules in evaluation order."""
+    return [AlertRule(**rule) for rule in alert_settings()["RULES"]]
+
+
+def create_alerts(detections):
+    """
+    Create one alert per detection matching a rule, with one ``bulk_create``.
+
+    The first matching rule wins. Returns the created alerts.
+    """
+    rules = load_rules()
+    if not rules or not detections:
+        return []
+
+    cameras = {}
+    if any(rule.cameras is not None for rule in rules):
+        event_ids = {detection.motion_event_id for detection in detections}
+        cameras = dict(
+            MotionEvent.objects.filter(pk__in=event_ids).values_list("pk", "camera_id")
+        )
+
+    alerts = []
+    for detection in detections:
+        camera_id = cameras.get(detection.motion_event_id)
+        for rule in rules:
+            if rule.matches(detection, camera_id):
+                alerts.append(Alert(
+                    detection=detection,
+                    message=rule.format_message(detection, camera_id),
+                ))
+                break
+    return Alert.objects.bulk_create(alerts)
@@ -0,0 +1,26 @@
+"""
+Raise alerts for new detections as they are written.
+"""
+from django.db.models.signals import post_save
+
+from detections.models import Detection
+from detections.signals import detections_created
+
+from .rules import create_alerts
+
+
+def _alert_on_save(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        create_alerts([instance])
+
+
+def _alert_on_bulk_create(sender, detections, **kwargs):
+    create_alerts(detections)
+
+
+def connect_alert_signals():
+    """Create alerts for detections saved one by one or written in bulk."""
+    post_save.connect(_alert_on_save, sender=Detection, dispatch_uid="alerts:detection")
+    detections_created.connect(
+        _alert_on_bulk_create, sender=Detection, dispatch_uid="alerts:detections"
+    )
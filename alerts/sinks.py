@@ -0,0 +1,58 @@
+"""
+Alert sinks: where delivered alerts are sent.
+
+A sink receives a batch of alert payloads and raises on failure, in which
+case the whole batch is retried later. Delivery is at least once, so a sink
+may see an alert more than once and should deduplicate on ``id`` if needed.
+``FileSink`` and ``HTTPSink`` stand in for real notifiers.
+"""
+import json
+import threading
+import urllib.request
+
+from django.utils.module_loading import import_string
+
+from .conf import alert_settings
+
+
+class FileSink:
+    """Append each alert as one JSON line to the file at ``path``."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, alerts):
+        """Write ``alerts`` and flush them to disk."""
+        lines = "".join(json.dumps(alert) + "\n" for alert in alerts)
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+            handle.flush()
+
+
+class HTTPSink:
+    """POST each batch of alerts as a JSON array to ``url``."""
+
+    def __init__(self, url, timeout=5.0, headers=None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def send(self, alerts):
+        """Send ``alerts``; any non-2xx response raises."""
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(alerts).encode("utf-8"),
+            headers=self.headers,
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if not 200 <= response.status < 300:
+                raise OSError(f"{self.url} answered {response.status}")
+
+
+def load_sinks(config=None):
+    """Instantiate the sinks in ``config``, by default ``settings.ALERTS["SINKS"]``."""
+    if config is None:
+        config = alert_settings()["SINKS"]
+    return [import_string(sink["BACKEND"])(**sink.get("OPTIONS", {})) for sink in config]
@@ -1,3 +1,201 @@
-from django.test import TestCase
+"""
+Tests for alert rules and delivery.
+"""
+
+import json
+import os
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from cameras.models import Camera
+from detections.models import Detection
+from motions.models import MotionEvent
+from .delivery import AlertDispatcher, claim_alerts, claimable_alerts, deliver_batch
+from .models import Alert
+from .sinks import FileSink
+
+class FailingSink:
+    def send(self, alerts):
+        raise OSError("sink unavailable")
+
+
+def _camera(suffix):
+    return Camera.objects.create(
+        address=f"http://192.168.1.{suffix}:8080/video",
+        resolution="1920x1080",
+    )
+
+
+class AlertRuleAPITest(APITestCase):
+    """
+    Test cases for creating alerts from new detections.
+    """
+
+    def setUp(self):
+        self.camera = _camera(240)
+        self.yard = _camera(241)
+        self.motion_event = MotionEvent.objects.create(camera=self.camera, duration=1.0)
+        self.yard_event = MotionEvent.objects.create(camera=self.yard, duration=1.0)
+        rules = [
+            {"name": "person", "object_classes": ["person"], "min_confidence": 0.8},
+            {"name": "yard", "cameras": [self.yard.id], "message": "{object_class} in the yard"},
+        ]
+        self.enterContext(override_settings(ALERTS={"RULES": rules, "SINKS": []}))
+        self.user = get_user_model().objects.create_user(
+            username="alert_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _post(self, items):
+        response = self.client.post(reverse("detection-bulk"), items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return [result["id"] for result in response.data["results"]]
+
+    def test_bulk_detections_raise_alerts_for_matching_rules(self):
+        ids = self._post([
+            {"motion_event": self.motion_event.id, "object_class": "person", "confidence": 0.9},
+            {"motion_event": self.motion_event.id, "object_class": "person", "confidence": 0.5},
+            {"motion_event": self.motion_event.id, "object_class": "car", "confidence": 0.9},
+            {"motion_event": self.yard_event.id, "object_class": "car", "confidence": 0.3},
+        ])
+        alerts = dict(Alert.objects.filter(detection__in=ids).values_list("detection", "message"))
+        self.assertEqual(
+            alerts,
+            {ids[0]: "Detected person with confidence 0.90", ids[3]: "car in the yard"},
+        )
+        self.assertFalse(Alert.objects.filter(detection__in=ids, delivered=True).exists())
+
+    def test_first_matching_rule_wins(self):
+        ids = self._post([
+            {"motion_event": self.yard_event.id, "object_class": "person", "confidence": 0.95},
+        ])
+        self.assertEqual(
+            list(Alert.objects.filter(detection__in=ids).values_list("message", flat=True)),
+            ["Detected person with confidence 0.95"],
+        )
+
+    def test_single_detection_raises_alert(self):
+        detection = Detection.objects.create(
+            motion_event=self.motion_event, object_class="person", confidence=0.85
+        )
+        self.assertEqual(Alert.objects.filter(detection=detection).count(), 1)
+
+
+class AlertDeliveryTest(TestCase):
+    """
+    Test cases for batched delivery, retries and backoff.
+    """
+
+    def setUp(self):
+        Alert.objects.update(delivered=True)
+        motion_event = MotionEvent.objects.create(camera=_camera(242), duration=1.0)
+        detection = Detection.objects.create(
+            motion_event=motion_event, object_class="dog", confidence=0.7
+        )
+        self.alerts = Alert.objects.bulk_create(
+            [Alert(detection=detection, message=f"alert {i}") for i in range(5)]
+        )
+        handle, self.path = tempfile.mkstemp(suffix=".ndjson")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_delivered_batches_are_marked_in_one_update(self):
+        dispatcher = AlertDispatcher(sinks=[FileSink(self.path)], workers=0, batch_size=10)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(dispatcher.run_once(), (5, 0))
+        marks = [q for q in ctx.captured_queries if 'SET "delivered"' in q["sql"]]
+        self.assertEqual(len(marks), 1)
+        self.assertFalse(Alert.objects.filter(delivered=False).exists())
+
+        with open(self.path, encoding="utf-8") as handle:
+            lines = [json.loads(line) for line in handle]
+        self.assertEqual([line["id"] for line in lines], [alert.id for alert in self.alerts])
+        self.assertEqual(lines[0]["object_class"], "dog")
+
+    def test_failed_batches_are_retried_with_backoff(self):
+        dispatcher = AlertDispatcher(
+            sinks=[FailingSink()], workers=0, batch_size=2, backoff_base=60, backoff_max=600
+        )
+        with self.assertLogs("alerts.delivery", level="ERROR"):
+            self.assertEqual(dispatcher.run_once(), (0, 5))
+        alert = Alert.objects.get(pk=self.alerts[0].pk)
+        self.assertFalse(alert.delivered)
+        self.assertEqual(alert.attempts, 1)
+        self.assertGreater(alert.next_attempt_at, timezone.now() + timedelta(seconds=25))
+
+        # Not due yet, so nothing is attempted.
+        self.assertEqual(dispatcher.run_once(), (0, 0))
+
+        Alert.objects.filter(delivered=False).update(next_attempt_at=timezone.now())
+        dispatcher.sinks = [FileSink(self.path)]
+        self.assertEqual(dispatcher.run_once(), (5, 0))
+        self.assertEqual(Alert.objects.get(pk=self.alerts[0].pk).attempts, 1)
+
+
+class AlertQueueTest(TestCase):
+    """
+    Test cases for claiming undelivered alerts.
+    """
+
+    def setUp(self):
+        Alert.objects.update(delivered=True)
+        motion_event = MotionEvent.objects.create(camera=_camera(243), duration=1.0)
+        detection = Detection.objects.create(
+            motion_event=motion_event, object_class="dog", confidence=0.7
+        )
+        self.alerts = Alert.objects.bulk_create(
+            [Alert(detection=detection, message=f"alert {i}") for i in range(5)]
+        )
+
+    def test_claims_by_different_workers_are_disjoint(self):
+        first = claim_alerts("worker-1", 3, 60)
+        second = claim_alerts("worker-2", 3, 60)
+        self.assertEqual(first, [alert.id for alert in self.alerts[:3]])
+        self.assertEqual(second, [alert.id for alert in self.alerts[3:]])
+        self.assertEqual(claim_alerts("worker-3", 3, 60), [])
+        self.assertEqual(
+            set(Alert.objects.filter(pk__in=first).values_list("claimed_by", flat=True)),
+            {"worker-1"},
+        )
+
+    def test_expired_leases_are_claimed_again(self):
+        claimed = claim_alerts("worker-1", 5, 60)
+        Alert.objects.filter(pk__in=claimed[:2]).update(
+            lease_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(claim_alerts("worker-2", 5, 60), claimed[:2])
+
+    def test_workers_past_their_lease_leave_new_claims_alone(self):
+        claimed = claim_alerts("worker-1", 5, 60)
+        Alert.objects.filter(pk__in=claimed).update(
+            lease_until=timezone.now() - timedelta(seconds=1)
+        )
+        reclaimed = claim_alerts("worker-2", 5, 60)
+        lease_until = Alert.objects.get(pk=claimed[0]).lease_until
+
+        with self.assertLogs("alerts.delivery", level="ERROR"):
+            self.assertFalse(deliver_batch(claimed, [FailingSink()], "worker-1"))
+        self.assertTrue(deliver_batch(claimed, [], "worker-1"))
+        self.assertEqual(
+            set(Alert.objects.filter(pk__in=reclaimed).values_list(
+                "claimed_by", "lease_until", "attempts", "delivered"
+            )),
+            {("worker-2", lease_until, 0, False)},
+        )
+
+    def test_dequeue_reads_the_partial_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("plan choice is checked against SQLite")
+        plan = claimable_alerts(timezone.now()).order_by("id")[:10].explain()
+        self.assertIn("alert_pending_idx", plan)
 
-# Create your tests here.
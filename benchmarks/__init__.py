@@ -0,0 +1,15 @@
+"""
+Performance benchmarks for the EyesEdge API.
+
+Run a benchmark as a module from the project root, for example
+``python -m benchmarks.schema_validation``.
+"""
+import os
+
+import django
+
+
+def setup_django():
+    """Configure Django so benchmarks can import models and serializers."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "eyesedge.settings")
+    django.setup()
@@ -0,0 +1,375 @@
+"""
+Benchmark suite for the REST API endpoints, with JSON baselines.
+
+``run`` seeds a throwaway database with ``--cameras`` cameras, ``--events``
+motion events per camera and ``--images`` images per event (each image with
+a detection, every tenth detection with an alert), then requests every API
+route in ``eyesedge/urls.py``. It records latency percentiles with the
+response cache cleared before each request (``cold``) and primed (``warm``),
+the queries per cold request and its peak Python allocations. ``compare``
+reads two result files and exits non-zero when an endpoint regressed::
+
+    python -m benchmarks.api run --output benchmarks/baselines/api.json
+    python -m benchmarks.api run --output /tmp/current.json
+    python -m benchmarks.api compare benchmarks/baselines/api.json /tmp/current.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+
+from . import setup_django
+
+# Query strings for routes whose defaults do not cover the seeded data.
+QUERY_STRINGS = {
+    "camera-motion-activity": "bucket=day",
+}
+
+# Routes that only accept POST, with the size of the batch sent.
+BULK_ROUTES = {"motion-bulk": 100, "detection-bulk": 100}
+
+# Live feed routes: the stream never ends and the long poll waits for new
+# rows, so they have no latency to measure.
+SKIPPED_ROUTES = {"feed-stream", "feed-poll"}
+
+# Model whose primary key fills ``<pk>`` in each route name prefix, after
+# the ``async-`` prefix of the async routes.
+PK_MODELS = {
+    "camera": "cameras.Camera",
+    "motion": "motions.MotionEvent",
+    "image": "images.Image",
+    "detection": "detections.Detection",
+}
+
+
+def seed(cameras, events, images):
+    """Bulk-insert the benchmark dataset and return one ID per model label."""
+    # pylint: disable=import-outside-toplevel
+    from django.apps import apps
+    from django.utils import timezone
+
+    from alerts.models import Alert
+    from cameras.models import Camera
+    from detections.models import Detection
+    from images.models import Image
+    from motions.models import MotionEvent
+
+    resolutions = ["1280x720", "1920x1080", "3840x2160"]
+    object_classes = ["person", "car", "bicycle", "dog", "cat", "truck"]
+    now = timezone.now()
+    span = timedelta(days=30)
+
+    created_cameras = Camera.objects.bulk_create(
+        Camera(
+            address=f"http://bench.example.com/cameras/{index + 1}",
+            resolution=resolutions[index % len(resolutions)],
+            fps=25 + (index % 3) * 5,
+            status="active" if index % 2 == 0 else "inactive",
+        )
+        for index in range(cameras)
+    )
+    for camera in created_cameras:
+        camera_events = MotionEvent.objects.bulk_create(
+            MotionEvent(camera=camera, duration=1.0 + index % 10, threshold=0.2 + index % 5 / 10)
+            for index in range(events)
+        )
+        # auto_now_add ignores given values, so spread the history afterwards.
+        for index, event in enumerate(camera_events):
+            event.timestamp = now - span * (index + 1) / (events + 1)
+        MotionEvent.objects.bulk_update(camera_events, ["timestamp"], batch_size=1000)
+
+        camera_images = Image.objects.bulk_create(
+            Image(
+                motion_event=event,
+                camera=camera,
+                filepath=f"http://bench.example.com/media/{event.pk}-{frame}.jpg",
+                filesize=150000 + frame * 2500,
+            )
+            for event in camera_events
+            for frame in range(images)
+        )
+        detections = Detection.objects.bulk_create(
+            Detection(
+                motion_event_id=image.motion_event_id,
+                image=image,
+                camera=camera,
+                object_class=object_classes[index % len(object_classes)],
+                confidence=0.5 + index % 50 / 100,
+            )
+            for index, image in enumerate(camera_images)
+        )
+        Alert.objects.bulk_create(
+            Alert(detection=detection, message=f"{detection.object_class} seen", delivered=True)
+            for detection in detections[::10]
+        )
+
+    return {
+        label: apps.get_model(model).objects.order_by("pk").values_list("pk", flat=True).last()
+        for label, model in PK_MODELS.items()
+    }
+
+
+def iter_routes(patterns=None, prefix=""):
+    """Yield ``(name, route, converters)`` for every API route but ``SKIPPED_ROUTES``."""
+    # pylint: disable=import-outside-toplevel
+    from django.urls import URLPattern, URLResolver, get_resolver
+
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            if route.startswith("api/"):
+                yield from iter_routes(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern) and route.startswith("api/") and pattern.name:
+            if pattern.name in SKIPPED_ROUTES:
+                continue
+            yield pattern.name, route, list(pattern.pattern.converters)
+
+
+def bulk_payload(name, size, ids):
+    """Return a batch of ``size`` items for the bulk route ``name``."""
+    if name == "motion-bulk":
+        return [{"camera": ids["camera"], "duration": 1.5, "threshold": 0.3}] * size
+    return [{"image": ids["image"], "object_class": "person", "confidence": 0.9}] * size
+
+
+def percentiles(samples):
+    """Return latency percentiles of ``samples`` (seconds) in milliseconds."""
+    ordered = sorted(samples)
+
+    def at(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {
+        "p50_ms": round(at(0.50), 3),
+        "p95_ms": round(at(0.95), 3),
+        "p99_ms": round(at(0.99), 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def measure(send, requests, clear_cache):
+    """Time ``requests`` calls of ``send``, clearing the cache first when asked."""
+    # pylint: disable=import-outside-toplevel
+    from django.core.cache import cache
+
+    samples = []
+    for _ in range(requests):
+        if clear_cache:
+            cache.clear()
+        started = time.perf_counter()
+        send()
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def benchmark_route(client, name, route, converters, ids, requests):
+    """Return the measurements of one route."""
+    # pylint: disable=import-outside-toplevel
+    from django.core.cache import cache
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    label = name.removeprefix("async-").split("-")[0]
+    kwargs = {converter: ids[label] for converter in converters}
+    url = reverse(name, kwargs=kwargs)
+    if name in QUERY_STRINGS:
+        url += "?" + QUERY_STRINGS[name]
+
+    if name in BULK_ROUTES:
+        payload = json.dumps(bulk_payload(name, BULK_ROUTES[name], ids))
+
+        def send():
+            # Roll the batch back so every request sees the same dataset.
+            with transaction.atomic():
+                response = client.post(url, payload, content_type="application/json")
+                transaction.set_rollback(True)
+            return response
+    else:
+        def send():
+            response = client.get(url)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            return response
+
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        status = send().status_code
+    # The log is reset by the next request, so count the queries now.
+    query_count = len(queries)
+    cache.clear()
+    tracemalloc.start()
+    send()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "method": "POST" if name in BULK_ROUTES else "GET",
+        "url": url,
+        "status": status,
+        "queries": query_count,
+        "alloc_peak_kib": round(peak / 1024, 1),
+        "cold": measure(send, requests, clear_cache=True),
+    }
+    if name not in BULK_ROUTES:
+        send()
+        result["warm"] = measure(send, requests, clear_cache=False)
+    return result
+
+
+def run(args):
+    """Seed a throwaway database, benchmark every route and write the results."""
+    setup_django()
+    # pylint: disable=import-outside-toplevel
+    import django
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    # DEBUG logs every query, which costs time and saturates the query log.
+    settings.DEBUG = False
+    settings.ALERTS = {**settings.ALERTS, "RULES": []}
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            # A file database, like production, rather than the in-memory default.
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "bench.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            ids = seed(args.cameras, args.events, args.images)
+            user = get_user_model().objects.create_user(username="bench", password="bench-pass-123")
+            client = Client()
+            client.force_login(user)
+
+            endpoints = {}
+            for name, route, converters in iter_routes():
+                if args.only and name not in args.only:
+                    continue
+                endpoints[name] = benchmark_route(
+                    client, name, route, converters, ids, args.requests
+                )
+                cold = endpoints[name]["cold"]
+                print(
+                    f"{name:<24}{cold['p50_ms']:>9.2f} ms p50{cold['p95_ms']:>9.2f} ms p95"
+                    f"{endpoints[name]['queries']:>5} queries"
+                    f"{endpoints[name]['alloc_peak_kib']:>9.1f} KiB",
+                    file=sys.stderr,
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    results = {
+        "meta": {
+            "dataset": {
+                "cameras": args.cameras, "events": args.events, "images": args.images,
+            },
+            "requests": args.requests,
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+        },
+        "endpoints": endpoints,
+    }
+    output = json.dumps(results, indent=2, sort_keys=True) + "\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(output)
+    else:
+        sys.stdout.write(output)
+
+
+def find_regressions(baseline, current, tolerance, min_delta_ms):
+    """
+    Return a description of every regression of ``current`` against ``baseline``.
+
+    Median latency and allocations regress when they grow by more than
+    ``tolerance`` (a fraction); the noisier p95 latency is allowed twice that.
+    Latency changes below ``min_delta_ms`` are ignored. Any extra query or
+    changed status code is a regression.
+    """
+    regressions = []
+    for name, base in sorted(baseline["endpoints"].items()):
+        now = current["endpoints"].get(name)
+        if now is None:
+            regressions.append(f"{name}: missing from the current results")
+            continue
+        if now["status"] != base["status"]:
+            regressions.append(f"{name}: status {base['status']} -> {now['status']}")
+        if now["queries"] > base["queries"]:
+            regressions.append(f"{name}: queries {base['queries']} -> {now['queries']}")
+        if now["alloc_peak_kib"] > base["alloc_peak_kib"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: allocations {base['alloc_peak_kib']} -> {now['alloc_peak_kib']} KiB"
+            )
+        for mode in ("cold", "warm"):
+            if mode not in base or mode not in now:
+                continue
+            for metric, allowed in (("p50_ms", tolerance), ("p95_ms", tolerance * 2)):
+                before, after = base[mode][metric], now[mode][metric]
+                if after > before * (1 + allowed) and after - before >= min_delta_ms:
+                    regressions.append(f"{name}: {mode} {metric} {before} -> {after}")
+    return regressions
+
+
+def compare(args):
+    """Print regressions of the current results and exit 1 when there are any."""
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    with open(args.current, encoding="utf-8") as handle:
+        current = json.load(handle)
+    if baseline["meta"]["dataset"] != current["meta"]["dataset"]:
+        print("warning: the results were measured on different datasets", file=sys.stderr)
+
+    regressions = find_regressions(baseline, current, args.tolerance, args.min_delta_ms)
+    for line in regressions:
+        print(line)
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions in {len(baseline['endpoints'])} endpoints.")
+
+
+def main():
+    """Dispatch to the ``run`` and ``compare`` subcommands."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subcommands.add_parser("run", help="benchmark every endpoint")
+    run_parser.add_argument("--cameras", type=int, default=10, help="cameras to seed")
+    run_parser.add_argument("--events", type=int, default=500, help="motion events per camera")
+    run_parser.add_argument("--images", type=int, default=2, help="images per motion event")
+    run_parser.add_argument("--requests", type=int, default=50, help="timed requests per mode")
+    run_parser.add_argument("--only", action="append", help="only this route name; repeatable")
+    run_parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subcommands.add_parser("compare", help="flag regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed relative growth (default 0.25)"
+    )
+    compare_parser.add_argument(
+        "--min-delta-ms", type=float, default=0.5,
+        help="ignore latency changes smaller than this (default 0.5)",
+    )
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
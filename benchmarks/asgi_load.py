@@ -0,0 +1,197 @@
+"""
+Load test of the synchronous (WSGI) endpoints against the async (ASGI) ones.
+
+Seeds a throwaway database, then fires ``--requests`` GET requests at each
+route at ``--concurrency`` requests in flight, twice: through the WSGI
+handler from a pool of ``--threads`` worker threads, as a threaded WSGI
+server would, and through the ASGI handler from one event loop, with every
+request a coroutine. Prints the throughput and latency percentiles of both::
+
+    python -m benchmarks.asgi_load --concurrency 200 --threads 16
+
+Both handlers run in this process, so the figures compare the request
+handling models, not servers; no network or server overhead is included.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import setup_django
+
+# (sync route name, URL kwargs key) per benchmarked endpoint; the async route
+# is the same name prefixed with ``async-``.
+ROUTES = [
+    ("camera-detail", "camera"),
+    ("camera-motions", "camera"),
+    ("motion-list", None),
+    ("image-list", None),
+]
+
+
+def seed(events):
+    """Insert a camera with ``events`` motion events and an image each."""
+    # pylint: disable=import-outside-toplevel
+    from django.contrib.auth import get_user_model
+
+    from cameras.models import Camera
+    from images.models import Image
+    from motions.models import MotionEvent
+
+    camera = Camera.objects.create(address="http://load.example.com/1", resolution="1920x1080")
+    created = MotionEvent.objects.bulk_create(
+        MotionEvent(camera=camera, duration=index / 7, threshold=0.25) for index in range(events)
+    )
+    Image.objects.bulk_create(
+        Image(
+            motion_event=event, camera=camera,
+            filepath=f"http://load.example.com/media/{event.pk}.jpg",
+        )
+        for event in created
+    )
+    user = get_user_model().objects.create_user(username="load", password="load-pass-123")
+    return {"camera": camera.pk}, user
+
+
+def summary(latencies, elapsed):
+    """Return ``(requests/s, p50 ms, p95 ms)`` of one run."""
+    ordered = sorted(latencies)
+    return (
+        len(ordered) / elapsed,
+        statistics.median(ordered) * 1000,
+        ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000,
+    )
+
+
+def run_wsgi(url, user, requests, concurrency, threads):
+    """
+    Serve ``requests`` requests through the WSGI handler, ``concurrency`` at a
+    time, on ``threads`` worker threads.
+
+    Requests beyond the thread count wait for a free thread, as on a WSGI
+    server's backlog, and their latency includes the wait.
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.db import connections
+    from django.test import Client
+
+    local = threading.local()
+    in_flight = threading.BoundedSemaphore(concurrency)
+    latencies = []
+
+    def send(submitted):
+        try:
+            if not hasattr(local, "client"):
+                local.client = Client()
+                local.client.force_login(user)
+            response = local.client.get(url)
+            if response.status_code != 200:
+                raise SystemExit(f"{url}: status {response.status_code}")
+            latencies.append(time.perf_counter() - submitted)
+        finally:
+            in_flight.release()
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for _ in range(threads):  # Log every worker in before timing.
+            in_flight.acquire()  # pylint: disable=consider-using-with
+            pool.submit(send, time.perf_counter()).result()
+        latencies.clear()
+        started = time.perf_counter()
+        futures = []
+        for _ in range(requests):
+            in_flight.acquire()  # pylint: disable=consider-using-with
+            futures.append(pool.submit(send, time.perf_counter()))
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+        for future in [pool.submit(connections.close_all) for _ in range(threads)]:
+            future.result()
+    return summary(latencies, elapsed)
+
+
+async def run_asgi(url, user, requests, concurrency):
+    """Serve ``requests`` requests through the ASGI handler, ``concurrency`` at a time."""
+    # pylint: disable=import-outside-toplevel
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    await client.aforce_login(user)
+    await client.get(url)
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def send():
+        async with slots:
+            started = time.perf_counter()
+            response = await client.get(url)
+            if response.status_code != 200:
+                raise SystemExit(f"{url}: status {response.status_code}")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send() for _ in range(requests)))
+    return summary(latencies, time.perf_counter() - started)
+
+
+def main():
+    """Print the throughput and latency of both handlers per route."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2000, help="motion events to seed")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per route")
+    parser.add_argument(
+        "--concurrency", type=int, default=100, help="requests in flight at once"
+    )
+    parser.add_argument("--threads", type=int, default=16, help="WSGI worker threads")
+    args = parser.parse_args()
+
+    setup_django()
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+
+    setup_test_environment()
+    # Keep the query log and the response cache out of the measurement: the
+    # async views do not cache, and cache hits would skip the sync views' work.
+    settings.DEBUG = False
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "load.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            ids, user = seed(args.events)
+            connection.close()
+            print(
+                f"concurrency {args.concurrency}, {args.threads} WSGI threads, "
+                f"{args.requests} requests per route"
+            )
+            print(
+                f"{'route':<18}{'handler':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            )
+            for name, key in ROUTES:
+                kwargs = {"pk": ids[key]} if key else {}
+                runs = [
+                    ("wsgi", run_wsgi(
+                        reverse(name, kwargs=kwargs), user, args.requests,
+                        args.concurrency, args.threads,
+                    )),
+                    ("asgi", asyncio.run(run_asgi(
+                        reverse(f"async-{name}", kwargs=kwargs), user, args.requests,
+                        args.concurrency,
+                    ))),
+                ]
+                for handler, (throughput, p50, p95) in runs:
+                    print(f"{name:<18}{handler:>8}{throughput:>10.0f}{p50:>10.1f}{p95:>10.1f}")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark of the fast list path against DRF serializers on large pages.
+
+Seeds a throwaway database, then reads and renders ``--rows`` rows per
+serializer both ways: model instances through the serializer, and
+``values()`` rows through a ``ReadPlan``. Checks that the rendered JSON is
+byte-identical and prints the end-to-end throughput of each path (query,
+serialization and rendering) and the speedup of the serialization step
+alone::
+
+    python -m benchmarks.fast_serializers --rows 10000
+"""
+import argparse
+import os
+import tempfile
+import timeit
+
+from . import setup_django
+
+
+def seed(rows):
+    """Insert ``rows`` motion events, each with one image and detection."""
+    # pylint: disable=import-outside-toplevel
+    from cameras.models import Camera
+    from detections.models import Detection
+    from images.models import Image
+    from motions.models import MotionEvent
+
+    camera = Camera.objects.create(address="http://bench.example.com/1", resolution="1920x1080")
+    events = MotionEvent.objects.bulk_create(
+        MotionEvent(camera=camera, duration=index / 7, threshold=0.25) for index in range(rows)
+    )
+    images = Image.objects.bulk_create(
+        Image(
+            motion_event=event,
+            camera=camera,
+            filepath=f"http://bench.example.com/media/{event.pk}.jpg",
+            filesize=None if event.pk % 3 else 150000,
+        )
+        for event in events
+    )
+    Detection.objects.bulk_create(
+        Detection(motion_event_id=image.motion_event_id, image=image, camera=camera,
+                  object_class="person", confidence=0.9)
+        for image in images
+    )
+    for camera_index in range(rows // 100):
+        Camera.objects.create(
+            address=f"http://bench.example.com/{camera_index + 2}", resolution="1280x720"
+        )
+
+
+def main():
+    """Print rows per second of both paths and the speedup per serializer."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per path")
+    args = parser.parse_args()
+
+    setup_django()
+    # pylint: disable=import-outside-toplevel
+    from django.db import connection
+    from rest_framework.renderers import JSONRenderer
+
+    from cameras.models import Camera
+    from cameras.serializers import CameraSerializer
+    from detections.models import Detection
+    from detections.serializers import DetectionSerializer
+    from eyesedge.fastpath import ReadPlan
+    from images.models import Image
+    from images.serializers import ImageSerializer
+    from motions.models import MotionEvent
+    from motions.serializers import MotionEventSerializer
+
+    cases = [
+        (CameraSerializer, Camera.objects.order_by("id")),
+        (MotionEventSerializer, MotionEvent.objects.order_by("timestamp", "id")),
+        (ImageSerializer, Image.objects.order_by("created_at", "id")),
+        (DetectionSerializer, Detection.objects.order_by("created_at", "id")),
+    ]
+    renderer = JSONRenderer()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "bench.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            seed(args.rows)
+            print(
+                f"{'serializer':<24}{'rows':>7}{'DRF rows/s':>13}{'fast rows/s':>13}"
+                f"{'speedup':>9}{'serialize only':>16}"
+            )
+            for serializer_class, queryset in cases:
+                queryset = queryset[:args.rows]
+                plan = ReadPlan.for_serializer_class(serializer_class)
+
+                def regular(cls=serializer_class, rows=queryset):
+                    return renderer.render(cls(list(rows.all()), many=True).data)
+
+                def fast(plan=plan, rows=queryset):
+                    return renderer.render(plan.represent(plan.rows(rows.all())))
+
+                if regular() != fast():
+                    raise SystemExit(f"{serializer_class.__name__}: outputs differ")
+                count = queryset.count()
+                before = min(timeit.repeat(regular, number=1, repeat=args.repeat))
+                after = min(timeit.repeat(fast, number=1, repeat=args.repeat))
+
+                instances, rows = list(queryset.all()), list(plan.rows(queryset.all()))
+                serialize_before = min(timeit.repeat(
+                    lambda cls=serializer_class, page=instances: cls(page, many=True).data,
+                    number=1, repeat=args.repeat,
+                ))
+                serialize_after = min(timeit.repeat(
+                    lambda plan=plan, page=rows: plan.represent(page),
+                    number=1, repeat=args.repeat,
+                ))
+                print(
+                    f"{serializer_class.__name__:<24}{count:>7}{count / before:>13.0f}"
+                    f"{count / after:>13.0f}{before / after:>8.1f}x"
+                    f"{serialize_before / serialize_after:>15.1f}x"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
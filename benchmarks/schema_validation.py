@@ -0,0 +1,65 @@
+"""
+Microbenchmark for per-request JSON Schema validation.
+
+Compares rebuilding the schema and calling ``jsonschema.validate`` on every
+request (the previous behaviour) with the compiled validators held by
+``schema_registry``::
+
+    python -m benchmarks.schema_validation --number 2000
+"""
+import argparse
+import timeit
+
+from jsonschema import FormatChecker, validate
+
+from . import setup_django
+
+PAYLOADS = {
+    "CameraSerializer": {
+        "address": "http://192.168.1.100:8080/video",
+        "resolution": "1920x1080",
+        "fps": 25,
+        "status": "active",
+    },
+    "MotionEventSerializer": {"camera": 1, "duration": 2.5, "threshold": 0.3},
+    "ImageSerializer": {
+        "motion_event": 1,
+        "filepath": "http://example.com/media/1.jpg",
+        "filesize": 150000,
+    },
+}
+
+
+def main():
+    """Print the per-call validation cost before and after compilation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000, help="calls per measurement")
+    args = parser.parse_args()
+
+    setup_django()
+    # pylint: disable=import-outside-toplevel,protected-access
+    from cameras.serializers import CameraSerializer
+    from eyesedge.schema_validation import schema_registry, validate_payload_with_schema
+    from images.serializers import ImageSerializer
+    from motions.serializers import MotionEventSerializer
+
+    print(f"{'serializer':<24}{'rebuild (us)':>14}{'compiled (us)':>15}{'speedup':>10}")
+    for serializer_cls in (CameraSerializer, MotionEventSerializer, ImageSerializer):
+        payload = PAYLOADS[serializer_cls.__name__]
+
+        def rebuild(cls=serializer_cls, data=payload):
+            validate(instance=data, schema=cls._json_schema(), format_checker=FormatChecker())
+
+        def compiled(cls=serializer_cls, data=payload):
+            validate_payload_with_schema(data, schema_registry.validator(cls))
+
+        before = min(timeit.repeat(rebuild, number=args.number, repeat=3)) / args.number
+        after = min(timeit.repeat(compiled, number=args.number, repeat=3)) / args.number
+        print(
+            f"{serializer_cls.__name__:<24}{before * 1e6:>14.1f}"
+            f"{after * 1e6:>15.1f}{before / after:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Concurrency benchmark for the SQLite connection profiles.
+
+Runs writer threads creating motion events and reader threads listing them
+against a fresh database file, once per ``EYESEDGE_SQLITE_PROFILE``, and
+reports throughput and "database is locked" errors. Every operation ends
+like a request does, with ``close_old_connections()``, so the plain profile
+reconnects each time and the tuned profile reuses its connection::
+
+    python -m benchmarks.sqlite_concurrency --writers 4 --readers 8 --duration 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from . import setup_django
+
+PROFILES = ("plain", "tuned")
+
+
+def run_profile(writers, readers, duration):
+    """Run the workload in this process and return its counters."""
+    setup_django()
+    # pylint: disable=import-outside-toplevel
+    from django.core.management import call_command
+    from django.db import OperationalError, close_old_connections, connection
+
+    from cameras.models import Camera
+    from motions.models import MotionEvent
+
+    call_command("migrate", verbosity=0)
+    camera = Camera.objects.create(address="http://192.168.1.10:8080/video", resolution="1920x1080")
+    connection.close()
+
+    counts = {"writes": 0, "reads": 0, "write_errors": 0, "read_errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def write():
+        MotionEvent.objects.create(camera_id=camera.pk, duration=1.0, threshold=0.5)
+
+    def read():
+        list(
+            MotionEvent.objects.filter(camera_id=camera.pk)
+            .order_by("-timestamp", "-id").values()[:50]
+        )
+
+    def worker(operation, done_key, error_key):
+        while time.perf_counter() < deadline:
+            try:
+                operation()
+                key = done_key
+            except OperationalError:
+                key = error_key
+            finally:
+                close_old_connections()
+            with lock:
+                counts[key] += 1
+        connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(write, "writes", "write_errors"))
+        for _ in range(writers)
+    ] + [
+        threading.Thread(target=worker, args=(read, "reads", "read_errors"))
+        for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main():
+    """Run every profile in a child process and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=4, help="writer threads")
+    parser.add_argument("--readers", type=int, default=8, help="reader threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per profile")
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        # Child process: settings are read from the environment set below.
+        print(json.dumps(run_profile(args.writers, args.readers, args.duration)))
+        return
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.duration:g}s per profile")
+    print(f"{'profile':<8}{'writes/s':>10}{'reads/s':>10}{'write errors':>14}{'read errors':>13}")
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "EYESEDGE_SQLITE_PROFILE": profile,
+                "EYESEDGE_DB_PATH": os.path.join(directory, "bench.sqlite3"),
+            }
+            output = subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.sqlite_concurrency",
+                    "--profile", profile,
+                    "--writers", str(args.writers),
+                    "--readers", str(args.readers),
+                    "--duration", str(args.duration),
+                ],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+        counts = json.loads(output.splitlines()[-1])
+        print(
+            f"{profile:<8}{counts['writes'] / args.duration:>10.0f}"
+            f"{counts['reads'] / args.duration:>10.0f}"
+            f"{counts['write_errors']:>14}{counts['read_errors']:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """Admin configuration for the cameras app."""
 from django.contrib import admin
 
-from .models import Camera
+from .models import Camera, RetentionPolicy
 
 admin.site.register(Camera)
+admin.site.register(RetentionPolicy)
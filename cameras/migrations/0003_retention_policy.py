@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cameras', '0002_remove_camera_motion_sensitivity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RetentionPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('keep_days', models.PositiveIntegerField(blank=True, null=True)),
+                ('archive', models.BooleanField(default=False)),
+                ('camera', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='retention_policy', to='cameras.camera')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cameras', '0003_retention_policy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='camera',
+            name='deleting',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cameras', '0004_deferred_delete'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='camera',
+            name='address',
+            field=models.URLField(),
+        ),
+        migrations.AddConstraint(
+            model_name='camera',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleting', False)), fields=('address',), name='camera_unique_visible_address'),
+        ),
+    ]
@@ -5,6 +5,14 @@ Defines the Camera model for storing security camera configurations.
 from django.db import models
 
 
+class CameraQuerySet(models.QuerySet):
+    """Query helpers for cameras."""
+
+    def visible(self):
+        """Exclude cameras waiting for deferred deletion."""
+        return self.filter(deleting=False)
+
+
 class Camera(models.Model):
     """
     Represents a physical security camera device.
@@ -21,11 +29,46 @@ class Camera(models.Model):
         (RESOLUTION_1080P, "1080p"),
         (RESOLUTION_4K, "4k"),
     ]
-    address = models.URLField(unique=True, null=False, blank=False)
+    address = models.URLField(null=False, blank=False)
     resolution = models.CharField(max_length=15, choices=RESOLUTION_CHOICES, null=False, blank=False)
     fps = models.PositiveIntegerField(default=25, null=False, blank=False)
     status = models.CharField(max_length=20, default="active", null=False)
+    deleting = models.BooleanField(default=False)
+
+    objects = CameraQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # A camera marked for deletion frees its address right away.
+            models.UniqueConstraint(
+                fields=["address"], condition=models.Q(deleting=False),
+                name="camera_unique_visible_address",
+            ),
+        ]
 
     def __str__(self):
         """Return the camera address as string representation."""
         return self.address
+
+
+class RetentionPolicy(models.Model):
+    """
+    How long a camera's motion history is kept.
+
+    Motion events older than ``keep_days``, with their images, detections and
+    alerts, are removed by ``manage.py purge_history``; with ``archive`` set
+    they are first written to compressed NDJSON archive files. Cameras
+    without a policy follow ``settings.RETENTION``.
+    """
+    camera = models.OneToOneField(
+        Camera,
+        on_delete=models.CASCADE,
+        related_name="retention_policy",
+    )
+    keep_days = models.PositiveIntegerField(null=True, blank=True)
+    archive = models.BooleanField(default=False)
+
+    def __str__(self):
+        """Return the camera and its retention period."""
+        period = f"{self.keep_days} days" if self.keep_days is not None else "forever"
+        return f"{self.camera}: {period}"
@@ -0,0 +1,195 @@
+"""
+In-memory registry of the visible cameras.
+
+The camera table is small and rarely changes, yet every motion event write
+checks its ``camera`` with a query and every camera list request filters the
+table again. ``CameraRegistry`` keeps a per-process snapshot of the visible
+cameras, indexed by ID, address and status, together with their serialized
+representation. The snapshot is tagged with the ``camera`` generation of
+the response cache (see ``eyesedge.cache``), which every camera save,
+delete and deletion mark bumps, so every process rebuilds it with one query
+after a change and otherwise serves lookups without touching the database.
+
+Generations only reach other processes through a shared cache backend, and
+rows changed with ``update()`` or raw deletes bump nothing, so a snapshot is
+also rebuilt once it is ``CAMERA_REGISTRY["MAX_AGE"]`` seconds old. Writes
+that fail on the camera foreign key rebuild it at once and check again.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.utils.http import quote_etag
+from rest_framework import relations
+from rest_framework.response import Response
+
+from eyesedge.cache import get_generations
+from eyesedge.conditional import etag_matches, not_modified
+from eyesedge.fastpath import ReadPlan
+
+from .models import Camera
+
+
+def camera_registry_settings():
+    """Return ``settings.CAMERA_REGISTRY`` merged over the defaults."""
+    defaults = {"MAX_AGE": 5.0}
+    return {**defaults, **getattr(settings, "CAMERA_REGISTRY", {})}
+
+
+class CameraSnapshot:
+    """The visible cameras at one ``camera`` generation, with their indexes."""
+
+    def __init__(self, generation, rows, data):
+        self.generation = generation
+        self.built_at = time.monotonic()
+        self.by_id = {row["id"]: row for row in rows}
+        self.by_address = {row["address"]: row["id"] for row in rows}
+        self.by_status = {}
+        for row in rows:
+            self.by_status.setdefault(row["status"], []).append(row["id"])
+        self.data = {row["id"]: item for row, item in zip(rows, data)}
+
+    def instance(self, pk):
+        """Return a new ``Camera`` built from the row of ``pk``."""
+        row = self.by_id[pk]
+        return Camera.from_db("default", list(row), list(row.values()))
+
+    def filter(self, **lookups):
+        """Return the IDs of the cameras equal to every lookup, in ID order."""
+        if "address" in lookups:
+            pk = self.by_address.get(lookups.pop("address"))
+            ids = [] if pk is None else [pk]
+        elif "status" in lookups:
+            ids = self.by_status.get(lookups.pop("status"), [])
+        else:
+            ids = list(self.by_id)
+        return [
+            pk for pk in ids
+            if all(self.by_id[pk][name] == value for name, value in lookups.items())
+        ]
+
+
+class CameraRegistry:
+    """Hands out the current ``CameraSnapshot``, rebuilding it after changes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._snapshot = None
+
+    @staticmethod
+    def is_current(snapshot, generation):
+        """Return whether ``snapshot`` is of ``generation`` and within its max age."""
+        return (
+            snapshot is not None
+            and snapshot.generation == generation
+            and time.monotonic() - snapshot.built_at < camera_registry_settings()["MAX_AGE"]
+        )
+
+    def snapshot(self):
+        """Return the snapshot of the current ``camera`` generation."""
+        generation = get_generations(("camera",))[0]
+        snapshot = self._snapshot
+        if self.is_current(snapshot, generation):
+            return snapshot
+        with self.lock:
+            if not self.is_current(self._snapshot, generation):
+                self._snapshot = self.build(generation)
+            return self._snapshot
+
+    def refresh(self):
+        """Rebuild the snapshot from the database and return it."""
+        generation = get_generations(("camera",))[0]
+        with self.lock:
+            self._snapshot = self.build(generation)
+            return self._snapshot
+
+    def snapshot_with(self, ids):
+        """
+        Return the current snapshot, rebuilt first when one of ``ids`` is
+        missing from it but is a visible camera in the database.
+
+        With a per-process cache backend, generations are not shared, so a
+        camera created by another process or a management command is only
+        found through this fallback; invalid IDs cost one query.
+        """
+        snapshot = self.snapshot()
+        missing = set(ids) - snapshot.by_id.keys()
+        if missing and Camera.objects.visible().filter(pk__in=missing).exists():
+            snapshot = self.refresh()
+        return snapshot
+
+    @staticmethod
+    def build(generation):
+        """Read the visible cameras into a snapshot tagged with ``generation``."""
+        # pylint: disable=import-outside-toplevel
+        from .serializers import CameraSerializer
+
+        plan = ReadPlan.for_serializer_class(CameraSerializer)
+        names = [field.attname for field in Camera._meta.concrete_fields]
+        rows = list(Camera.objects.visible().order_by("id").values(*names))
+        data = plan.represent([{path: row[path] for path in plan.paths} for row in rows])
+        return CameraSnapshot(generation, rows, data)
+
+
+registry = CameraRegistry()
+
+
+class RegistryCameraField(relations.PrimaryKeyRelatedField):
+    """A camera foreign key checked against the registry, querying only on a miss."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool) or not isinstance(data, (int, str)):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except ValueError:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        snapshot = registry.snapshot_with([pk])
+        if pk not in snapshot.by_id:
+            self.fail("does_not_exist", pk_value=data)
+        return snapshot.instance(pk)
+
+
+class RegistryListMixin:
+    """
+    Serve camera lists from the registry when the query can be answered there.
+
+    Requests that only use ``filterset_fields`` with valid values are
+    answered from the snapshot with an ETag of its generation; anything else
+    goes down the regular path. Place it first in the bases.
+    """
+
+    def registry_filters(self, request):
+        """Return the lookups of ``request`` as model values, or ``None``."""
+        lookups = {}
+        for name in request.query_params:
+            values = request.query_params.getlist(name)
+            if name not in self.filterset_fields or len(values) != 1:
+                return None
+            value = values[0]
+            if value == "":
+                continue
+            field = Camera._meta.get_field(name)
+            if field.choices and value not in dict(field.choices):
+                return None
+            if field.get_internal_type() == "PositiveIntegerField":
+                if not value.isdigit():
+                    return None
+                value = int(value)
+            lookups[name] = value
+        return lookups
+
+    def list(self, request, *args, **kwargs):
+        lookups = self.registry_filters(request)
+        if lookups is None:
+            return super().list(request, *args, **kwargs)
+        snapshot = registry.snapshot()
+        data = [snapshot.data[pk] for pk in snapshot.filter(**lookups)]
+        if not data:
+            return Response(data)
+        raw = repr((snapshot.generation, request.get_full_path()))
+        etag = quote_etag(hashlib.md5(raw.encode("utf-8"), usedforsecurity=False).hexdigest())
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return Response(data, headers={"ETag": etag})
@@ -4,10 +4,12 @@ Provides serialization for Camera model.
 """
 from rest_framework import serializers
 from .models import Camera
-from eyesedge.schema_validation import validate_payload_with_schema
+from eyesedge.metrics import TimedSerializerMixin
+from eyesedge.schema_validation import schema_registry, validate_payload_with_schema
 
 
-class CameraSerializer(serializers.ModelSerializer):
+@schema_registry.register
+class CameraSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for Camera model with all configuration fields."""
 
     @staticmethod
@@ -48,7 +50,9 @@ class CameraSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         payload = self.initial_data if isinstance(self.initial_data, dict) else attrs
-        validate_payload_with_schema(payload, self._json_schema(partial=self.partial))
+        validate_payload_with_schema(
+            payload, schema_registry.validator(type(self), partial=self.partial)
+        )
         return super().validate(attrs)
 
     class Meta:
@@ -2,12 +2,22 @@
 Tests for camera model and related API endpoints.
 """
 
+import csv
+import io
+import json
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
+from images.models import Image
+from images.serializers import ImageSerializer
+from motions.models import MotionEvent
+from motions.purge import _raw_delete, process_deletions
+from motions.serializers import MotionEventSerializer
 from .models import Camera
+from .registry import registry
 from .serializers import CameraSerializer
 
 
@@ -164,9 +174,28 @@ class CameraAPITest(APITestCase):
     def test_delete_camera(self):
         total_cameras = Camera.objects.count()
         response = self.client.delete(self.detail_url)
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {"id": self.camera.pk, "status": "deleting"})
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn(self.camera.pk, [c["id"] for c in self.client.get(self.list_url).data])
+
+        process_deletions()
         self.assertEqual(Camera.objects.count(), total_cameras - 1)
 
+    def test_address_is_free_once_the_camera_is_marked_for_deletion(self):
+        data = {"address": self.camera.address, "resolution": "1920x1080"}
+        response = self.client.post(self.list_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["address"], ["camera with this address already exists."]
+        )
+
+        self.client.delete(self.detail_url)
+        response = self.client.post(self.list_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        process_deletions()
+        self.assertEqual(Camera.objects.filter(address=self.camera.address).count(), 1)
+
     def test_get_nonexistent_camera(self):
         url = reverse('camera-detail', kwargs={'pk': 9999})
         response = self.client.get(url)
@@ -184,13 +213,13 @@ class CameraAPITest(APITestCase):
         url = reverse('camera-motions', kwargs={'pk': self.camera.pk})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data["results"]), 0)
 
     def test_get_camera_images_empty(self):
         url = reverse('camera-images', kwargs={'pk': self.camera.pk})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data["results"]), 0)
 
 
 class CameraAuthenticationAPITest(APITestCase):
@@ -239,3 +268,206 @@ class CameraAuthenticationAPITest(APITestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class CameraExportAPITest(APITestCase):
+    """
+    Test cases for the streaming export endpoints.
+    """
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.203:8080/video",
+            resolution="1920x1080",
+        )
+        self.events = [
+            MotionEvent.objects.create(camera=self.camera, duration=float(i)) for i in range(3)
+        ]
+        self.image = Image.objects.create(
+            motion_event=self.events[0],
+            filepath="http://example.com/images/export_1.jpg",
+            filesize=1024,
+        )
+        self.user = get_user_model().objects.create_user(
+            username="export_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.motions_url = reverse("camera-motions-export", kwargs={"pk": self.camera.pk})
+        self.images_url = reverse("camera-images-export", kwargs={"pk": self.camera.pk})
+
+    def test_motions_export_streams_ndjson_matching_the_api(self):
+        response = self.client.get(self.motions_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response["Content-Type"].startswith("application/x-ndjson"))
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        expected = MotionEventSerializer(self.events, many=True).data
+        self.assertEqual(rows, [dict(item) for item in expected])
+
+    def test_images_export_streams_csv(self):
+        response = self.client.get(self.images_url, {"format": "csv"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('filename="camera-', response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode("utf-8")
+        rows = list(csv.DictReader(io.StringIO(content)))
+        expected = ImageSerializer(self.image).data
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(list(rows[0]), list(expected))
+        self.assertEqual(rows[0]["camera"], str(self.camera.id))
+        self.assertEqual(rows[0]["created_at"], expected["created_at"])
+
+    def test_export_applies_filters(self):
+        response = self.client.get(self.motions_url, {"duration": 2.0})
+        rows = b"".join(response.streaming_content).splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in rows], [self.events[2].id])
+
+    def test_anonymous_export_is_rejected(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.motions_url)
+        self.assertIn(
+            response.status_code,
+            [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN],
+        )
+
+
+class CameraRegistryAPITest(APITestCase):
+
+    def setUp(self):
+        self.cameras = [
+            Camera.objects.create(
+                address=f"http://192.168.1.{100 + index}:8080/video",
+                resolution="1920x1080" if index % 2 else "1280x720",
+                status="inactive" if index == 2 else "active",
+            )
+            for index in range(4)
+        ]
+        self.user = get_user_model().objects.create_user(
+            username="registry_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("camera-list")
+
+    def _ids(self, response):
+        own = {camera.pk for camera in self.cameras}
+        return [item["id"] for item in response.data if item["id"] in own]
+
+    def test_filtered_lists_are_served_without_queries(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"status": "active", "resolution": "1280x720"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(response), [self.cameras[0].pk])
+        expected = CameraSerializer(
+            Camera.objects.visible().filter(address=self.cameras[1].address), many=True
+        ).data
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"address": self.cameras[1].address})
+        self.assertEqual(response.data, expected)
+
+        etag = response["ETag"]
+        response = self.client.get(
+            self.url, {"address": self.cameras[1].address}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changes_refresh_the_registry(self):
+        self.client.get(self.url)
+        camera = self.cameras[3]
+        self.client.put(
+            reverse("camera-detail", kwargs={"pk": camera.pk}),
+            {"address": camera.address, "resolution": "1920x1080", "status": "inactive"},
+            format="json",
+        )
+        response = self.client.get(self.url, {"status": "inactive"})
+        self.assertEqual(self._ids(response), [self.cameras[2].pk, camera.pk])
+
+        self.client.delete(reverse("camera-detail", kwargs={"pk": camera.pk}))
+        response = self.client.get(self.url, {"status": "inactive"})
+        self.assertEqual(self._ids(response), [self.cameras[2].pk])
+
+    def test_invalid_filters_take_the_regular_path(self):
+        response = self.client.get(self.url, {"resolution": "640x480"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_motion_camera_is_validated_against_the_registry(self):
+        url = reverse("motion-list")
+        self.client.post(url, {"camera": self.cameras[0].pk, "duration": 1.0}, format="json")
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                url, {"camera": self.cameras[1].pk, "duration": 1.0}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(MotionEvent.objects.filter(camera=self.cameras[1]).exists())
+
+        self.client.delete(reverse("camera-detail", kwargs={"pk": self.cameras[1].pk}))
+        response = self.client.post(
+            url, {"camera": self.cameras[1].pk, "duration": 1.0}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["camera"],
+            [f'Invalid pk "{self.cameras[1].pk}" - object does not exist.'],
+        )
+
+    def test_cameras_added_by_other_processes_are_found(self):
+        registry.snapshot()
+        # A row written elsewhere, without this process's generation changing.
+        Camera.objects.bulk_create([
+            Camera(address="http://192.168.1.250:8080/video", resolution="1920x1080")
+        ])
+        camera = Camera.objects.get(address="http://192.168.1.250:8080/video")
+        response = self.client.post(
+            reverse("motion-list"), {"camera": camera.pk, "duration": 1.0}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(camera.pk, registry.snapshot().by_id)
+        response = self.client.post(
+            reverse("motion-bulk"), [{"camera": camera.pk, "duration": 1.0}], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_snapshots_expire_after_their_max_age(self):
+        camera = self.cameras[0]
+        registry.snapshot()
+        # A deletion mark set elsewhere, without this process's generation changing.
+        Camera.objects.filter(pk=camera.pk).update(deleting=True)
+        with override_settings(CAMERA_REGISTRY={"MAX_AGE": 0}):
+            response = self.client.post(
+                reverse("motion-list"), {"camera": camera.pk, "duration": 1.0}, format="json"
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertNotIn(camera.pk, [item["id"] for item in self.client.get(self.url).data])
+
+
+class CameraRegistryWriteTest(TransactionTestCase):
+    """Foreign keys are only checked on commit, so these writes must commit."""
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.251:8080/video", resolution="1920x1080"
+        )
+        self.user = get_user_model().objects.create_user(
+            username="registry_write_user",
+            password="test-pass-123"
+        )
+        self.client = APIClient()
+        self.client.force_login(self.user)
+
+    def test_writes_for_cameras_deleted_elsewhere_are_rejected(self):
+        stale = registry.snapshot()
+        # Deleted the way process_deletions does, without a generation change.
+        _raw_delete(Camera.objects.filter(pk=self.camera.pk))
+        payload = {"camera": self.camera.pk, "duration": 1.0}
+        expected = [f'Invalid pk "{self.camera.pk}" - object does not exist.']
+        for name in ("motion-list", "async-motion-list"):
+            registry._snapshot = stale  # pylint: disable=protected-access
+            response = self.client.post(reverse(name), payload, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.json()["camera"], expected)
+        registry._snapshot = stale  # pylint: disable=protected-access
+        response = self.client.post(reverse("motion-bulk"), [payload], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["results"][0]["errors"]["camera"], expected)
+        self.assertFalse(MotionEvent.objects.filter(camera_id=self.camera.pk).exists())
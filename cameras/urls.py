@@ -5,5 +5,29 @@ urlpatterns = [
     path('', views.CameraList.as_view(), name='camera-list'),
     path('<int:pk>/', views.CameraDetail.as_view(), name='camera-detail'),
     path('<int:pk>/motions/', views.CameraMotionsList.as_view(), name='camera-motions'),
+    path(
+        '<int:pk>/motions/activity/',
+        views.CameraMotionActivity.as_view(),
+        name='camera-motion-activity',
+    ),
+    path(
+        '<int:pk>/motions/export/',
+        views.CameraMotionsExport.as_view(),
+        name='camera-motions-export',
+    ),
     path('<int:pk>/images/', views.CameraImagesList.as_view(), name='camera-images'),
+    path(
+        '<int:pk>/images/export/',
+        views.CameraImagesExport.as_view(),
+        name='camera-images-export',
+    ),
+]
+
+async_urlpatterns = [
+    path('', views.AsyncCameraList.as_view(), name='async-camera-list'),
+    path('<int:pk>/', views.AsyncCameraDetail.as_view(), name='async-camera-detail'),
+    path(
+        '<int:pk>/motions/', views.AsyncCameraMotionsList.as_view(), name='async-camera-motions'
+    ),
+    path('<int:pk>/images/', views.AsyncCameraImagesList.as_view(), name='async-camera-images'),
 ]
@@ -2,66 +2,261 @@
 Views for the cameras app.
 Provides API endpoints for camera management and related resources.
 """
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import generics
 from rest_framework import permissions
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 
+from eyesedge.async_views import AsyncDetailView, AsyncListCreateView
+from eyesedge.cache import CachedResponseMixin
+from eyesedge.conditional import ConditionalGetMixin
+from eyesedge.fastpath import FastListMixin
+from eyesedge.deletion import DeferredDestroyMixin
+from eyesedge.export import StreamingExportView
+from eyesedge.pagination import CreatedAtKeysetPagination, TimestampKeysetPagination
+
 from images.models import Image
 from images.serializers import ImageSerializer
+from motions.activity import BUCKET_SIZES, motion_activity
+from motions.history import MotionHistoryListMixin
 from motions.models import MotionEvent
 from motions.serializers import MotionEventSerializer
 from .models import Camera
+from .registry import RegistryListMixin
 from .serializers import CameraSerializer
 
 
-class CameraList(generics.ListCreateAPIView):
+class CameraList(
+    RegistryListMixin, ConditionalGetMixin, CachedResponseMixin, FastListMixin,
+    generics.ListCreateAPIView,
+):
     """
-    GET: List all cameras
+    GET: List all cameras, served from the camera registry
     POST: Create a new camera
     """
-    queryset = Camera.objects.all()
+    cache_resources = ("camera",)
+    etag_timestamp_field = None
+    # In ID order, like the registry; the address index would otherwise decide.
+    queryset = Camera.objects.visible().order_by("id")
     serializer_class = CameraSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["address", "resolution", "fps", "status"]
 
 
-class CameraDetail(generics.RetrieveUpdateDestroyAPIView):
+class CameraDetail(
+    DeferredDestroyMixin, ConditionalGetMixin, CachedResponseMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     """
     GET: Retrieve a specific camera
     PUT: Update a camera
-    DELETE: Delete a camera
+    DELETE: Mark a camera for deletion; it is removed in the background
     """
-    queryset = Camera.objects.all()
+    cache_resources = ("camera",)
+    deferred_delete_resources = ("camera", "motion", "image", "detection")
+    etag_timestamp_field = None
+    # In ID order, like the registry; the address index would otherwise decide.
+    queryset = Camera.objects.visible().order_by("id")
     serializer_class = CameraSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class CameraMotionsList(generics.ListAPIView):
+class CameraMotionsList(
+    ConditionalGetMixin, CachedResponseMixin, MotionHistoryListMixin, FastListMixin,
+    generics.ListAPIView,
+):
     """
     GET: List all motion events for a specific camera
     """
+    cache_resources = ("motion",)
     serializer_class = MotionEventSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimestampKeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["duration", "threshold", "timestamp"]
 
     def get_queryset(self):
         """Return motion events filtered by camera ID."""
         camera_id = self.kwargs['pk']
-        return MotionEvent.objects.filter(camera_id=camera_id)
+        return MotionEvent.objects.visible().filter(camera_id=camera_id)
+
+    def get_history_chunks(self):
+        """Return the compacted motion history of the camera from URL."""
+        return super().get_history_chunks().filter(camera_id=self.kwargs["pk"])
+
+
+class CameraMotionsExport(StreamingExportView):
+    """
+    GET: Stream all motion events for a specific camera as NDJSON or CSV
+    """
+    serializer_class = MotionEventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["duration", "threshold", "timestamp"]
+    export_columns = {
+        "id": "id",
+        "camera": "camera_id",
+        "timestamp": "timestamp",
+        "duration": "duration",
+        "threshold": "threshold",
+        "created_at": "created_at",
+    }
+    export_filename = "camera-{pk}-motions"
+
+    def get_queryset(self):
+        """Return motion events of the camera in timestamp order."""
+        return (
+            MotionEvent.objects.visible()
+            .filter(camera_id=self.kwargs['pk'])
+            .order_by("timestamp", "id")
+        )
 
 
-class CameraImagesList(generics.ListAPIView):
+class CameraMotionActivity(APIView):
+    """
+    GET: Motion activity for a specific camera, aggregated per time bucket
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_spans = {
+        "minute": timedelta(hours=1),
+        "hour": timedelta(days=1),
+        "day": timedelta(days=30),
+    }
+    max_buckets = 10000
+
+    def _parse_datetime(self, name, default):
+        """Return the ``name`` query parameter as an aware datetime."""
+        raw = self.request.query_params.get(name)
+        if raw is None:
+            return default
+        value = parse_datetime(raw)
+        if value is None:
+            raise serializers.ValidationError({name: ["Enter a valid ISO 8601 datetime."]})
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+    def get(self, request, pk):
+        """Return counts, total duration and mean threshold per bucket."""
+        bucket = request.query_params.get("bucket", "hour")
+        if bucket not in BUCKET_SIZES:
+            raise serializers.ValidationError(
+                {"bucket": [f"Choose one of: {', '.join(BUCKET_SIZES)}."]}
+            )
+        end = self._parse_datetime("end", timezone.now())
+        start = self._parse_datetime("start", end - self.default_spans[bucket])
+        if start >= end:
+            raise serializers.ValidationError({"start": ["Must be earlier than end."]})
+        if (end - start) / BUCKET_SIZES[bucket] > self.max_buckets:
+            raise serializers.ValidationError(
+                {"bucket": [f"Range spans more than {self.max_buckets} buckets."]}
+            )
+
+        field = serializers.DateTimeField()
+        results = motion_activity(pk, bucket, start, end)
+        for row in results:
+            row["bucket_start"] = field.to_representation(row["bucket_start"])
+        return Response({
+            "camera": pk,
+            "bucket": bucket,
+            "start": field.to_representation(start),
+            "end": field.to_representation(end),
+            "results": results,
+        })
+
+
+class CameraImagesList(
+    ConditionalGetMixin, CachedResponseMixin, FastListMixin, generics.ListAPIView
+):
     """
     GET: List all images for a specific camera
     """
+    cache_resources = ("image", "motion")
     serializer_class = ImageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["filepath", "filesize", "motion_event"]
 
     def get_queryset(self):
         """Return images filtered by camera ID via motion event."""
         camera_id = self.kwargs['pk']
-        return Image.objects.filter(motion_event__camera_id=camera_id)
+        return Image.objects.visible().filter(camera_id=camera_id)
+
+
+class CameraImagesExport(StreamingExportView):
+    """
+    GET: Stream all images for a specific camera as NDJSON or CSV
+    """
+    serializer_class = ImageSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["filepath", "filesize", "motion_event"]
+    export_columns = {
+        "id": "id",
+        "camera": "camera_id",
+        "motion_event": "motion_event_id",
+        "filepath": "filepath",
+        "filesize": "filesize",
+        "created_at": "created_at",
+    }
+    export_filename = "camera-{pk}-images"
+
+    def get_queryset(self):
+        """Return images of the camera in creation order."""
+        return (
+            Image.objects.visible()
+            .filter(camera_id=self.kwargs['pk'])
+            .order_by("created_at", "id")
+        )
+
+
+class AsyncCameraList(AsyncListCreateView):
+    """
+    GET: List all cameras, without filters
+    POST: Create a new camera
+    """
+    serializer_class = CameraSerializer
+    allow_create = True
+
+    def get_queryset(self):
+        return Camera.objects.visible().order_by("id")
+
+
+class AsyncCameraDetail(AsyncDetailView):
+    """
+    GET: Retrieve a specific camera
+    """
+    serializer_class = CameraSerializer
+
+    def get_queryset(self):
+        return Camera.objects.visible()
+
+
+class AsyncCameraMotionsList(AsyncListCreateView):
+    """
+    GET: List all motion events for a specific camera, without filters
+    """
+    serializer_class = MotionEventSerializer
+    pagination_class = TimestampKeysetPagination
+
+    def get_queryset(self):
+        return MotionEvent.objects.visible().filter(camera_id=self.kwargs["pk"])
+
+
+class AsyncCameraImagesList(AsyncListCreateView):
+    """
+    GET: List all images for a specific camera, without filters
+    """
+    serializer_class = ImageSerializer
+    pagination_class = CreatedAtKeysetPagination
+
+    def get_queryset(self):
+        return Image.objects.visible().filter(camera_id=self.kwargs["pk"])
@@ -0,0 +1,29 @@
+"""
+Filters for the detections app.
+"""
+import django_filters
+
+from .models import Detection
+
+
+class DetectionFilter(django_filters.FilterSet):
+    """
+    Filter detections by class, confidence range, camera, source and time.
+
+    ``camera`` matches detections whose motion event or image belongs to the
+    camera, through the denormalized ``camera`` column and its
+    ``(camera, created_at, id)`` index.
+    """
+    min_confidence = django_filters.NumberFilter(field_name="confidence", lookup_expr="gte")
+    max_confidence = django_filters.NumberFilter(field_name="confidence", lookup_expr="lte")
+    camera = django_filters.NumberFilter(method="filter_camera")
+    created_after = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="gte")
+    created_before = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="lt")
+
+    class Meta:
+        model = Detection
+        fields = ["object_class", "motion_event", "image"]
+
+    def filter_camera(self, queryset, name, value):
+        """Keep detections of motion events or images recorded by camera ``value``."""
+        return queryset.filter(camera_id=value)
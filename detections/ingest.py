@@ -0,0 +1,110 @@
+"""
+Batched creation of detections.
+
+Inference workers post every detection of a frame in one request. The batch
+is validated in one pass, with one query per referenced model, and the valid
+detections are written with a single ``bulk_create``.
+"""
+from django.db import transaction
+
+from eyesedge.cache import bump_generation
+from eyesedge.schema_validation import schema_registry, validate_batch_with_schema
+from images.models import Image
+from motions.models import MotionEvent
+
+from .models import Detection
+from .serializers import DetectionSerializer
+from .signals import detections_created
+
+
+def _missing(pk, name):
+    return {name: [f'Invalid pk "{pk}" - object does not exist.']}
+
+
+def validate_batch(items):
+    """
+    Validate every item of a batch.
+
+    Returns a list aligned with ``items`` holding ``None`` for valid items and
+    an error dict for invalid ones. Items with only an ``image`` get the
+    image's motion event filled in, and every valid item gets the ``camera``
+    of its motion event.
+    """
+    errors = validate_batch_with_schema(
+        items, schema_registry.validator(DetectionSerializer)
+    )
+    valid = [item for item, error in zip(items, errors) if error is None]
+    event_ids = {item["motion_event"] for item in valid if item.get("motion_event")}
+    image_ids = {item["image"] for item in valid if item.get("image")}
+    event_cameras = dict(
+        MotionEvent.objects.visible().filter(pk__in=event_ids).values_list("pk", "camera_id")
+    )
+    known_events = set(event_cameras)
+    image_events = {}
+    for pk, event_id, camera_id in Image.objects.visible().filter(pk__in=image_ids).values_list(
+        "pk", "motion_event_id", "motion_event__camera_id"
+    ):
+        image_events[pk] = event_id
+        event_cameras.setdefault(event_id, camera_id)
+
+    for index, item in enumerate(items):
+        if errors[index] is not None:
+            continue
+        motion_event, image = item.get("motion_event"), item.get("image")
+        if motion_event is None and image is None:
+            errors[index] = {"non_field_errors": ["Set motion_event, image or both."]}
+        elif motion_event is not None and motion_event not in known_events:
+            errors[index] = _missing(motion_event, "motion_event")
+        elif image is not None and image not in image_events:
+            errors[index] = _missing(image, "image")
+        elif image is not None and motion_event is None:
+            item["motion_event"] = image_events[image]
+        elif image is not None and image_events[image] != motion_event:
+            errors[index] = {"image": ["Image belongs to a different motion event."]}
+        if errors[index] is None:
+            item["camera"] = event_cameras[item["motion_event"]]
+    return errors
+
+
+@transaction.atomic
+def write_batch(items):
+    """
+    Write validated items with one INSERT and return the new detections.
+
+    Alerts raised by the detections are written in the same transaction.
+    """
+    detections = Detection.objects.bulk_create([
+        Detection(
+            motion_event_id=item.get("motion_event"),
+            image_id=item.get("image"),
+            camera_id=item.get("camera"),
+            object_class=item["object_class"],
+            confidence=item["confidence"],
+        )
+        for item in items
+    ])
+    # bulk_create sends no model signals, so invalidate cached responses here.
+    bump_generation("detection")
+    detections_created.send(sender=Detection, detections=detections)
+    return detections
+
+
+def ingest_batch(items):
+    """
+    Validate and write a batch, returning per-item results.
+
+    Valid items are written even when others in the batch fail; each result
+    carries its ``index`` in the request and a ``status`` of ``created`` or
+    ``error``.
+    """
+    errors = validate_batch(items)
+    valid = [item for item, error in zip(items, errors) if error is None]
+    written = iter(write_batch(valid) if valid else [])
+
+    results = []
+    for index, error in enumerate(errors):
+        if error is None:
+            results.append({"index": index, "status": "created", "id": next(written).pk})
+        else:
+            results.append({"index": index, "status": "error", "errors": error})
+    return results
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detections', '0002_alter_detection_confidence'),
+        ('images', '0003_keyset_indexes'),
+        ('motions', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(fields=['object_class', 'confidence'], name='detection_class_conf_idx'),
+        ),
+    ]
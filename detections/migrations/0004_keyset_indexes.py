@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detections', '0003_detection_class_conf_index'),
+        ('images', '0003_keyset_indexes'),
+        ('motions', '0005_motion_activity_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(fields=['created_at', 'id'], name='detection_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(fields=['object_class', 'created_at', 'id'], name='detection_class_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cameras', '0004_deferred_delete'),
+        ('detections', '0004_keyset_indexes'),
+        ('images', '0004_brin_indexes'),
+        ('motions', '0007_brin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detection',
+            name='camera',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='detections', to='cameras.camera'),
+        ),
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(fields=['camera', 'created_at', 'id'], name='detection_cam_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+"""
+Copy the camera of each detection's motion event, or of its image's motion
+event, into ``Detection.camera``.
+
+The migration is not atomic: every chunk of primary keys is committed on its
+own, so a large table is never locked for the whole backfill, and a run that
+is interrupted resumes with the rows still missing their camera.
+"""
+from django.db import migrations
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+CHUNK_SIZE = 5000
+
+
+def backfill_detection_camera(apps, schema_editor):
+    Detection = apps.get_model("detections", "Detection")
+    Image = apps.get_model("images", "Image")
+    MotionEvent = apps.get_model("motions", "MotionEvent")
+    camera = Coalesce(
+        Subquery(
+            MotionEvent.objects.filter(pk=OuterRef("motion_event_id")).values("camera_id")[:1]
+        ),
+        Subquery(
+            Image.objects.filter(pk=OuterRef("image_id")).values("motion_event__camera_id")[:1]
+        ),
+    )
+    last = Detection.objects.aggregate(last=Max("pk"))["last"] or 0
+    for start in range(0, last + 1, CHUNK_SIZE):
+        Detection.objects.filter(
+            pk__gte=start, pk__lt=start + CHUNK_SIZE, camera__isnull=True
+        ).update(camera_id=camera)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('alerts', '0002_seed_example_data'),
+        ('detections', '0005_detection_camera'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_detection_camera, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,28 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from images.models import related_camera_id
+
+
+class DetectionQuerySet(models.QuerySet):
+    """Query helpers shared by the detection endpoints."""
+
+    def visible(self):
+        """Exclude detections whose motion event, image or camera is waiting for deletion."""
+        return (
+            self.exclude(motion_event__deleting=True)
+            .exclude(image__motion_event__deleting=True)
+            .exclude(camera__deleting=True)
+        )
+
 
 class Detection(models.Model):
+    """
+    An object detected in a motion event, an image of it, or both.
+
+    ``camera`` is a copy of the motion event's camera, kept in sync on save,
+    so camera-scoped queries read one table.
+    """
     motion_event = models.ForeignKey(
         "motions.MotionEvent",
         on_delete=models.CASCADE,
@@ -17,9 +37,40 @@ class Detection(models.Model):
         null=True,
         blank=True,
     )
+    camera = models.ForeignKey(
+        "cameras.Camera",
+        on_delete=models.CASCADE,
+        related_name="detections",
+        null=True,
+        editable=False,
+    )
     object_class = models.CharField(max_length=100)
     confidence = models.FloatField(validators=[MinValueValidator(0.0), MaxValueValidator(1.0)])
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = DetectionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["object_class", "confidence"], name="detection_class_conf_idx"),
+            models.Index(fields=["created_at", "id"], name="detection_created_id_idx"),
+            models.Index(
+                fields=["object_class", "created_at", "id"], name="detection_class_created_id_idx"
+            ),
+            models.Index(
+                fields=["camera", "created_at", "id"], name="detection_cam_created_id_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Save the detection with the camera of its motion event or image."""
+        self.camera_id = (
+            related_camera_id(self, "motion_event") or related_camera_id(self, "image")
+        )
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"motion_event", "image"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "camera"}
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return f"{self.object_class} ({self.confidence:.2f})"
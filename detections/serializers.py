@@ -0,0 +1,78 @@
+"""
+Serializers for the detections app.
+Provides serialization for Detection model.
+"""
+from rest_framework import serializers
+from images.models import Image
+from motions.models import MotionEvent
+from .models import Detection
+from eyesedge.metrics import TimedSerializerMixin
+from eyesedge.schema_validation import schema_registry, validate_payload_with_schema
+
+
+@schema_registry.register
+class DetectionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for Detection model, attached to a motion event, an image or both."""
+
+    @staticmethod
+    def _json_schema(partial=False):
+        schema = {
+            "type": "object",
+            "properties": {
+                "motion_event": {
+                    "description": "Related motion event ID",
+                    "type": ["integer", "null"],
+                    "minimum": 1,
+                },
+                "image": {
+                    "description": "Related image ID",
+                    "type": ["integer", "null"],
+                    "minimum": 1,
+                },
+                "object_class": {
+                    "description": "Detected object class name",
+                    "type": "string",
+                    "minLength": 1,
+                    "maxLength": 100,
+                },
+                "confidence": {
+                    "description": "Detector confidence score",
+                    "type": "number",
+                    "minimum": 0,
+                    "maximum": 1,
+                },
+            },
+            "additionalProperties": False,
+        }
+        if not partial:
+            schema["required"] = ["object_class", "confidence"]
+        return schema
+
+    def validate(self, attrs):
+        payload = self.initial_data if isinstance(self.initial_data, dict) else attrs
+        validate_payload_with_schema(
+            payload, schema_registry.validator(type(self), partial=self.partial)
+        )
+        motion_event = attrs.get("motion_event", getattr(self.instance, "motion_event", None))
+        image = attrs.get("image", getattr(self.instance, "image", None))
+        if motion_event is None and image is None:
+            raise serializers.ValidationError(
+                {"non_field_errors": ["Set motion_event, image or both."]}
+            )
+        if image is not None:
+            if motion_event is None:
+                attrs["motion_event"] = image.motion_event
+            elif image.motion_event_id != motion_event.pk:
+                raise serializers.ValidationError(
+                    {"image": ["Image belongs to a different motion event."]}
+                )
+        return super().validate(attrs)
+
+    class Meta:
+        model = Detection
+        fields = ['id', 'motion_event', 'image', 'object_class', 'confidence', 'created_at']
+        read_only_fields = ['created_at']
+        extra_kwargs = {
+            'motion_event': {'queryset': MotionEvent.objects.visible()},
+            'image': {'queryset': Image.objects.visible()},
+        }
@@ -0,0 +1,9 @@
+"""
+Signals for the detections app.
+"""
+from django.dispatch import Signal
+
+# Sent with ``detections``, a list of saved Detection instances, after a bulk
+# write. ``bulk_create`` sends no ``post_save``, so receivers that react to new
+# detections listen to both.
+detections_created = Signal()
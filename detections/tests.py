@@ -1,3 +1,205 @@
-from django.test import TestCase
+"""
+Tests for detection API endpoints.
+"""
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from cameras.models import Camera
+from images.models import Image
+from motions.models import MotionEvent
+from .models import Detection
+
+
+class DetectionAPITest(APITestCase):
+    """
+    Test cases for the detection list, create and filter endpoints.
+    """
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.230:8080/video",
+            resolution="1920x1080",
+        )
+        self.other_camera = Camera.objects.create(
+            address="http://192.168.1.231:8080/video",
+            resolution="1280x720",
+        )
+        self.motion_event = MotionEvent.objects.create(camera=self.camera, duration=1.0)
+        self.other_event = MotionEvent.objects.create(camera=self.other_camera, duration=1.0)
+        self.image = Image.objects.create(
+            motion_event=self.motion_event,
+            filepath="http://example.com/images/detection_1.jpg",
+        )
+        self.person = Detection.objects.create(
+            motion_event=self.motion_event, object_class="person", confidence=0.9
+        )
+        self.car = Detection.objects.create(
+            image=self.image, object_class="car", confidence=0.4
+        )
+        self.other = Detection.objects.create(
+            motion_event=self.other_event, object_class="person", confidence=0.6
+        )
+        self.user = get_user_model().objects.create_user(
+            username="detection_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse("detection-list")
+
+    def _ids(self, params):
+        # Ignore the seed detections shipped with the migrations.
+        own = {self.person.id, self.car.id, self.other.id}
+        response = self.client.get(self.list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item["id"] for item in response.data["results"]} & own
+
+    def test_filter_by_object_class_and_confidence_range(self):
+        self.assertEqual(self._ids({"object_class": "person"}), {self.person.id, self.other.id})
+        self.assertEqual(
+            self._ids({"object_class": "person", "min_confidence": 0.8}), {self.person.id}
+        )
+        self.assertEqual(
+            self._ids({"min_confidence": 0.3, "max_confidence": 0.7}), {self.car.id, self.other.id}
+        )
+
+    def test_filter_by_camera_covers_events_and_images(self):
+        self.assertEqual(self._ids({"camera": self.camera.id}), {self.person.id, self.car.id})
+        self.assertEqual(self._ids({"camera": self.other_camera.id}), {self.other.id})
+
+    def test_filter_by_time(self):
+        Detection.objects.filter(pk=self.other.pk).update(created_at="2020-01-01T00:00:00Z")
+        self.assertEqual(self._ids({"created_before": "2021-01-01T00:00:00Z"}), {self.other.id})
+        self.assertNotIn(self.other.id, self._ids({"created_after": "2021-01-01T00:00:00Z"}))
+
+    def test_create_with_image_fills_in_motion_event(self):
+        response = self.client.post(
+            self.list_url,
+            {"image": self.image.id, "object_class": "dog", "confidence": 0.7},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["motion_event"], self.motion_event.id)
+
+    def test_create_requires_a_source(self):
+        response = self.client.post(
+            self.list_url, {"object_class": "dog", "confidence": 0.7}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_rejects_mismatched_image(self):
+        response = self.client.post(
+            self.list_url,
+            {
+                "motion_event": self.other_event.id,
+                "image": self.image.id,
+                "object_class": "dog",
+                "confidence": 0.7,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("image", response.data)
+
+    def test_detections_of_a_camera_marked_for_deletion_are_hidden(self):
+        self.assertEqual(self._ids({}), {self.person.id, self.car.id, self.other.id})
+        response = self.client.delete(reverse("camera-detail", kwargs={"pk": self.camera.id}))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        self.assertEqual(self._ids({}), {self.other.id})
+        response = self.client.get(reverse("detection-detail", kwargs={"pk": self.car.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(
+            self.list_url,
+            {"image": self.image.id, "object_class": "dog", "confidence": 0.7},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("image", response.data)
+        response = self.client.post(
+            reverse("detection-bulk"),
+            [{"motion_event": self.motion_event.id, "object_class": "dog", "confidence": 0.7}],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("motion_event", response.data["results"][0]["errors"])
+
+    def test_anonymous_detection_endpoints_are_rejected(self):
+        self.client.force_authenticate(user=None)
+        for response in [
+            self.client.get(self.list_url),
+            self.client.post(reverse("detection-bulk"), [], format="json"),
+        ]:
+            self.assertIn(
+                response.status_code,
+                [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN],
+            )
+
+
+class DetectionBulkCreateAPITest(APITestCase):
+    """
+    Test cases for the batched detection endpoint.
+    """
+
+    def setUp(self):
+        camera = Camera.objects.create(
+            address="http://192.168.1.232:8080/video",
+            resolution="1920x1080",
+        )
+        self.motion_event = MotionEvent.objects.create(camera=camera, duration=1.0)
+        self.image = Image.objects.create(
+            motion_event=self.motion_event,
+            filepath="http://example.com/images/detection_bulk.jpg",
+        )
+        self.user = get_user_model().objects.create_user(
+            username="detection_bulk_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("detection-bulk")
+
+    def test_frame_of_detections_is_written_with_one_insert(self):
+        items = [
+            {"image": self.image.id, "object_class": f"class_{i}", "confidence": i / 50}
+            for i in range(50)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 50)
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            Detection.objects.filter(motion_event=self.motion_event, image=self.image).count(), 50
+        )
+
+    def test_partial_batch_reports_per_item_errors(self):
+        items = [
+            {"motion_event": self.motion_event.id, "object_class": "person", "confidence": 0.9},
+            {"motion_event": self.motion_event.id, "object_class": "person", "confidence": 1.5},
+            {"image": self.image.id + 1000, "object_class": "car", "confidence": 0.5},
+        ]
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["created"], 1)
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, ["created", "error", "error"])
+        self.assertIn("image", response.data["results"][2]["errors"])
+
+    def test_bulk_create_invalidates_cached_lists(self):
+        self.client.get(reverse("detection-list"))
+        self.client.post(
+            self.url,
+            [{"image": self.image.id, "object_class": "car", "confidence": 0.5}],
+            format="json",
+        )
+        response = self.client.get(reverse("detection-list"), {"image": self.image.id})
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_non_list_payload_is_rejected(self):
+        response = self.client.post(self.url, {"object_class": "car"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.DetectionList.as_view(), name='detection-list'),
+    path('bulk/', views.DetectionBulkCreate.as_view(), name='detection-bulk'),
+    path('<int:pk>/', views.DetectionDetail.as_view(), name='detection-detail'),
+]
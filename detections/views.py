@@ -1,3 +1,58 @@
-from django.shortcuts import render
+"""
+Views for the detections app.
+Provides API endpoints for detections pushed by the inference workers.
+"""
+from rest_framework import generics
+from rest_framework import permissions
+from django_filters.rest_framework import DjangoFilterBackend
 
-# Create your views here.
+from eyesedge.bulk import BulkIngestView
+from eyesedge.cache import CachedResponseMixin
+from eyesedge.conditional import ConditionalGetMixin
+from eyesedge.fastpath import FastListMixin
+from eyesedge.pagination import CreatedAtKeysetPagination
+
+from .filters import DetectionFilter
+from .ingest import ingest_batch
+from .models import Detection
+from .serializers import DetectionSerializer
+
+
+class DetectionList(
+    ConditionalGetMixin, CachedResponseMixin, FastListMixin, generics.ListCreateAPIView
+):
+    """
+    GET: List all detections
+    POST: Create a new detection
+    """
+    # The camera filter reads the motion event and image relations.
+    cache_resources = ("detection", "motion", "image")
+    queryset = Detection.objects.visible()
+    serializer_class = DetectionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = DetectionFilter
+
+
+class DetectionBulkCreate(BulkIngestView):
+    """
+    POST: Create a batch of detections, for example all detections of one frame
+    """
+    ingest = staticmethod(ingest_batch)
+    expected_message = "Expected a list of detections."
+
+
+class DetectionDetail(
+    ConditionalGetMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    """
+    GET: Retrieve a specific detection
+    PUT: Update a detection
+    DELETE: Delete a detection
+    """
+    # Visibility follows the deletion marks of motion events and images.
+    cache_resources = ("detection", "motion", "image")
+    queryset = Detection.objects.visible()
+    serializer_class = DetectionSerializer
+    permission_classes = [permissions.IsAuthenticated]
@@ -0,0 +1,16 @@
+"""App configuration for the project-wide eyesedge app."""
+from django.apps import AppConfig
+
+
+class EyesedgeConfig(AppConfig):
+    """Django app configuration for shared API infrastructure."""
+
+    name = 'eyesedge'
+
+    def ready(self):
+        """Connect cache invalidation and the live feed to model changes."""
+        # pylint: disable=import-outside-toplevel
+        from .cache import connect_invalidation_signals
+        from .feed import connect_feed_signals
+        connect_invalidation_signals()
+        connect_feed_signals()
@@ -0,0 +1,152 @@
+"""
+Native async views for the camera, motion and image endpoints.
+
+Under ASGI, every DRF view runs in a worker thread behind ``sync_to_async``,
+so each concurrent request holds a thread. The views here are coroutines:
+they read through Django's async ORM (``afirst``, ``aexists``, ``acreate``
+and async iteration) and serialize with the same ``ReadPlan`` as the fast
+list path, so responses are byte-identical to the synchronous endpoints.
+They are served under ``/api/async/`` next to the DRF views.
+
+Only session authentication is supported, matching the API's DRF settings.
+Payloads are validated by the view's DRF serializer in a worker thread, so
+the errors match the synchronous endpoints; the insert goes through the
+async ORM. The list endpoints paginate like their synchronous counterparts but take no
+filters.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from .fastpath import ReadPlan
+
+_renderer = JSONRenderer()
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    """Render ``data`` exactly like DRF's ``JSONRenderer`` would."""
+    return HttpResponse(
+        _renderer.render(data), status=status_code, content_type="application/json"
+    )
+
+
+class AsyncAPIView(View):
+    """
+    Base class of the async views: authentication and the read plan.
+
+    Subclasses set ``serializer_class`` and implement ``get_queryset``,
+    which must only build the queryset, not evaluate it.
+    """
+    serializer_class = None
+
+    def get_queryset(self):
+        """Return the queryset the view reads from."""
+        raise NotImplementedError
+
+    def get_read_plan(self):
+        """Return the compiled read plan of ``serializer_class``."""
+        return ReadPlan.for_serializer_class(self.serializer_class)
+
+    async def authentication_error(self, request):
+        """Return a 403 response for anonymous requests, like DRF, or ``None``."""
+        user = await request.auser()
+        if user.is_authenticated:
+            return None
+        return json_response(
+            {"detail": "Authentication credentials were not provided."},
+            status.HTTP_403_FORBIDDEN,
+        )
+
+    async def represent_one(self, pk):
+        """Return the representation of the row with ``pk``, or ``None``."""
+        plan = self.get_read_plan()
+        row = await plan.rows(self.get_queryset().filter(pk=pk)).afirst()
+        return None if row is None else plan.represent([row])[0]
+
+
+class AsyncListCreateView(AsyncAPIView):
+    """
+    GET: List rows, paginated with ``pagination_class`` when set
+    POST: Create a row, when ``allow_create`` is set
+    """
+    pagination_class = None
+    allow_create = False
+
+    async def get(self, request, **kwargs):
+        """Return the rows, or one page of them."""
+        denied = await self.authentication_error(request)
+        if denied:
+            return denied
+        plan = self.get_read_plan()
+        queryset = self.get_queryset()
+        if self.pagination_class is None:
+            rows = [row async for row in plan.rows(queryset)]
+            return json_response(plan.represent(rows))
+
+        paginator = self.pagination_class()
+        try:
+            page = await paginator.apaginate_queryset(
+                plan.rows(queryset, "id", paginator.ordering_field), request
+            )
+        except NotFound as exc:
+            return json_response({"detail": exc.detail}, exc.status_code)
+        return json_response(paginator.get_paginated_data(plan.represent(page)))
+
+    async def post(self, request, **kwargs):
+        """Validate the payload, create the row and return it with 201."""
+        denied = await self.authentication_error(request)
+        if denied:
+            return denied
+        if not self.allow_create:
+            return json_response(
+                {"detail": 'Method "POST" not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED
+            )
+        try:
+            # DRF parses an empty body as an empty payload.
+            payload = json.loads(request.body or b"{}")
+        except ValueError as exc:
+            return json_response(
+                {"detail": f"JSON parse error - {exc}"}, status.HTTP_400_BAD_REQUEST
+            )
+        # The serializer's validators and related lookups are synchronous, so
+        # only validation runs in a worker thread, with the serializer's errors.
+        serializer = self.serializer_class(data=payload)
+        if not await sync_to_async(serializer.is_valid)():
+            return json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+        model = self.serializer_class.Meta.model
+        try:
+            instance = await model.objects.acreate(**serializer.validated_data)
+        except IntegrityError:
+            # A related row can be gone since validation; the serializer's
+            # create() reports the ones it can, like the synchronous endpoint.
+            try:
+                instance = await sync_to_async(serializer.save)()
+            except ValidationError as exc:
+                return json_response(exc.detail, status.HTTP_400_BAD_REQUEST)
+        return json_response(await self.represent_one(instance.pk), status.HTTP_201_CREATED)
+
+
+class AsyncDetailView(AsyncAPIView):
+    """
+    GET: Retrieve one row
+    """
+
+    async def get(self, request, pk):
+        """Return the row with ``pk`` or 404."""
+        denied = await self.authentication_error(request)
+        if denied:
+            return denied
+        data = await self.represent_one(pk)
+        if data is None:
+            model = self.serializer_class.Meta.model
+            return json_response(
+                {"detail": f"No {model._meta.object_name} matches the given query."},
+                status.HTTP_404_NOT_FOUND,
+            )
+        return json_response(data)
@@ -0,0 +1,55 @@
+"""
+Batch ingest endpoints.
+
+Devices post whole batches of rows, such as every motion event of a
+recording or every detection of a frame. A batch is validated and written
+item by item, and the response carries one result per item, in order, so
+that a device can retry only the items that failed.
+"""
+from rest_framework import permissions
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class BulkIngestView(APIView):
+    """
+    Answer POST with a list of items by passing it to ``ingest``.
+
+    ``ingest`` takes the list and returns one result dict per item, each
+    with a ``status`` of ``"created"`` or ``"error"``. The response is 201
+    Created when every item was created, 400 Bad Request when none was and
+    207 Multi-Status otherwise. ``expected_message`` is the error returned
+    when the body is not a list.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_batch_size = 5000
+    ingest = None
+    expected_message = "Expected a list."
+
+    def post(self, request):
+        """Validate and write the batch, returning one result per item."""
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"non_field_errors": [self.expected_message]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.max_batch_size:
+            return Response(
+                {"non_field_errors": [f"Batches are limited to {self.max_batch_size} items."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = self.ingest(items)
+        created = sum(1 for result in results if result["status"] == "created")
+        if created == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif created == 0:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response(
+            {"created": created, "failed": len(results) - created, "results": results},
+            status=response_status,
+        )
@@ -0,0 +1,205 @@
+"""
+Versioned response cache for the API's list and detail views.
+
+Every cached resource has a generation counter in the cache. Saving or
+deleting a model bumps the generation of its resource, and cached responses
+are keyed on the generations of every resource they read, so a change makes
+the stale entries unreachable instead of waiting for them to expire.
+
+Expensive keys are recomputed under a short cache lock, so a popular list
+that expires is rebuilt by one worker while the others wait for its result.
+"""
+import hashlib
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework.response import Response
+
+# Model label -> resource name whose generation its changes bump.
+CACHED_MODELS = {
+    "cameras.Camera": "camera",
+    "motions.MotionEvent": "motion",
+    "images.Image": "image",
+    "detections.Detection": "detection",
+}
+
+GENERATION_KEY = "eyesedge:generation:{}"
+RESPONSE_KEY = "eyesedge:response:{view}:{generations}:{digest}"
+STATS_KEY = "eyesedge:stats:{view}:{outcome}"
+LOCK_SUFFIX = ":lock"
+
+
+def _generation_key(resource):
+    return GENERATION_KEY.format(resource)
+
+
+def get_generations(resources):
+    """Return the current generation of each resource, initializing missing ones."""
+    keys = [_generation_key(resource) for resource in resources]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Seed with the clock so a generation lost to eviction never
+            # comes back with a value an older cached response was keyed on.
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _bump(resources):
+    for resource in resources:
+        key = _generation_key(resource)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_generation(*resources):
+    """
+    Invalidate every cached response that reads any of ``resources``.
+
+    Bumps immediately and, inside a transaction, once more on commit, so a
+    response cached from a concurrent read of the uncommitted state cannot
+    outlive the transaction.
+    """
+    _bump(resources)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(resources))
+
+
+def _invalidate_on_change(sender, **kwargs):
+    bump_generation(CACHED_MODELS[sender._meta.label])
+
+
+def connect_invalidation_signals():
+    """Bump resource generations whenever a cached model is saved or deleted."""
+    for label in CACHED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_invalidate_on_change, sender=model, dispatch_uid=f"cache:{label}")
+        post_delete.connect(_invalidate_on_change, sender=model, dispatch_uid=f"cache:{label}")
+
+
+def _wait_for(key, lock_key, lock_timeout, poll_interval):
+    """Poll for ``key`` while another worker holds ``lock_key``."""
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        value = cache.get(key)
+        if value is not None or not cache.has_key(lock_key):
+            return value
+    return None
+
+
+def get_or_compute(key, compute, timeout, lock=True, lock_timeout=10, poll_interval=0.05):
+    """
+    Return ``(value, hit)`` for ``key``, computing and storing it on a miss.
+
+    ``compute()`` results of ``None`` are not stored. With ``lock`` set, only
+    the caller that acquires ``key``'s lock computes; the others poll for its
+    result for up to ``lock_timeout`` seconds before computing it themselves.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value, True
+
+    lock_key = key + LOCK_SUFFIX
+    if lock and not cache.add(lock_key, 1, timeout=lock_timeout):
+        value = _wait_for(key, lock_key, lock_timeout, poll_interval)
+        if value is not None:
+            return value, True
+        return compute(), False
+
+    try:
+        value = compute()
+        if value is not None:
+            cache.set(key, value, timeout)
+    finally:
+        if lock:
+            cache.delete(lock_key)
+    return value, False
+
+
+def record_outcome(view_name, outcome):
+    """Increment the ``hit`` or ``miss`` counter of a cached view."""
+    key = STATS_KEY.format(view=view_name, outcome=outcome)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=None)
+
+
+def cache_stats():
+    """Return ``{view: {"hits": n, "misses": n}}`` for every cached view."""
+    keys = {
+        (view, outcome): STATS_KEY.format(view=view, outcome=outcome)
+        for view in sorted(CachedResponseMixin.cached_views)
+        for outcome in ("hit", "miss")
+    }
+    found = cache.get_many(list(keys.values()))
+    return {
+        view: {
+            "hits": found.get(keys[(view, "hit")], 0),
+            "misses": found.get(keys[(view, "miss")], 0),
+        }
+        for view in sorted(CachedResponseMixin.cached_views)
+    }
+
+
+class CachedResponseMixin:
+    """
+    Serve successful list and retrieve responses from the versioned cache.
+
+    Subclasses name the resources their responses read in ``cache_resources``.
+    Authentication and permission checks still run on every request; only
+    the query and serialization work is skipped on a hit. List responses are
+    rebuilt under a lock (see ``get_or_compute``) when ``cache_lock`` is set.
+    """
+    cache_resources = ()
+    cache_timeout = 300
+    cache_lock = True
+    cached_views = set()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_resources:
+            CachedResponseMixin.cached_views.add(cls.__name__)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, super().list, *args, locked=self.cache_lock, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    def get_cache_key(self, request):
+        """Return the response key for this request at the current generations."""
+        generations = "-".join(str(gen) for gen in get_generations(self.cache_resources))
+        digest = hashlib.md5(
+            request.build_absolute_uri().encode("utf-8"), usedforsecurity=False
+        ).hexdigest()
+        return RESPONSE_KEY.format(
+            view=type(self).__name__, generations=generations, digest=digest
+        )
+
+    def cached_response(self, request, handler, *args, locked=False, **kwargs):
+        """Return the cached response for ``request`` or compute and store it."""
+        view_name = type(self).__name__
+        key = self.get_cache_key(request)
+        computed = {}
+
+        def compute():
+            response = handler(request, *args, **kwargs)
+            computed["response"] = response
+            return response.data if response.status_code == 200 else None
+
+        data, hit = get_or_compute(key, compute, self.cache_timeout, lock=locked)
+        record_outcome(view_name, "hit" if hit else "miss")
+        if "response" in computed:
+            return computed["response"]
+        return Response(data)
@@ -0,0 +1,214 @@
+"""
+Shared cache backends for multi-worker deployments.
+
+``SQLiteCache`` keeps the cache in one SQLite file that every worker process
+on the host opens, so cached responses and generation counters are shared
+without an external service. ``CompressingRedisSerializer`` plugs the same
+payload compression into Django's built-in Redis backend.
+"""
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.redis import RedisSerializer
+
+PLAIN = b"\x00"
+COMPRESSED = b"\x01"
+
+
+class CompressingSerializer:
+    """
+    Pickle values and zlib-compress the ones larger than ``min_length`` bytes.
+
+    Serialized values carry a one-byte marker so compressed and plain
+    payloads can be told apart when read back.
+    """
+
+    def __init__(self, min_length=1024, level=6, protocol=pickle.HIGHEST_PROTOCOL):
+        self.min_length = min_length
+        self.level = level
+        self.protocol = protocol
+
+    def dumps(self, obj):
+        """Return the marked, possibly compressed, pickle of ``obj``."""
+        data = pickle.dumps(obj, self.protocol)
+        if len(data) >= self.min_length:
+            return COMPRESSED + zlib.compress(data, self.level)
+        return PLAIN + data
+
+    def loads(self, data):
+        """Return the object serialized by ``dumps``."""
+        data = bytes(data)
+        if data[:1] == COMPRESSED:
+            return pickle.loads(zlib.decompress(data[1:]))
+        return pickle.loads(data[1:])
+
+
+class CompressingRedisSerializer(RedisSerializer):
+    """
+    Redis serializer compressing large payloads.
+
+    Integers stay unpickled, as in ``RedisSerializer``, so ``incr()`` remains
+    atomic on the server. Enable it with
+    ``"OPTIONS": {"serializer": "eyesedge.cache_backends.CompressingRedisSerializer"}``.
+    """
+    min_length = 1024
+    level = 6
+
+    def __init__(self, protocol=None):
+        super().__init__(protocol)
+        self._codec = CompressingSerializer(self.min_length, self.level, self.protocol)
+
+    def dumps(self, obj):
+        if type(obj) is int:  # pylint: disable=unidiomatic-typecheck
+            return obj
+        return self._codec.dumps(obj)
+
+    def loads(self, data):
+        try:
+            return int(data)
+        except ValueError:
+            return self._codec.loads(data)
+
+
+class SQLiteCache(BaseCache):
+    """
+    Cache stored in a SQLite file shared by all processes on a host.
+
+    ``LOCATION`` is the database path. ``OPTIONS`` accepts ``MAX_ENTRIES`` and
+    ``CULL_FREQUENCY`` like the built-in backends, plus
+    ``COMPRESS_MIN_LENGTH`` and ``COMPRESS_LEVEL`` for payload compression.
+    Integers are stored natively so ``incr()`` is a single atomic UPDATE.
+    """
+    CULL_CHECK_EVERY = 64
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._path = str(location)
+        self._codec = CompressingSerializer(
+            min_length=int(options.get("COMPRESS_MIN_LENGTH", 1024)),
+            level=int(options.get("COMPRESS_LEVEL", 6)),
+        )
+        self._local = threading.local()
+        self._writes = 0
+
+    @property
+    def _db(self):
+        """Return this thread's connection, creating the table on first use."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+            self._local.db = db
+        return db
+
+    def _encode(self, value):
+        if type(value) is int:  # pylint: disable=unidiomatic-typecheck
+            return value
+        return self._codec.dumps(value)
+
+    def _decode(self, value):
+        if isinstance(value, int):
+            return value
+        return self._codec.loads(value)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._db.execute(
+            "INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires "
+            "WHERE cache.expires IS NOT NULL AND cache.expires <= ?",
+            (key, self._encode(value), self.get_backend_timeout(timeout), time.time()),
+        )
+        if cursor.rowcount:
+            self._maybe_cull()
+        return cursor.rowcount > 0
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._db.execute(
+            "SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+        if row is None:
+            return default
+        return self._decode(row[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._db.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, self._encode(value), self.get_backend_timeout(timeout)),
+        )
+        self._maybe_cull()
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._db.execute(
+            "UPDATE cache SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (self.get_backend_timeout(timeout), key, time.time()),
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._db.execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount > 0
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._db.execute(
+            "SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return row is not None
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._db.execute(
+            "UPDATE cache SET value = value + ? WHERE key = ? AND typeof(value) = 'integer' "
+            "AND (expires IS NULL OR expires > ?) RETURNING value",
+            (delta, key, time.time()),
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Key '{key}' not found or not an integer")
+        return row[0]
+
+    def clear(self):
+        self._db.execute("DELETE FROM cache")
+
+    def close(self, **kwargs):
+        """Keep the per-thread connection open across requests."""
+
+    def _maybe_cull(self):
+        """
+        Drop expired entries, then the soonest-expiring ones, once over
+        ``MAX_ENTRIES``. Entries without expiry, such as the response cache's
+        generation counters, are never culled. Checked every ``CULL_CHECK_EVERY``
+        writes to keep ``set()`` cheap.
+        """
+        self._writes += 1
+        if self._writes % self.CULL_CHECK_EVERY:
+            return
+        db = self._db
+        count = db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count <= self._max_entries:
+            return
+        db.execute("DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+        count = db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count > self._max_entries and self._cull_frequency:
+            db.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache WHERE expires IS NOT NULL "
+                "ORDER BY expires LIMIT ?)",
+                (max(count // self._cull_frequency, 1),),
+            )
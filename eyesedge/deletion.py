@@ -0,0 +1,41 @@
+"""
+Deferred deletion for resources with large dependent histories.
+
+Deleting a camera or motion event through Django's cascade collector loads
+every dependent row and deletes them in one transaction, which blocks the
+request and holds write locks for as long as the history is large. Instead,
+DELETE only marks the row ``deleting`` and answers 202 Accepted; the row and
+its dependents drop out of the list and detail views at once and are
+removed in bounded chunks by ``manage.py process_deletions``.
+"""
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import bump_generation
+
+
+class DeferredDestroyMixin:
+    """
+    Answer DELETE by marking the object ``deleting`` instead of deleting it.
+
+    The view's model must have a ``deleting`` flag that its queryset
+    excludes. ``deferred_delete_resources`` lists the cache resources whose
+    responses can include the object or its dependents.
+    """
+    deferred_delete_resources = ()
+
+    def mark_for_deletion(self, instance):
+        """Mark ``instance`` ``deleting``; return whether this call marked it."""
+        model = type(instance)
+        return bool(model.objects.filter(pk=instance.pk, deleting=False).update(deleting=True))
+
+    def destroy(self, request, *args, **kwargs):
+        """Mark the object for deletion and return 202 Accepted."""
+        instance = self.get_object()
+        self.mark_for_deletion(instance)
+        # update() sends no model signals, so invalidate cached responses here.
+        bump_generation(*self.deferred_delete_resources)
+        return Response(
+            {"id": instance.pk, "status": "deleting"},
+            status=status.HTTP_202_ACCEPTED,
+        )
@@ -0,0 +1,328 @@
+"""
+Live feed of new motion events, images and detections.
+
+Dashboards used to discover new rows by re-polling the camera lists, one
+filtered query per dashboard per poll. ``FeedHub`` is an in-process change
+feed instead: every committed insert, saved one by one or written by the
+bulk ingest endpoints, is appended once to a bounded buffer, and any number
+of waiting clients are woken to read it from memory.
+
+Two async endpoints read the hub: ``FeedStreamView`` sends Server-Sent
+Events and ``FeedPollView`` answers long-poll requests. Entry IDs carry the
+hub's epoch, so a client resuming with the ID of its last entry after a
+restart, or after the buffer moved past it, is told to reset and reload the
+lists instead of silently missing rows.
+
+The hub only sees writes made by its own process; run the API as a single
+ASGI process, or poll the lists, when writes come from other processes.
+"""
+import asyncio
+import json
+import math
+import secrets
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.http import StreamingHttpResponse
+from rest_framework import status
+
+from .async_views import AsyncAPIView, json_response
+
+FEED_KINDS = ("motion", "image", "detection")
+
+
+def feed_settings():
+    """Return ``settings.FEED`` merged over the defaults."""
+    defaults = {"BUFFER_SIZE": 10000, "MAX_WAIT": 30, "HEARTBEAT": 15}
+    return {**defaults, **getattr(settings, "FEED", {})}
+
+
+class FeedEntry:
+    """One new row: its sequence number, kind, camera and instance."""
+    __slots__ = ("sequence", "kind", "camera_id", "instance", "_data")
+
+    def __init__(self, sequence, kind, camera_id, instance):
+        self.sequence = sequence
+        self.kind = kind
+        self.camera_id = camera_id
+        self.instance = instance
+        self._data = None
+
+    def data(self):
+        """Return the serialized row, computed once for every reader."""
+        if self._data is None:
+            # pylint: disable=import-outside-toplevel
+            from detections.serializers import DetectionSerializer
+            from images.serializers import ImageSerializer
+            from motions.serializers import MotionEventSerializer
+
+            serializer_class = {
+                "motion": MotionEventSerializer,
+                "image": ImageSerializer,
+                "detection": DetectionSerializer,
+            }[self.kind]
+            self._data = serializer_class(self.instance).data
+        return self._data
+
+
+class FeedHub:
+    """
+    A bounded, thread-safe buffer of ``FeedEntry`` with async waiters.
+
+    Writers call ``publish`` from any thread; readers call ``read`` or
+    ``wait`` with the sequence number of the last entry they saw. Only the
+    latest ``size`` entries are kept.
+    """
+
+    def __init__(self, size=None):
+        self.size = size or feed_settings()["BUFFER_SIZE"]
+        self.epoch = secrets.token_hex(4)
+        self.sequence = 0
+        self.entries = []
+        self.lock = threading.Lock()
+        self.waiters = set()
+
+    def event_id(self, sequence):
+        """Return the client-facing ID of ``sequence``."""
+        return f"{self.epoch}-{sequence}"
+
+    def resume_position(self, event_id):
+        """
+        Return ``(sequence, reset)`` to resume after ``event_id``.
+
+        Without an ID, reading starts at the current position. IDs of another
+        epoch or beyond the current position start there too, with ``reset``.
+        """
+        if not event_id:
+            return self.sequence, False
+        epoch, _, sequence = event_id.partition("-")
+        if epoch != self.epoch or not sequence.isdigit() or int(sequence) > self.sequence:
+            return self.sequence, True
+        return int(sequence), False
+
+    def publish(self, kind, items):
+        """Append ``(camera ID, instance)`` pairs of ``kind`` and wake every waiter."""
+        if not items:
+            return
+        with self.lock:
+            for camera_id, instance in items:
+                self.sequence += 1
+                self.entries.append(FeedEntry(self.sequence, kind, camera_id, instance))
+            if len(self.entries) > 2 * self.size:
+                # Trim in batches so appends stay amortized O(1).
+                del self.entries[:-self.size]
+            waiters = list(self.waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The waiter's loop closed before it unregistered.
+                pass
+
+    def read(self, after, cameras=None):
+        """
+        Return ``(entries, position, missed)`` for entries after ``after``.
+
+        ``entries`` are limited to the ``cameras`` set when given, ``position``
+        is the sequence to read after next time, and ``missed`` tells whether
+        entries after ``after`` were already dropped from the buffer.
+        """
+        with self.lock:
+            position = self.sequence
+            first = self.entries[0].sequence if self.entries else position + 1
+            missed = after < first - 1
+            new = self.entries[max(0, after - first + 1):]
+        if cameras is not None:
+            new = [entry for entry in new if entry.camera_id in cameras]
+        return new, position, missed
+
+    async def wait(self, after, cameras=None, timeout=None):
+        """``read`` as soon as there are matching entries or ``timeout`` passed."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        waiter = (loop, asyncio.Event())
+        # Register before reading, so a publish in between is not lost.
+        with self.lock:
+            self.waiters.add(waiter)
+        try:
+            while True:
+                waiter[1].clear()
+                entries, position, missed = self.read(after, cameras)
+                if entries or missed:
+                    return entries, position, missed
+                after = position
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    return entries, position, missed
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self.lock:
+                self.waiters.discard(waiter)
+
+
+hub = FeedHub()
+
+
+def publish_on_commit(kind, instances):
+    """Publish new ``instances`` of ``kind`` once the transaction commits."""
+    instances = list(instances)
+
+    def publish():
+        hub.publish(kind, [(instance.camera_id, instance) for instance in instances])
+
+    if instances:
+        transaction.on_commit(publish)
+
+
+def _publish_on_save(kind):
+    def receiver(sender, instance, created, raw=False, **kwargs):
+        if created and not raw:
+            publish_on_commit(kind, [instance])
+    return receiver
+
+
+def _publish_motion_batch(sender, events, images, **kwargs):
+    publish_on_commit("motion", events)
+    publish_on_commit("image", images)
+
+
+def _publish_detection_batch(sender, detections, **kwargs):
+    publish_on_commit("detection", detections)
+
+
+_RECEIVERS = {kind: _publish_on_save(kind) for kind in FEED_KINDS}
+
+
+def connect_feed_signals():
+    """Publish rows saved one by one or written by the bulk ingest endpoints."""
+    # pylint: disable=import-outside-toplevel
+    from detections.models import Detection
+    from detections.signals import detections_created
+    from images.models import Image
+    from motions.models import MotionEvent
+    from motions.signals import motion_events_created
+
+    for kind, model in zip(FEED_KINDS, (MotionEvent, Image, Detection)):
+        post_save.connect(_RECEIVERS[kind], sender=model, dispatch_uid=f"feed:{kind}")
+    motion_events_created.connect(
+        _publish_motion_batch, sender=MotionEvent, dispatch_uid="feed:motion-batch"
+    )
+    detections_created.connect(
+        _publish_detection_batch, sender=Detection, dispatch_uid="feed:detection-batch"
+    )
+
+
+def entry_data(entry):
+    """Return the client-facing dict of a feed entry."""
+    return {
+        "id": hub.event_id(entry.sequence),
+        "type": entry.kind,
+        "camera": entry.camera_id,
+        "data": entry.data(),
+    }
+
+
+class FeedView(AsyncAPIView):
+    """Shared parameter parsing of the feed endpoints."""
+
+    def get_cameras(self, request):
+        """Return the set of ``camera`` IDs to follow, or ``None`` for all."""
+        values = [
+            part for value in request.GET.getlist("camera") for part in value.split(",") if part
+        ]
+        if not values:
+            return None
+        if not all(value.isdigit() for value in values):
+            raise ValueError("camera must be a list of camera IDs.")
+        return {int(value) for value in values}
+
+
+class FeedStreamView(FeedView):
+    """
+    GET: Stream new motion events, images and detections as Server-Sent Events
+    """
+
+    async def get(self, request):
+        """Open the event stream, resuming after ``Last-Event-ID`` when given."""
+        denied = await self.authentication_error(request)
+        if denied:
+            return denied
+        try:
+            cameras = self.get_cameras(request)
+        except ValueError as exc:
+            return json_response({"camera": [str(exc)]}, status.HTTP_400_BAD_REQUEST)
+        after, reset = hub.resume_position(
+            request.headers.get("Last-Event-ID") or request.GET.get("last_id")
+        )
+        response = StreamingHttpResponse(
+            self.stream(after, cameras, reset), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # Ask reverse proxies not to buffer the stream.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @staticmethod
+    def event(kind, data, event_id=None):
+        """Return one Server-Sent Event."""
+        lines = [f"id: {event_id}"] if event_id else []
+        lines += [f"event: {kind}", f"data: {json.dumps(data, separators=(',', ':'))}"]
+        return "\n".join(lines) + "\n\n"
+
+    async def stream(self, after, cameras, reset):
+        """Yield events forever, with a comment line as heartbeat."""
+        yield "retry: 3000\n\n"
+        if reset:
+            yield self.event("reset", {}, hub.event_id(after))
+        heartbeat = feed_settings()["HEARTBEAT"]
+        while True:
+            entries, after, missed = await hub.wait(after, cameras, heartbeat)
+            if missed:
+                yield self.event("reset", {}, hub.event_id(after))
+                continue
+            if not entries:
+                yield ": heartbeat\n\n"
+            for entry in entries:
+                data = entry_data(entry)
+                yield self.event(entry.kind, data, data.pop("id"))
+
+
+class FeedPollView(FeedView):
+    """
+    GET: Wait for new motion events, images and detections after ``last_id``
+    """
+
+    async def get(self, request):
+        """Return the entries after ``last_id``, waiting up to ``timeout`` seconds."""
+        denied = await self.authentication_error(request)
+        if denied:
+            return denied
+        max_wait = feed_settings()["MAX_WAIT"]
+        try:
+            cameras = self.get_cameras(request)
+        except ValueError as exc:
+            return json_response({"camera": [str(exc)]}, status.HTTP_400_BAD_REQUEST)
+        try:
+            timeout = float(request.GET.get("timeout", max_wait))
+            if not math.isfinite(timeout):
+                # NaN passes min() and max() and would wait forever.
+                raise ValueError(timeout)
+            timeout = min(max(timeout, 0), max_wait)
+        except ValueError:
+            return json_response(
+                {"timeout": ["A valid number is required."]}, status.HTTP_400_BAD_REQUEST
+            )
+        after, reset = hub.resume_position(request.GET.get("last_id"))
+        entries, position, missed = [], after, False
+        if not reset:
+            entries, position, missed = await hub.wait(after, cameras, timeout)
+        return json_response({
+            "last_id": hub.event_id(position),
+            "reset": reset or missed,
+            "events": [] if missed else [entry_data(entry) for entry in entries],
+        })
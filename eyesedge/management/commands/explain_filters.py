@@ -0,0 +1,199 @@
+"""
+Index advisor for the API's filter paths.
+
+Runs every filter combination registered on the list views (their
+``filterset_fields`` or ``filterset_class``) through the database's query planner and reports the
+ones that fall back to a full table scan. Plans are classified as:
+
+* ``index``: every table is read through an index search;
+* ``walk``: a table is read in index order and filtered row by row, which is
+  only cheap while the filter matches most rows;
+* ``SCAN``: a table is read in full.
+
+A ``+sort`` suffix marks plans that sort in a temporary B-tree.
+"""
+import itertools
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+
+FULL_SCAN_PATTERNS = [
+    re.compile(r"\bSCAN (?!CONSTANT ROW)(\w+)$"),
+    re.compile(r"\bSeq Scan on (\w+)"),
+]
+INDEX_WALK_PATTERNS = [
+    re.compile(r"\bSCAN (\w+) USING (?:COVERING )?INDEX"),
+    re.compile(r"\bIndex (?:Only )?Scan (?:Backward )?using \w+ on (\w+)(?!.*Index Cond)"),
+]
+SORT_PATTERNS = [
+    re.compile(r"USE TEMP B-TREE FOR ORDER BY"),
+    re.compile(r"\bSort\b"),
+]
+
+
+def iter_filter_views(patterns=None, prefix=""):
+    """Yield ``(route, name, view_class, kwargs)`` for views declaring filters."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_filter_views(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, "view_class", None)
+            if filter_names(view_class):
+                kwargs = {name: 1 for name in pattern.pattern.converters}
+                yield prefix + str(pattern.pattern), pattern.name, view_class, kwargs
+
+
+def filter_names(view_class):
+    """Return the filter names a view accepts."""
+    filterset_class = getattr(view_class, "filterset_class", None)
+    if filterset_class is not None:
+        return list(filterset_class.base_filters)
+    return list(getattr(view_class, "filterset_fields", None) or [])
+
+
+def sample_value(model, path):
+    """Return a representative filter value for the field at ``path``."""
+    field = None
+    for name in path.split(LOOKUP_SEP):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Method filters such as ``camera`` take a primary key.
+            return 1
+        if field.is_relation:
+            model = field.related_model
+    if field.is_relation:
+        return 1
+    if isinstance(field, models.DateTimeField):
+        return timezone.now()
+    if isinstance(field, models.BooleanField):
+        return True
+    if isinstance(field, models.FloatField):
+        return 0.5
+    if isinstance(field, (models.IntegerField, models.AutoField)):
+        return 1
+    return "x"
+
+
+def apply_filters(view_class, queryset, names):
+    """Restrict ``queryset`` by a sample value for each filter in ``names``."""
+    model = queryset.model
+    filterset_class = getattr(view_class, "filterset_class", None)
+    if filterset_class is None:
+        return queryset.filter(**{name: sample_value(model, name) for name in names})
+    filterset = filterset_class(data={}, queryset=queryset)
+    for name in names:
+        filter_ = filterset.filters[name]
+        queryset = filter_.filter(queryset, sample_value(model, filter_.field_name))
+    return queryset
+
+
+def explain_filters(view_class, kwargs, names):
+    """
+    Return the query plan of the view's queryset restricted by the filters in
+    ``names``, ordered and limited the way its paginator reads a page.
+    """
+    view = view_class()
+    view.kwargs = kwargs
+    view.request = None
+    view.format_kwarg = None
+    queryset = apply_filters(view_class, view.get_queryset(), names)
+    pagination_class = getattr(view_class, "pagination_class", None)
+    ordering_field = getattr(pagination_class, "ordering_field", None)
+    if ordering_field:
+        queryset = queryset.order_by(ordering_field, "id")[:pagination_class.page_size + 1]
+    return queryset.explain()
+
+
+def _matches(patterns, plan):
+    """Return the first group of every line of ``plan`` matching ``patterns``."""
+    found = []
+    for line in plan.splitlines():
+        for pattern in patterns:
+            match = pattern.search(line.strip())
+            if match:
+                found.append(match.group(1) if match.groups() else match.group(0))
+    return found
+
+
+def classify_plan(plan):
+    """Return ``(status, tables, sorts)`` for a query plan, see the module docstring."""
+    sorts = bool(_matches(SORT_PATTERNS, plan))
+    scans = _matches(FULL_SCAN_PATTERNS, plan)
+    if scans:
+        return "SCAN", scans, sorts
+    walks = _matches(INDEX_WALK_PATTERNS, plan)
+    if walks:
+        return "walk", walks, sorts
+    return "index", [], sorts
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN every registered filter combination and report full table scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-combination", type=int, default=2,
+            help="Largest number of filter fields combined in one query (default 2).",
+        )
+        parser.add_argument(
+            "--view", action="append", dest="views",
+            help="Only check the URL name given; may be repeated.",
+        )
+        parser.add_argument(
+            "--fail-on-scan", action="store_true",
+            help="Exit with an error when any combination causes a full scan.",
+        )
+        parser.add_argument(
+            "--verbose-plans", action="store_true",
+            help="Print the full query plan of every combination.",
+        )
+
+    def handle(self, *args, **options):
+        flagged = 0
+        walks = 0
+        checked = 0
+        for route, name, view_class, kwargs in iter_filter_views():
+            if options["views"] and name not in options["views"]:
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name} ({route})"))
+            fields = filter_names(view_class)
+            combinations = [()] + [
+                combo
+                for size in range(1, options["max_combination"] + 1)
+                for combo in itertools.combinations(fields, size)
+            ]
+            for combo in combinations:
+                plan = explain_filters(view_class, kwargs, combo)
+                plan_status, tables, sorts = classify_plan(plan)
+                label = ", ".join(combo) or "(no filter)"
+                checked += 1
+                if plan_status == "SCAN":
+                    flagged += 1
+                    styled = self.style.ERROR(plan_status)
+                elif plan_status == "walk" and combo:
+                    walks += 1
+                    styled = self.style.WARNING(plan_status)
+                else:
+                    styled = self.style.SUCCESS(plan_status)
+                detail = f": {', '.join(tables)}" if tables else ""
+                sort_note = " +sort" if sorts else ""
+                self.stdout.write(f"  {styled:<5} {label}{detail}{sort_note}")
+                if options["verbose_plans"]:
+                    for line in plan.splitlines():
+                        self.stdout.write(f"        {line}")
+
+        summary = (
+            f"{checked} filter combinations checked: {flagged} full table scans, "
+            f"{walks} filtered index walks."
+        )
+        if flagged and options["fail_on_scan"]:
+            raise CommandError(summary)
+        self.stdout.write(summary)
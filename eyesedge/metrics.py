@@ -0,0 +1,264 @@
+"""
+Per-request instrumentation and in-process Prometheus metrics.
+
+``RequestMetricsMiddleware`` wraps every database connection for the
+duration of a request to count queries and SQL time, and collects the time
+spent in the phases timed with ``timed()``: serialization
+(``TimedSerializerMixin``) and JSON Schema validation. The breakdown is
+sent back in a ``Server-Timing`` header, so browser dev tools and load
+testers show whether a slow call is database or serializer bound, and is
+aggregated per view into histograms served by ``metrics_view`` in the
+Prometheus text format.
+
+The histograms live in process memory; every worker process exposes its
+own, and Prometheus sums them across scrape targets.
+"""
+import bisect
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+PHASES = ("serialize", "validate")
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# (metric name, help text, buckets) of every histogram, keyed by sample name.
+HISTOGRAMS = {
+    "duration": ("eyesedge_request_duration_seconds", "Request duration.", SECONDS_BUCKETS),
+    "db": ("eyesedge_request_db_seconds", "SQL time per request.", SECONDS_BUCKETS),
+    "queries": ("eyesedge_request_queries", "SQL queries per request.", QUERY_BUCKETS),
+    "serialize": (
+        "eyesedge_request_serialize_seconds", "Serializer time per request.", SECONDS_BUCKETS
+    ),
+    "validate": (
+        "eyesedge_request_validate_seconds", "Schema validation time per request.",
+        SECONDS_BUCKETS,
+    ),
+    "size": ("eyesedge_response_size_bytes", "Response body size.", SIZE_BUCKETS),
+}
+
+_current = ContextVar("eyesedge_request_metrics", default=None)
+
+
+def metrics_settings():
+    """Return ``settings.METRICS`` merged over the defaults."""
+    defaults = {"SERVER_TIMING": True, "ALLOWED_IPS": ["127.0.0.1", "::1"]}
+    return {**defaults, **getattr(settings, "METRICS", {})}
+
+
+class RequestMetrics:
+    """Counters collected while one request is handled."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.active = set()
+        self.db_measured = True
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper: count the query and time it."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block to ``phase`` of the current request.
+
+    Does nothing outside a request, and nested blocks of the same phase are
+    only counted once.
+    """
+    metrics = _current.get()
+    if metrics is None or phase in metrics.active:
+        yield
+        return
+    metrics.active.add(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.phases[phase] += time.perf_counter() - started
+        metrics.active.discard(phase)
+
+
+class TimedSerializerMixin:
+    """Count ``to_representation`` of a serializer as ``serialize`` time."""
+
+    def to_representation(self, instance):
+        with timed("serialize"):
+            return super().to_representation(instance)
+
+
+class Histogram:
+    """A cumulative histogram with fixed upper bounds, as Prometheus expects."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        """Record one sample."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def cumulative(self):
+        """Yield ``(upper bound, count at or below it)``, ending with ``+Inf``."""
+        running = 0
+        for bound, count in zip([*self.buckets, "+Inf"], self.counts):
+            running += count
+            yield bound, running
+
+
+class MetricsRegistry:
+    """Thread-safe histograms and request counters keyed by view and method."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.requests = {}
+
+    def observe(self, view, method, status, samples):
+        """Record the ``samples`` of one request, keyed like ``HISTOGRAMS``."""
+        with self.lock:
+            key = (view, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            for name, value in samples.items():
+                histogram = self.histograms.get((name, view, method))
+                if histogram is None:
+                    histogram = Histogram(HISTOGRAMS[name][2])
+                    self.histograms[(name, view, method)] = histogram
+                histogram.observe(value)
+
+    def reset(self):
+        """Forget every recorded sample."""
+        with self.lock:
+            self.histograms.clear()
+            self.requests.clear()
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = [
+            "# HELP eyesedge_requests_total Requests handled.",
+            "# TYPE eyesedge_requests_total counter",
+        ]
+        with self.lock:
+            for (view, method, status), count in sorted(self.requests.items()):
+                labels = f'view="{view}",method="{method}",status="{status}"'
+                lines.append(f"eyesedge_requests_total{{{labels}}} {count}")
+            for name, (metric, help_text, _) in HISTOGRAMS.items():
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for (sample, view, method), histogram in sorted(self.histograms.items()):
+                    if sample != name:
+                        continue
+                    labels = f'view="{view}",method="{method}"'
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.total:.6f}")
+                    lines.append(f"{metric}_count{{{labels}}} {sum(histogram.counts)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def server_timing(metrics, total):
+    """Return the ``Server-Timing`` header value for a request."""
+    entries = []
+    if metrics.db_measured:
+        entries.append(f'db;dur={metrics.db_seconds * 1000:.2f};desc="{metrics.queries} queries"')
+    entries += [f"{phase};dur={metrics.phases[phase] * 1000:.2f}" for phase in PHASES]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure every request; add ``Server-Timing`` and record it in ``registry``.
+
+    Place it first in ``MIDDLEWARE`` so the total covers the other
+    middleware. Streaming responses are measured until the view returns,
+    before their body is produced, and recorded without a size.
+
+    Under ASGI the middleware runs as a coroutine. The async ORM executes
+    queries on connections owned by a worker thread, out of reach of the
+    execute wrappers, so async requests are recorded without the ``db`` and
+    ``queries`` samples.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        metrics.db_measured = False
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def record(request, response, metrics, total):
+        """Add ``Server-Timing`` to ``response`` and record the request."""
+        if metrics_settings()["SERVER_TIMING"]:
+            response["Server-Timing"] = server_timing(metrics, total)
+
+        match = getattr(request, "resolver_match", None)
+        samples = {"duration": total, **metrics.phases}
+        if metrics.db_measured:
+            samples.update(db=metrics.db_seconds, queries=metrics.queries)
+        if not response.streaming:
+            samples["size"] = len(response.content)
+        registry.observe(
+            match.view_name if match else "unmatched", request.method,
+            response.status_code, samples,
+        )
+
+
+def metrics_view(request):
+    """Serve ``registry`` in the Prometheus text format to ``ALLOWED_IPS``."""
+    if request.META.get("REMOTE_ADDR") not in metrics_settings()["ALLOWED_IPS"]:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
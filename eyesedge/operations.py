@@ -0,0 +1,56 @@
+"""
+Migration operations that only apply on some database backends.
+"""
+from django.db.migrations.operations.base import Operation
+
+
+class AddBrinIndex(Operation):
+    """
+    Create a BRIN index on PostgreSQL and do nothing elsewhere.
+
+    BRIN indexes store the value range of each block of table pages, so an
+    index over an append-only timestamp stays a few pages large and still
+    narrows time range scans to the matching blocks. SQLite has no BRIN and
+    relies on the B-tree indexes declared on the models. The index is not
+    part of the model state, so ``makemigrations`` never tries to alter it.
+    """
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, model_name, field, name, pages_per_range=32):
+        self.model_name = model_name
+        self.field = field
+        self.name = name
+        self.pages_per_range = pages_per_range
+
+    def deconstruct(self):
+        kwargs = {"model_name": self.model_name, "field": self.field, "name": self.name}
+        if self.pages_per_range != 32:
+            kwargs["pages_per_range"] = self.pages_per_range
+        return self.__class__.__name__, [], kwargs
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        quote = schema_editor.quote_name
+        column = model._meta.get_field(self.field).column
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {quote(self.name)} ON {quote(model._meta.db_table)} "
+            f"USING brin ({quote(column)}) WITH (pages_per_range = {int(self.pages_per_range)})"
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(self.name)}")
+
+    def describe(self):
+        return f"Create BRIN index {self.name} on {self.model_name}.{self.field} (PostgreSQL only)"
+
+    @property
+    def migration_name_fragment(self):
+        return self.name.lower()
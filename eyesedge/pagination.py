@@ -0,0 +1,161 @@
+"""Keyset (cursor) pagination for the time-ordered list endpoints."""
+
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def query_params(request):
+    """Return the query parameters of a DRF or a plain Django request."""
+    return getattr(request, "query_params", request.GET)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate on the ascending key ``(ordering_field, id)``.
+
+    The cursor is an opaque token holding the key of the last row served, so
+    every page is an index range scan however deep it is. Responses always
+    carry the cursor of the last row seen; polling with it returns only rows
+    added since.
+    """
+
+    ordering_field = "created_at"
+    cursor_query_param = "cursor"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows = list(self.page_queryset(queryset, request))
+        return self.set_page(rows)
+
+    async def apaginate_queryset(self, queryset, request):
+        """``paginate_queryset`` for async views, reading through the async ORM."""
+        rows = [row async for row in self.page_queryset(queryset, request)]
+        return self.set_page(rows)
+
+    def page_queryset(self, queryset, request):
+        """Return the unevaluated queryset of the requested page plus one row."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self.cursor_filter(*self.cursor))
+        return queryset.order_by(self.ordering_field, "id")[:self.page_size + 1]
+
+    def set_page(self, rows):
+        """Keep the page out of ``rows``, which hold one row past it if there is more."""
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def cursor_filter(self, value, pk):
+        """
+        Return the filter for rows strictly after ``(value, pk)``.
+
+        The leading ``>=`` term lets the database seek into the composite
+        index instead of evaluating the disjunction row by row.
+        """
+        field = self.ordering_field
+        return Q(**{f"{field}__gte": value}) & (
+            Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": pk})
+        )
+
+    def get_page_size(self, request):
+        """Return the requested page size, clamped to ``max_page_size``."""
+        try:
+            size = int(query_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        """Return the ``(value, id)`` key encoded in the request cursor, if any."""
+        token = query_params(request).get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            raw_value, pk = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            value = parse_datetime(raw_value)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message) from None
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        if timezone.is_naive(value):
+            # Read in the default time zone, as the ORM would filter on it.
+            value = timezone.make_aware(value)
+        return value, pk
+
+    def encode_cursor(self, row):
+        """
+        Return the opaque cursor token positioned after ``row``, a model
+        instance or a ``values()`` dict.
+        """
+        if isinstance(row, dict):
+            key = [row[self.ordering_field].isoformat(), row["id"]]
+        else:
+            key = [getattr(row, self.ordering_field).isoformat(), row.pk]
+        raw = json.dumps(key, separators=(",", ":")).encode("ascii")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def get_cursor(self):
+        """Return the cursor clients should resume or poll from."""
+        if self.page:
+            return self.encode_cursor(self.page[-1])
+        return query_params(self.request).get(self.cursor_query_param) or None
+
+    def get_next_link(self):
+        """Return the URL of the next page, or ``None`` when this is the last one."""
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.get_cursor())
+
+    def get_paginated_data(self, data):
+        """Return the response body for a page serialized as ``data``."""
+        return {
+            "next": self.get_next_link(),
+            "cursor": self.get_cursor(),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "cursor": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+
+class TimestampKeysetPagination(KeysetPagination):
+    """Keyset pagination for motion events, ordered on ``(timestamp, id)``."""
+
+    ordering_field = "timestamp"
+
+
+class CreatedAtKeysetPagination(KeysetPagination):
+    """Keyset pagination for images, ordered on ``(created_at, id)``."""
+
+    ordering_field = "created_at"
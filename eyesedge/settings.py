@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'django_filters',
+    'eyesedge',
     'cameras',
     'motions',
     'images',
@@ -55,6 +57,7 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    'eyesedge.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,6 +69,8 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'eyesedge.urls'
 
+TEST_RUNNER = 'eyesedge.test_runner.CacheIsolatingTestRunner'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -86,14 +91,82 @@ WSGI_APPLICATION = 'eyesedge.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
+# EYESEDGE_DATABASE selects the backend: "sqlite" (the default, one file at
+# EYESEDGE_DB_PATH) or "postgres" (needs the psycopg[pool] package and the
+# EYESEDGE_PG_* variables below).
+#
+# EYESEDGE_SQLITE_PROFILE selects the SQLite connection settings: "tuned"
+# or "plain" (SQLite's defaults, one connection per request). It defaults to
+# "tuned" for a database at EYESEDGE_DB_PATH and to "plain" for the checked-in
+# development db.sqlite3, because WAL mode is written into the database file
+# and would modify the tracked file. The tuned profile runs these pragmas on every new connection: WAL lets
+# readers proceed while a writer commits, synchronous=NORMAL is durable under
+# WAL except on power loss, busy_timeout waits for a lock instead of failing
+# with "database is locked", and mmap_size/cache_size keep hot pages in
+# memory. Connections are reused for CONN_MAX_AGE seconds, and transactions
+# start with BEGIN IMMEDIATE so writers queue on busy_timeout instead of
+# failing when a read lock cannot be upgraded.
+#
+# PostgreSQL connections come from a psycopg pool of PG_POOL["min_size"] to
+# PG_POOL["max_size"] connections per process, checked before reuse.
+
+EYESEDGE_DATABASE = os.environ.get("EYESEDGE_DATABASE", "sqlite")
+EYESEDGE_SQLITE_PROFILE = os.environ.get(
+    "EYESEDGE_SQLITE_PROFILE", "tuned" if "EYESEDGE_DB_PATH" in os.environ else "plain"
+)
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+PG_POOL = {
+    "min_size": int(os.environ.get("EYESEDGE_PG_POOL_MIN", 2)),
+    "max_size": int(os.environ.get("EYESEDGE_PG_POOL_MAX", 10)),
+    "timeout": 10,
 }
 
+if EYESEDGE_DATABASE == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("EYESEDGE_PG_NAME", "eyesedge"),
+            "USER": os.environ.get("EYESEDGE_PG_USER", "eyesedge"),
+            "PASSWORD": os.environ.get("EYESEDGE_PG_PASSWORD", ""),
+            "HOST": os.environ.get("EYESEDGE_PG_HOST", "127.0.0.1"),
+            "PORT": os.environ.get("EYESEDGE_PG_PORT", "5432"),
+            # Pooled connections are returned to the pool after each request;
+            # the pool keeps them open, so CONN_MAX_AGE must stay 0.
+            "CONN_MAX_AGE": 0,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {"pool": PG_POOL},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get("EYESEDGE_DB_PATH", BASE_DIR / 'db.sqlite3'),
+        }
+    }
+
+    if EYESEDGE_SQLITE_PROFILE == "tuned":
+        DATABASES["default"].update({
+            "CONN_MAX_AGE": 600,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "init_command": ";".join(
+                    f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()
+                ),
+                "transaction_mode": "IMMEDIATE",
+                "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000,
+            },
+        })
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -131,9 +204,120 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "eyesedge-api-cache",
+# Cache
+# EYESEDGE_CACHE selects the backend: "locmem" (per process, the default),
+# "sqlite" (one file shared by every worker on the host) or "redis" (shared
+# across hosts, needs the redis package and EYESEDGE_REDIS_URL).
+
+EYESEDGE_CACHE = os.environ.get("EYESEDGE_CACHE", "locmem")
+
+if EYESEDGE_CACHE == "sqlite":
+    CACHES = {
+        "default": {
+            "BACKEND": "eyesedge.cache_backends.SQLiteCache",
+            "LOCATION": os.environ.get("EYESEDGE_CACHE_LOCATION", BASE_DIR / "cache.sqlite3"),
+            "OPTIONS": {
+                "MAX_ENTRIES": 10000,
+                "COMPRESS_MIN_LENGTH": 1024,
+            },
+        }
     }
-}
\ No newline at end of file
+elif EYESEDGE_CACHE == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("EYESEDGE_REDIS_URL", "redis://127.0.0.1:6379/0"),
+            "OPTIONS": {
+                "serializer": "eyesedge.cache_backends.CompressingRedisSerializer",
+            },
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "eyesedge-api-cache",
+        }
+    }
+
+# Camera registry
+# Each process keeps a snapshot of the visible cameras for the camera list
+# and the camera checks of motion writes. It is rebuilt after camera changes
+# seen through the cache and at the latest MAX_AGE seconds after it was built.
+
+CAMERA_REGISTRY = {
+    "MAX_AGE": 5.0,
+}
+
+# Alerts
+# Detections matching a rule raise an Alert; the first matching rule wins.
+# Rule conditions (all optional): "object_classes", "min_confidence" and
+# "cameras". The "message" template may use {object_class}, {confidence},
+# {camera} and {rule}. `manage.py deliver_alerts` sends pending alerts to
+# every sink in batches, retrying failures with exponential backoff.
+
+ALERTS = {
+    "RULES": [
+        {"name": "person", "object_classes": ["person"], "min_confidence": 0.8},
+    ],
+    "SINKS": [
+        {
+            "BACKEND": "alerts.sinks.FileSink",
+            "OPTIONS": {"path": os.environ.get("EYESEDGE_ALERT_FILE", BASE_DIR / "alerts.ndjson")},
+        },
+    ],
+    "WORKERS": 4,
+    "BATCH_SIZE": 100,
+    "POLL_INTERVAL": 1.0,
+    "BACKOFF_BASE": 2.0,
+    "BACKOFF_MAX": 300.0,
+    "LEASE_SECONDS": 60.0,
+}
+
+# Retention
+# Defaults for cameras without a RetentionPolicy. KEEP_DAYS None keeps motion
+# history forever. `manage.py purge_history` deletes expired events with their
+# images, detections and alerts in chunks of CHUNK_SIZE events, writing them
+# to gzipped NDJSON files under ARCHIVE_DIR first when ARCHIVE is set.
+
+RETENTION = {
+    "KEEP_DAYS": None,
+    "ARCHIVE": False,
+    "ARCHIVE_DIR": os.environ.get("EYESEDGE_ARCHIVE_DIR", BASE_DIR / "archive"),
+    "CHUNK_SIZE": 1000,
+}
+
+# Compact motion history
+# With ENABLED, `manage.py compact_motion_history` moves the motion events of
+# days older than COMPACT_AFTER_DAYS that have no images or detections into
+# one compressed MotionHistoryChunk per camera and day, and the motion list,
+# detail and activity endpoints read them back. Keep it enabled once days
+# have been compacted, or their events disappear from the API.
+
+MOTION_HISTORY = {
+    "ENABLED": False,
+    "COMPACT_AFTER_DAYS": 7,
+}
+
+# Metrics
+# RequestMetricsMiddleware adds a Server-Timing header (SQL, serializer and
+# schema validation time) to every response and aggregates the same numbers
+# per view into histograms served at /metrics in the Prometheus text format,
+# to clients whose address is in ALLOWED_IPS.
+
+METRICS = {
+    "SERVER_TIMING": True,
+    "ALLOWED_IPS": ["127.0.0.1", "::1"],
+}
+
+# Live feed
+# New motion events, images and detections are kept in an in-process buffer
+# of BUFFER_SIZE entries for /api/async/feed/ (Server-Sent Events, with a
+# comment every HEARTBEAT seconds) and /api/async/feed/poll/ (long polls of
+# at most MAX_WAIT seconds).
+
+FEED = {
+    "BUFFER_SIZE": 10000,
+    "MAX_WAIT": 30,
+    "HEARTBEAT": 15,
+}
@@ -0,0 +1,31 @@
+"""Test runner that isolates the cache between tests."""
+from unittest import TextTestResult
+
+from django.core.cache import caches
+from django.test.runner import DiscoverRunner
+
+
+class CacheIsolatingTestResult(TextTestResult):
+    """Clear every configured cache before each test starts."""
+
+    def startTest(self, test):
+        for cache in caches.all(initialized_only=True):
+            cache.clear()
+        super().startTest(test)
+
+
+class CacheIsolatingTestRunner(DiscoverRunner):
+    """
+    Run tests with caches cleared before each one.
+
+    Test transactions roll back without firing model signals, so cached
+    responses keyed on resource generations would otherwise outlive the rows
+    they were built from.
+    """
+
+    def get_resultclass(self):
+        resultclass = super().get_resultclass()
+        if resultclass is None:
+            return CacheIsolatingTestResult
+        return type("CacheIsolating" + resultclass.__name__,
+                    (CacheIsolatingTestResult, resultclass), {})
@@ -0,0 +1,716 @@
+"""
+Tests for the shared eyesedge utilities.
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.test import APITestCase
+
+from cameras.models import Camera
+from cameras.serializers import CameraSerializer
+from detections.models import Detection
+from images.models import Image
+from motions.models import MotionEvent
+from motions.serializers import MotionEventSerializer
+from .cache import get_or_compute
+from .fastpath import FastListMixin, ReadPlan
+from .feed import FeedHub, hub
+from .metrics import registry
+from .cache_backends import CompressingRedisSerializer, SQLiteCache
+from .management.commands.explain_filters import classify_plan
+from .schema_validation import (
+    schema_registry,
+    validate_batch_with_schema,
+    validate_payload_with_schema,
+)
+
+
+class SchemaRegistryTest(SimpleTestCase):
+
+    def test_validators_are_compiled_once(self):
+        self.assertIs(
+            schema_registry.validator(CameraSerializer),
+            schema_registry.validator(CameraSerializer),
+        )
+        self.assertIsNot(
+            schema_registry.validator(CameraSerializer, partial=True),
+            schema_registry.validator(CameraSerializer),
+        )
+
+    def test_subclasses_use_the_registered_base_schema(self):
+        class ExtendedCameraSerializer(CameraSerializer):
+            pass
+
+        self.assertIs(
+            schema_registry.validator(ExtendedCameraSerializer),
+            schema_registry.validator(CameraSerializer),
+        )
+
+    def test_partial_schema_does_not_require_fields(self):
+        validate_payload_with_schema(
+            {"status": "inactive"}, schema_registry.validator(CameraSerializer, partial=True)
+        )
+        with self.assertRaises(serializers.ValidationError):
+            validate_payload_with_schema(
+                {"status": "inactive"}, schema_registry.validator(CameraSerializer)
+            )
+
+    def test_schema_copy_is_independent(self):
+        schema = schema_registry.schema(MotionEventSerializer)
+        schema["properties"].clear()
+        self.assertIn("camera", schema_registry.schema(MotionEventSerializer)["properties"])
+
+    def test_batch_validation_reports_each_item(self):
+        errors = validate_batch_with_schema(
+            [{"camera": 1, "duration": 1.0}, {"camera": 1, "duration": -1}],
+            schema_registry.validator(MotionEventSerializer),
+        )
+        self.assertIsNone(errors[0])
+        self.assertIn("duration", errors[1])
+
+
+class ExplainFiltersCommandTest(TestCase):
+
+    def test_classify_plan(self):
+        self.assertEqual(
+            classify_plan("3 0 0 SEARCH t USING INDEX t_idx (camera_id=?)"),
+            ("index", [], False),
+        )
+        self.assertEqual(
+            classify_plan("5 0 0 SCAN t USING INDEX t_idx"), ("walk", ["t"], False)
+        )
+        self.assertEqual(
+            classify_plan("2 0 0 SCAN t\n9 0 0 USE TEMP B-TREE FOR ORDER BY"),
+            ("SCAN", ["t"], True),
+        )
+
+    def test_reports_index_backed_camera_filter(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("plan wording is checked against SQLite")
+        out = StringIO()
+        call_command(
+            "explain_filters", "--view", "motion-list", "--max-combination", "1",
+            "--no-color", stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertIn("  index camera", lines)
+        self.assertIn("filter combinations checked", lines[-1])
+
+    def test_detection_class_confidence_query_uses_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("plan wording is checked against SQLite")
+        plan = Detection.objects.filter(object_class="person", confidence__gte=0.5).explain()
+        self.assertIn("detection_class_conf_idx", plan)
+
+
+class ResponseCacheAPITest(APITestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.240:8080/video",
+            resolution="1920x1080",
+        )
+        self.motion_event = MotionEvent.objects.create(camera=self.camera, duration=1.0)
+        self.user = get_user_model().objects.create_user(
+            username="cache_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("camera-images", kwargs={"pk": self.camera.pk})
+
+    def _get(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(ctx.captured_queries)
+
+    def test_repeated_get_is_served_from_cache(self):
+        first, first_queries = self._get()
+        second, second_queries = self._get()
+        self.assertEqual(first.data, second.data)
+        self.assertGreater(first_queries, 0)
+        self.assertEqual(second_queries, 0)
+
+    def test_model_changes_invalidate_cached_responses(self):
+        self._get()
+        image = Image.objects.create(
+            motion_event=self.motion_event,
+            filepath="http://example.com/images/cache_1.jpg",
+        )
+        response, _ = self._get()
+        self.assertEqual([item["id"] for item in response.data["results"]], [image.id])
+
+        image.delete()
+        response, _ = self._get()
+        self.assertEqual(response.data["results"], [])
+
+    def test_bulk_ingest_invalidates_cached_responses(self):
+        motions_url = reverse("camera-motions", kwargs={"pk": self.camera.pk})
+        self.client.get(motions_url)
+        self.client.post(
+            reverse("motion-bulk"), [{"camera": self.camera.id, "duration": 1.0}], format="json"
+        )
+        response = self.client.get(motions_url)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_stats_endpoint_counts_hits_and_misses(self):
+        self._get()
+        self._get()
+        self._get()
+        response = self.client.get(reverse("cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["CameraImagesList"], {"hits": 2, "misses": 1})
+        self.assertIn("MotionEventList", response.data)
+
+
+class RequestMetricsAPITest(APITestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.241:8080/video",
+            resolution="1920x1080",
+        )
+        self.user = get_user_model().objects.create_user(
+            username="metrics_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_breaks_down_the_request(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("camera-detail", kwargs={"pk": self.camera.pk}))
+        timing = dict(
+            entry.strip().split(";", 1) for entry in response["Server-Timing"].split(",")
+        )
+        self.assertEqual(set(timing), {"db", "serialize", "validate", "total"})
+        self.assertIn(f'desc="{len(ctx.captured_queries)} queries"', timing["db"])
+
+    def test_metrics_endpoint_serves_prometheus_histograms(self):
+        self.client.post(
+            reverse("camera-list"),
+            {"address": "http://192.168.1.242:8080/video", "resolution": "1280x720"},
+            format="json",
+        )
+        self.client.get(reverse("camera-list"))
+        body = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn(
+            'eyesedge_requests_total{view="camera-list",method="POST",status="201"} 1', body
+        )
+        self.assertIn(
+            'eyesedge_request_validate_seconds_count{view="camera-list",method="POST"} 1', body
+        )
+        self.assertIn(
+            'eyesedge_request_queries_bucket{view="camera-list",method="GET",le="+Inf"} 1', body
+        )
+        self.assertIn("# TYPE eyesedge_response_size_bytes histogram", body)
+
+    def test_metrics_endpoint_is_limited_to_allowed_addresses(self):
+        response = self.client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.9")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class FastListPathAPITest(APITestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.243:8080/video",
+            resolution="1920x1080",
+        )
+        self.events = [
+            MotionEvent.objects.create(camera=self.camera, duration=1.5 * i, threshold=0.1 * i)
+            for i in range(3)
+        ]
+        for event in self.events:
+            image = Image.objects.create(
+                motion_event=event, filepath=f"http://example.com/fast/{event.pk}.jpg",
+                filesize=None if event.pk % 2 else 1024,
+            )
+            Detection.objects.create(image=image, object_class="car", confidence=1.0)
+        self.user = get_user_model().objects.create_user(
+            username="fast_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _content(self, url, fast):
+        cache.clear()
+        with mock.patch.object(FastListMixin, "fast_list", fast):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.content
+
+    def test_fast_path_output_is_byte_identical(self):
+        urls = [
+            reverse("camera-list"),
+            reverse("camera-motions", kwargs={"pk": self.camera.pk}) + "?page_size=2",
+            reverse("camera-images", kwargs={"pk": self.camera.pk}),
+            reverse("motion-list") + "?camera=" + str(self.camera.pk),
+            reverse("motion-images", kwargs={"pk": self.events[1].pk}),
+            reverse("image-list") + "?page_size=1",
+            reverse("detection-list") + f"?camera={self.camera.pk}",
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self._content(url, True), self._content(url, False))
+
+    def test_unsupported_serializers_keep_the_regular_path(self):
+        class MethodSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+            id = serializers.IntegerField()
+            label = serializers.SerializerMethodField()
+
+        self.assertIsNone(ReadPlan.for_serializer_class(MethodSerializer))
+        for serializer_class in (CameraSerializer, MotionEventSerializer):
+            self.assertIsNotNone(ReadPlan.for_serializer_class(serializer_class))
+        plan = ReadPlan.for_serializer_class(MotionEventSerializer)
+        self.assertEqual(plan.paths[:2], ("id", "camera"))
+
+
+class AsyncViewsAPITest(TestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.244:8080/video",
+            resolution="1920x1080",
+        )
+        self.events = [
+            MotionEvent.objects.create(camera=self.camera, duration=1.0 + i, threshold=0.2)
+            for i in range(3)
+        ]
+        for event in self.events:
+            Image.objects.create(
+                motion_event=event, filepath=f"http://example.com/async/{event.pk}.jpg"
+            )
+        self.user = get_user_model().objects.create_user(
+            username="async_user",
+            password="test-pass-123"
+        )
+        self.client.force_login(self.user)
+
+    async def test_async_reads_match_the_sync_endpoints(self):
+        await self.async_client.aforce_login(self.user)
+        camera, event = self.camera.pk, self.events[1].pk
+        pairs = [
+            ("camera-list", {}, ""),
+            ("camera-detail", {"pk": camera}, ""),
+            ("camera-motions", {"pk": camera}, "?page_size=2"),
+            ("camera-images", {"pk": camera}, ""),
+            ("motion-list", {}, "?page_size=2"),
+            ("motion-detail", {"pk": event}, ""),
+            ("motion-images", {"pk": event}, ""),
+            ("image-list", {}, "?page_size=1"),
+        ]
+        for name, kwargs, query in pairs:
+            with self.subTest(name=name):
+                expected = await sync_to_async(self.client.get)(
+                    reverse(name, kwargs=kwargs) + query
+                )
+                response = await self.async_client.get(
+                    reverse(f"async-{name}", kwargs=kwargs) + query
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                # Only the next links differ, by their path prefix.
+                self.assertEqual(
+                    response.content.replace(b"/api/async/", b"/api/"), expected.content
+                )
+
+    async def test_async_pagination_follows_the_cursor(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse("async-camera-motions", kwargs={"pk": self.camera.pk})
+        first = (await self.async_client.get(url + "?page_size=2")).json()
+        self.assertIsNotNone(first["next"])
+        second = (await self.async_client.get(first["next"])).json()
+        self.assertEqual(
+            [row["id"] for row in first["results"] + second["results"]],
+            [event.pk for event in self.events],
+        )
+        self.assertIsNone(second["next"])
+        response = await self.async_client.get(url + "?cursor=bogus")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_async_create_validates_like_the_serializer(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse("async-motion-list")
+        response = await self.async_client.post(
+            url, {"camera": self.camera.pk, "duration": 2.5, "threshold": 0.4},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["camera"], self.camera.pk)
+        self.assertTrue(await MotionEvent.objects.filter(pk=response.json()["id"]).aexists())
+
+        response = await self.async_client.post(
+            url, {"camera": 999999, "duration": 2.5, "threshold": 0.4},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(), {"camera": ['Invalid pk "999999" - object does not exist.']}
+        )
+
+        response = await self.async_client.post(
+            reverse("async-camera-list"),
+            {"address": self.camera.address, "resolution": "1920x1080"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("address", response.json())
+
+        response = await self.async_client.post(
+            reverse("async-image-list"), {"filepath": "not a uri"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_async_create_errors_match_the_sync_endpoints(self):
+        await self.async_client.aforce_login(self.user)
+        payloads = [
+            ("camera-list", {"address": "http://example.com/" + "a" * 240,
+                             "resolution": "1920x1080"}),
+            ("camera-list", {"address": "not a url", "resolution": "1920x1080"}),
+            ("motion-list", {"camera": self.camera.pk, "duration": -1}),
+            ("motion-list", [{"camera": self.camera.pk}]),
+            ("image-list", {"motion_event": self.events[0].pk, "filepath": "   "}),
+            ("image-list", {}),
+        ]
+        for name, payload in payloads:
+            with self.subTest(name=name, payload=payload):
+                expected = await sync_to_async(self.client.post)(
+                    reverse(name), payload, content_type="application/json"
+                )
+                response = await self.async_client.post(
+                    reverse(f"async-{name}"), payload, content_type="application/json"
+                )
+                self.assertEqual(expected.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.json(), expected.json())
+
+    async def test_async_views_require_authentication(self):
+        response = await self.async_client.get(reverse("async-camera-list"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = await self.async_client.get(
+            reverse("async-image-detail", kwargs={"pk": 999999})
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(
+            reverse("async-image-detail", kwargs={"pk": 999999})
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {"detail": "No Image matches the given query."})
+        # The async ORM runs queries out of the middleware's reach.
+        self.assertTrue(response["Server-Timing"].startswith("serialize;"))
+
+
+class LiveFeedAPITest(TestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.245:8080/video",
+            resolution="1920x1080",
+        )
+        self.other = Camera.objects.create(
+            address="http://192.168.1.246:8080/video",
+            resolution="1280x720",
+        )
+        self.user = get_user_model().objects.create_user(
+            username="feed_user",
+            password="test-pass-123"
+        )
+        self.client.force_login(self.user)
+        self.poll_url = reverse("feed-poll")
+
+    def _poll(self, **params):
+        response = self.client.get(self.poll_url, {"timeout": 0, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_poll_returns_committed_rows_of_the_requested_cameras(self):
+        last_id = self._poll()["last_id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            event = MotionEvent.objects.create(camera=self.camera, duration=2.0)
+            MotionEvent.objects.create(camera=self.other, duration=3.0)
+            image = Image.objects.create(
+                motion_event=event, filepath="http://example.com/feed/1.jpg"
+            )
+            Detection.objects.create(image=image, object_class="person", confidence=0.9)
+
+        body = self._poll(last_id=last_id, camera=self.camera.pk)
+        self.assertFalse(body["reset"])
+        self.assertEqual(
+            [(item["type"], item["camera"]) for item in body["events"]],
+            [("motion", self.camera.pk), ("image", self.camera.pk),
+             ("detection", self.camera.pk)],
+        )
+        self.assertEqual(body["events"][0]["data"]["id"], event.pk)
+        self.assertEqual(body["events"][1]["data"]["camera"], self.camera.pk)
+        self.assertEqual(body["last_id"], hub.event_id(hub.sequence))
+        self.assertEqual(self._poll(last_id=body["last_id"])["events"], [])
+
+    def test_bulk_ingest_is_published(self):
+        last_id = self._poll()["last_id"]
+        item = {
+            "camera": self.other.pk, "duration": 1.0,
+            "images": [{"filepath": "http://example.com/feed/bulk.jpg",
+                        "detections": [{"object_class": "car", "confidence": 0.8}]}],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("motion-bulk"), [item], content_type="application/json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        body = self._poll(last_id=last_id, camera=f"{self.camera.pk},{self.other.pk}")
+        self.assertEqual(
+            [item["type"] for item in body["events"]], ["motion", "image", "detection"]
+        )
+        self.assertEqual({item["camera"] for item in body["events"]}, {self.other.pk})
+
+    def test_unknown_or_stale_ids_ask_for_a_reset(self):
+        self.assertTrue(self._poll(last_id="00000000-1")["reset"])
+        small = FeedHub(size=2)
+        small.publish("motion", [(1, None)] * 5)
+        _, position, missed = small.read(0)
+        self.assertTrue(missed)
+        self.assertEqual(position, 5)
+        self.assertEqual([entry.sequence for entry in small.read(3)[0]], [4, 5])
+        response = self.client.get(self.poll_url, {"camera": "one"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_finite_timeouts_are_rejected(self):
+        for value in ("nan", "inf", "-inf", "soon"):
+            response = self.client.get(self.poll_url, {"timeout": value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.json(), {"timeout": ["A valid number is required."]})
+
+    async def test_waiting_clients_are_woken_by_new_rows(self):
+        await self.async_client.aforce_login(self.user)
+        last_id = (await self.async_client.get(self.poll_url, {"timeout": 0})).json()["last_id"]
+        event = MotionEvent(pk=999999, camera_id=self.camera.pk, duration=1.0, threshold=0.2)
+        poll = asyncio.create_task(
+            self.async_client.get(self.poll_url, {"last_id": last_id, "timeout": 10})
+        )
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        await asyncio.to_thread(hub.publish, "motion", [(self.camera.pk, event)])
+        body = (await poll).json()
+        self.assertLess(time.perf_counter() - started, 5)
+        self.assertEqual([item["data"]["id"] for item in body["events"]], [999999])
+
+        response = await self.async_client.get(
+            reverse("feed-stream"), {"camera": self.camera.pk},
+            headers={"Last-Event-ID": last_id},
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b"retry: 3000\n\n")
+        chunk = (await anext(chunks)).decode()
+        self.assertIn(f"id: {body['events'][0]['id']}\nevent: motion\n", chunk)
+        self.assertIn('"id":999999', chunk)
+        await chunks.aclose()
+
+
+class ConditionalGetAPITest(APITestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.241:8080/video",
+            resolution="1920x1080",
+        )
+        self.motion_event = MotionEvent.objects.create(camera=self.camera, duration=1.0)
+        self.image = Image.objects.create(
+            motion_event=self.motion_event,
+            filepath="http://example.com/images/etag_1.jpg",
+        )
+        self.user = get_user_model().objects.create_user(
+            username="etag_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("camera-images", kwargs={"pk": self.camera.pk})
+
+    def test_matching_etag_returns_not_modified_without_queries(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertTrue(first["ETag"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], first["ETag"])
+        self.assertEqual(response.content, b"")
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_etag_changes_with_the_queryset(self):
+        etag = self.client.get(self.url)["ETag"]
+        Image.objects.create(
+            motion_event=self.motion_event,
+            filepath="http://example.com/images/etag_2.jpg",
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_in_place_update_changes_etag(self):
+        url = reverse("image-detail", kwargs={"pk": self.image.pk})
+        etag = self.client.get(url)["ETag"]
+        self.image.filesize = 2048
+        self.image.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["filesize"], 2048)
+
+    def test_filters_produce_distinct_etags(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(
+            self.url, {"filesize": 999}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", response)
+
+    def test_camera_detail_supports_conditional_get(self):
+        url = reverse("camera-detail", kwargs={"pk": self.camera.pk})
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f"W/{etag}")
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_missing_object_is_not_found(self):
+        url = reverse("image-detail", kwargs={"pk": self.image.pk + 1000})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@skipUnless(
+    settings.EYESEDGE_DATABASE == "sqlite" and settings.EYESEDGE_SQLITE_PROFILE == "tuned",
+    "needs the tuned SQLite profile",
+)
+class SQLiteProfileTest(TestCase):
+
+    def test_pragmas_are_applied_to_new_connections(self):
+        with connection.cursor() as cursor:
+            for name in ("synchronous", "busy_timeout", "cache_size"):
+                cursor.execute(f"PRAGMA {name}")
+                expected = {"synchronous": 1}.get(name, settings.SQLITE_PRAGMAS[name])
+                self.assertEqual(cursor.fetchone()[0], expected, name)
+
+    def test_connections_are_reused(self):
+        self.assertGreater(connection.settings_dict["CONN_MAX_AGE"], 0)
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+
+class BrinIndexMigrationTest(TestCase):
+
+    def index_names(self, table):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+        return set(constraints)
+
+    def test_brin_indexes_only_exist_on_postgresql(self):
+        expected = connection.vendor == "postgresql"
+        self.assertEqual("motion_ts_brin" in self.index_names("motions_motionevent"), expected)
+        self.assertEqual("image_created_brin" in self.index_names("images_image"), expected)
+
+
+class SQLiteCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        self.cache = SQLiteCache(self.path, {
+            "OPTIONS": {"MAX_ENTRIES": 10, "COMPRESS_MIN_LENGTH": 100},
+        })
+        self.addCleanup(os.remove, self.path)
+
+    def test_set_get_delete(self):
+        self.cache.set("key", {"results": [1, 2]})
+        self.assertEqual(self.cache.get("key"), {"results": [1, 2]})
+        self.assertTrue(self.cache.delete("key"))
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_add_only_replaces_expired_entries(self):
+        self.assertTrue(self.cache.add("lock", 1, timeout=60))
+        self.assertFalse(self.cache.add("lock", 2, timeout=60))
+        self.cache.set("lock", 1, timeout=0)
+        self.assertTrue(self.cache.add("lock", 3, timeout=60))
+        self.assertEqual(self.cache.get("lock"), 3)
+
+    def test_entries_are_shared_between_instances(self):
+        other = SQLiteCache(self.path, {})
+        self.cache.set("shared", "value")
+        self.assertEqual(other.get("shared"), "value")
+        other.set("counter", 1, timeout=None)
+        self.assertEqual(self.cache.incr("counter", 4), 5)
+        self.assertEqual(other.get("counter"), 5)
+
+    def test_incr_missing_key_raises(self):
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+
+    def test_large_values_are_compressed(self):
+        value = ["row"] * 1000
+        self.cache.set("large", value)
+        self.cache.set("small", "x")
+        with sqlite3.connect(self.path) as db:
+            rows = dict(db.execute("SELECT key, value FROM cache").fetchall())
+        self.assertEqual(rows[self.cache.make_key("large")][:1], b"\x01")
+        self.assertEqual(rows[self.cache.make_key("small")][:1], b"\x00")
+        self.assertEqual(self.cache.get("large"), value)
+
+    def test_cull_keeps_entries_without_expiry(self):
+        self.cache.set("generation", 1, timeout=None)
+        for index in range(SQLiteCache.CULL_CHECK_EVERY):
+            self.cache.set(f"entry-{index}", index, timeout=60)
+        self.assertEqual(self.cache.get("generation"), 1)
+        with sqlite3.connect(self.path) as db:
+            count = db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        self.assertLess(count, SQLiteCache.CULL_CHECK_EVERY)
+
+    def test_redis_serializer_round_trip(self):
+        serializer = CompressingRedisSerializer()
+        self.assertEqual(serializer.dumps(7), 7)
+        for value in ("short", list(range(2000))):
+            self.assertEqual(serializer.loads(serializer.dumps(value)), value)
+
+
+class StampedeProtectionTest(SimpleTestCase):
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_or_compute("stampede", compute, 60))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(hit for _, hit in results), [False, True, True, True, True])
+        self.assertTrue(all(value == "value" for value, _ in results))
@@ -17,10 +17,26 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from cameras.urls import async_urlpatterns as camera_async_urls
+from images.urls import async_urlpatterns as image_async_urls
+from motions.urls import async_urlpatterns as motion_async_urls
+
+from .feed import FeedPollView, FeedStreamView
+from .metrics import metrics_view
+from .views import CacheStats
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/cameras/', include('cameras.urls')),
     path('api/motions/', include('motions.urls')),
     path('api/images/', include('images.urls')),
+    path('api/detections/', include('detections.urls')),
+    path('api/async/cameras/', include(camera_async_urls)),
+    path('api/async/motions/', include(motion_async_urls)),
+    path('api/async/images/', include(image_async_urls)),
+    path('api/async/feed/', FeedStreamView.as_view(), name='feed-stream'),
+    path('api/async/feed/poll/', FeedPollView.as_view(), name='feed-poll'),
+    path('api/cache/stats/', CacheStats.as_view(), name='cache-stats'),
+    path('metrics', metrics_view, name='metrics'),
     path("api-auth/", include("rest_framework.urls"))
 ]
@@ -0,0 +1,17 @@
+"""Project-wide API views."""
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import cache_stats
+
+
+class CacheStats(APIView):
+    """
+    GET: Response cache hit and miss counters per view
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """Return the hit and miss counters of every cached view."""
+        return Response(cache_stats())
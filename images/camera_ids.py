@@ -0,0 +1,71 @@
+"""
+Consistency checks for the denormalized ``camera`` column of images and
+detections.
+
+``Image.camera`` and ``Detection.camera`` copy the camera of the row's motion
+event (for detections without one, of their image's motion event). Saves
+keep the copy in sync and the bulk ingest writes it directly; rows written
+around those paths, such as raw SQL, can drift. ``check_camera_ids`` counts
+the drifted rows and optionally repairs them, one chunk of primary keys at a
+time.
+"""
+from django.db import transaction
+from django.db.models import F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from detections.models import Detection
+from eyesedge.cache import bump_generation
+from motions.models import MotionEvent
+
+from .models import Image
+
+
+def _event_camera(event_field):
+    return Subquery(
+        MotionEvent.objects.filter(pk=OuterRef(event_field)).values("camera_id")[:1]
+    )
+
+
+def expected_camera(model):
+    """Return the expression of the camera ID a row of ``model`` should hold."""
+    if model is Image:
+        return _event_camera("motion_event_id")
+    return Coalesce(
+        _event_camera("motion_event_id"),
+        Subquery(
+            Image.objects.filter(pk=OuterRef("image_id")).values("motion_event__camera_id")[:1]
+        ),
+    )
+
+
+def drifted(queryset):
+    """Return the rows of ``queryset`` whose camera differs from the expected one."""
+    queryset = queryset.annotate(expected_camera=expected_camera(queryset.model))
+    return queryset.filter(
+        Q(camera_id__isnull=True, expected_camera__isnull=False)
+        | Q(camera_id__isnull=False, expected_camera__isnull=True)
+        | Q(camera_id__isnull=False, expected_camera__isnull=False)
+        & ~Q(camera_id=F("expected_camera"))
+    )
+
+
+def check_camera_ids(chunk_size=5000, fix=False):
+    """
+    Return the number of drifted rows per model label, repairing them when
+    ``fix`` is set. Each chunk is checked and repaired in its own transaction.
+    """
+    totals = {}
+    for model, resource in ((Image, "image"), (Detection, "detection")):
+        count = 0
+        last = model.objects.aggregate(last=Max("pk"))["last"] or 0
+        for start in range(0, last + 1, chunk_size):
+            with transaction.atomic():
+                chunk = model.objects.filter(pk__gte=start, pk__lt=start + chunk_size)
+                ids = list(drifted(chunk).values_list("pk", flat=True))
+                if ids and fix:
+                    model.objects.filter(pk__in=ids).update(camera_id=expected_camera(model))
+            count += len(ids)
+        if count and fix:
+            bump_generation(resource)
+        totals[model._meta.label] = count
+    return totals
@@ -0,0 +1,28 @@
+"""Check, and optionally repair, the denormalized camera of images and detections."""
+from django.core.management.base import BaseCommand, CommandError
+
+from images.camera_ids import check_camera_ids
+
+
+class Command(BaseCommand):
+    help = (
+        "Count images and detections whose camera differs from their motion event's, "
+        "and repair them with --fix."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix", action="store_true", help="Repair the drifted rows."
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=5000,
+            help="Rows checked per transaction (default 5000).",
+        )
+
+    def handle(self, *args, **options):
+        totals = check_camera_ids(options["chunk_size"], fix=options["fix"])
+        for label, count in totals.items():
+            action = "repaired" if options["fix"] else "drifted"
+            self.stdout.write(f"{label}: {count} {action}")
+        if not options["fix"] and any(totals.values()):
+            raise CommandError("Camera IDs drifted; run with --fix to repair them.")
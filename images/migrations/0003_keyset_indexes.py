@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0002_remove_image_camera'),
+        ('motions', '0003_alter_motionevent_duration'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['created_at', 'id'], name='image_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['motion_event', 'created_at', 'id'], name='image_motion_created_id_idx'),
+        ),
+    ]
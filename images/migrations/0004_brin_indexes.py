@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from eyesedge.operations import AddBrinIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        AddBrinIndex(model_name='image', field='created_at', name='image_created_brin'),
+    ]
@@ -0,0 +1,38 @@
+"""
+Copy the camera of each image's motion event into ``Image.camera``.
+
+The migration is not atomic: every chunk of primary keys is committed on its
+own, so a large table is never locked for the whole backfill, and a run that
+is interrupted resumes with the rows still missing their camera.
+"""
+from django.db import migrations
+from django.db.models import Max, OuterRef, Subquery
+
+CHUNK_SIZE = 5000
+
+
+def backfill_image_camera(apps, schema_editor):
+    Image = apps.get_model("images", "Image")
+    MotionEvent = apps.get_model("motions", "MotionEvent")
+    camera = Subquery(
+        MotionEvent.objects.filter(pk=OuterRef("motion_event_id")).values("camera_id")[:1]
+    )
+    last = Image.objects.aggregate(last=Max("pk"))["last"] or 0
+    for start in range(0, last + 1, CHUNK_SIZE):
+        Image.objects.filter(
+            pk__gte=start, pk__lt=start + CHUNK_SIZE, camera__isnull=True
+        ).update(camera_id=camera)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('alerts', '0002_seed_example_data'),
+        ('images', '0005_image_camera'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_image_camera, migrations.RunPython.noop),
+    ]
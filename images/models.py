@@ -5,12 +5,42 @@ Defines the Image model for storing captured photographs.
 from django.db import models
 
 
+class ImageQuerySet(models.QuerySet):
+    """Query helpers shared by the image list endpoints."""
+
+    def visible(self):
+        """Exclude images whose motion event or camera is waiting for deferred deletion."""
+        # The camera copy can be NULL, for example on rows it has drifted from.
+        return self.filter(motion_event__deleting=False).filter(
+            models.Q(camera__isnull=True) | models.Q(camera__deleting=False)
+        )
+
+
+def related_camera_id(instance, name):
+    """
+    Return the camera ID of the object ``instance.<name>`` points to, with a
+    query only when that object is not loaded.
+    """
+    field = type(instance)._meta.get_field(name)
+    pk = getattr(instance, field.attname)
+    if pk is None:
+        return None
+    if field.is_cached(instance):
+        return getattr(instance, name).camera_id
+    return (
+        field.related_model._base_manager.filter(pk=pk)
+        .values_list("camera_id", flat=True).first()
+    )
+
+
 class Image(models.Model):
     """
     Represents a captured photograph from a camera.
     
-    Images are linked to motion events. The camera is accessed
-    through the motion event relationship to avoid redundancy.
+    Images are linked to motion events. ``camera`` is a copy of the motion
+    event's camera, kept in sync on save, so camera-scoped queries read one
+    table. Bulk writes set it themselves; ``manage.py check_camera_ids``
+    finds and repairs rows that drifted.
     """
     motion_event = models.ForeignKey(
         "motions.MotionEvent",
@@ -19,15 +49,44 @@ class Image(models.Model):
         null=False,
         blank=False,
     )
+    camera = models.ForeignKey(
+        "cameras.Camera",
+        on_delete=models.CASCADE,
+        related_name="images",
+        null=True,
+        editable=False,
+    )
     filepath = models.URLField(null=False, blank=False)
     filesize = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
-    @property
-    def camera(self):
-        """Access camera through motion event relationship."""
-        return self.motion_event.camera
+    objects = ImageQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="image_created_id_idx"),
+            models.Index(
+                fields=["motion_event", "created_at", "id"],
+                name="image_motion_created_id_idx",
+            ),
+            models.Index(
+                fields=["camera", "created_at", "id"], name="image_camera_created_id_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Save the image with the camera of its motion event, and pass it on to detections."""
+        adding = self._state.adding
+        self.camera_id = related_camera_id(self, "motion_event")
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "motion_event" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "camera"}
+        super().save(*args, **kwargs)
+        if not adding:
+            self.detections.exclude(camera_id=self.camera_id).update(camera_id=self.camera_id)
 
     def __str__(self) -> str:
         """Return a description of the image with camera and timestamp."""
-        return f"{self.motion_event.camera.address} @ {self.created_at.isoformat()}"
+        # The camera copy can be NULL; the motion event's camera is authoritative.
+        camera = self.camera or self.motion_event.camera
+        return f"{camera.address} @ {self.created_at.isoformat()}"
@@ -1,20 +1,22 @@
 """
 Serializers for the images app.
-Provides serialization for Image model with derived camera field.
+Provides serialization for Image model with its read-only camera field.
 """
 from rest_framework import serializers
+from motions.models import MotionEvent
 from .models import Image
-from eyesedge.schema_validation import validate_payload_with_schema
+from eyesedge.metrics import TimedSerializerMixin
+from eyesedge.schema_validation import schema_registry, validate_payload_with_schema
 
 
-class ImageSerializer(serializers.ModelSerializer):
+@schema_registry.register
+class ImageSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Image model.
     
-    Camera is derived from the motion event relationship
-    and included as a read-only field.
+    Camera is the motion event's camera, copied onto the image
+    on save, and included as a read-only field.
     """
-    camera = serializers.SerializerMethodField()
 
     @staticmethod
     def _json_schema(partial=False):
@@ -47,12 +49,11 @@ class ImageSerializer(serializers.ModelSerializer):
         model = Image
         fields = ['id', 'camera', 'motion_event', 'filepath', 'filesize', 'created_at']
         read_only_fields = ['created_at', 'camera']
+        extra_kwargs = {'motion_event': {'queryset': MotionEvent.objects.visible()}}
 
     def validate(self, attrs):
         payload = self.initial_data if isinstance(self.initial_data, dict) else attrs
-        validate_payload_with_schema(payload, self._json_schema(partial=self.partial))
+        validate_payload_with_schema(
+            payload, schema_registry.validator(type(self), partial=self.partial)
+        )
         return super().validate(attrs)
-
-    def get_camera(self, obj):
-        """Get camera ID from the associated motion event."""
-        return obj.motion_event.camera.id
@@ -2,13 +2,21 @@
 Tests for image and API endpoints.
 """
 
+import importlib
+from io import StringIO
+
+from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
 from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from cameras.models import Camera
+from detections.models import Detection
 from motions.models import MotionEvent
 from .models import Image
 from .serializers import ImageSerializer
@@ -50,6 +58,10 @@ class ImageModelTest(TestCase):
     def test_image_str_representation(self):
         self.assertIn(self.camera.address, str(self.image))
 
+    def test_image_str_without_a_camera_copy(self):
+        Image.objects.filter(pk=self.image.pk).update(camera=None)
+        self.assertIn(self.camera.address, str(Image.objects.get(pk=self.image.pk)))
+
     def test_image_auto_created_at(self):
         self.assertIsNotNone(self.image.created_at)
 
@@ -153,8 +165,8 @@ class ImageAPITest(APITestCase):
     def test_get_image_list(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), Image.objects.count())
-        self.assertIn(self.image.pk, [item["id"] for item in response.data])
+        self.assertEqual(len(response.data["results"]), Image.objects.count())
+        self.assertIn(self.image.pk, [item["id"] for item in response.data["results"]])
 
     def test_get_image_detail(self):
         response = self.client.get(self.detail_url)
@@ -219,13 +231,13 @@ class ImageAPITest(APITestCase):
         url = reverse('camera-images', kwargs={'pk': self.camera.pk})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_get_motion_images_via_nested_route(self):
         url = reverse('motion-images', kwargs={'pk': self.motion_event.pk})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
 
 class ImageAuthenticationAPITest(APITestCase):
@@ -280,3 +292,123 @@ class ImageAuthenticationAPITest(APITestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ImageListQueryCountTest(APITestCase):
+    """
+    Image list endpoints must not issue per-row queries for the camera field.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.230:8080/video",
+            resolution="1920x1080",
+        )
+        self.motion_event = MotionEvent.objects.create(camera=self.camera, duration=1.0)
+        self.user = get_user_model().objects.create_user(
+            username="image_query_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.urls = [
+            reverse("image-list"),
+            reverse("camera-images", kwargs={"pk": self.camera.pk}),
+            reverse("motion-images", kwargs={"pk": self.motion_event.pk}),
+        ]
+
+    def _add_images(self, count):
+        Image.objects.bulk_create(
+            Image(
+                motion_event=self.motion_event,
+                camera_id=self.motion_event.camera_id,
+                filepath=f"http://example.com/images/bulk_{Image.objects.count()}_{i}.jpg",
+            )
+            for i in range(count)
+        )
+
+    def _count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_is_independent_of_page_size(self):
+        self._add_images(1)
+        small = {url: self._count_queries(url)[0] for url in self.urls}
+        self._add_images(25)
+        for url in self.urls:
+            queries, response = self._count_queries(url)
+            self.assertEqual(queries, small[url], url)
+            own = [
+                item for item in response.data["results"]
+                if item["motion_event"] == self.motion_event.id
+            ]
+            self.assertEqual(len(own), 26)
+            self.assertTrue(all(item["camera"] == self.camera.id for item in own))
+
+
+class ImageCameraIdTest(TestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.230:8080/video", resolution="1920x1080"
+        )
+        self.other = Camera.objects.create(
+            address="http://192.168.1.231:8080/video", resolution="1280x720"
+        )
+        self.event = MotionEvent.objects.create(camera=self.camera, duration=1.0)
+        self.image = Image.objects.create(
+            motion_event=self.event, filepath="http://example.com/images/denorm.jpg"
+        )
+        self.detection = Detection.objects.create(
+            image=self.image, object_class="person", confidence=0.9
+        )
+
+    def _camera_ids(self):
+        self.image.refresh_from_db()
+        self.detection.refresh_from_db()
+        return self.image.camera_id, self.detection.camera_id
+
+    def test_camera_follows_the_motion_event(self):
+        self.assertEqual(self._camera_ids(), (self.camera.pk, self.camera.pk))
+
+        self.event.camera = self.other
+        self.event.save()
+        self.assertEqual(self._camera_ids(), (self.other.pk, self.other.pk))
+
+        self.image.motion_event = MotionEvent.objects.create(camera=self.camera, duration=2.0)
+        self.image.save()
+        self.assertEqual(self._camera_ids(), (self.camera.pk, self.camera.pk))
+
+    def test_check_camera_ids_reports_and_repairs_drift(self):
+        Image.objects.filter(pk=self.image.pk).update(camera=self.other)
+        Detection.objects.filter(pk=self.detection.pk).update(camera=None)
+        with self.assertRaises(CommandError):
+            call_command("check_camera_ids", stdout=StringIO())
+
+        out = StringIO()
+        call_command("check_camera_ids", "--fix", "--chunk-size", "1", stdout=out)
+        self.assertIn("images.Image: 1 repaired", out.getvalue())
+        self.assertIn("detections.Detection: 1 repaired", out.getvalue())
+        self.assertEqual(self._camera_ids(), (self.camera.pk, self.camera.pk))
+        call_command("check_camera_ids", stdout=StringIO())
+
+    def test_images_without_a_camera_copy_stay_visible(self):
+        Image.objects.filter(pk=self.image.pk).update(camera=None)
+        self.assertTrue(Image.objects.visible().filter(pk=self.image.pk).exists())
+
+        MotionEvent.objects.filter(pk=self.event.pk).update(deleting=True)
+        self.assertFalse(Image.objects.visible().filter(pk=self.image.pk).exists())
+
+    def test_backfill_migrations_fill_missing_cameras(self):
+        Image.objects.update(camera=None)
+        Detection.objects.update(camera=None)
+        for module, function in (
+            ("images.migrations.0006_backfill_image_camera", "backfill_image_camera"),
+            ("detections.migrations.0006_backfill_detection_camera",
+             "backfill_detection_camera"),
+        ):
+            getattr(importlib.import_module(module), function)(apps, None)
+        self.assertEqual(self._camera_ids(), (self.camera.pk, self.camera.pk))
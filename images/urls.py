@@ -5,3 +5,8 @@ urlpatterns = [
     path('', views.ImageList.as_view(), name='image-list'),
     path('<int:pk>/', views.ImageDetail.as_view(), name='image-detail'),
 ]
+
+async_urlpatterns = [
+    path('', views.AsyncImageList.as_view(), name='async-image-list'),
+    path('<int:pk>/', views.AsyncImageDetail.as_view(), name='async-image-detail'),
+]
@@ -1,35 +1,64 @@
 """Views for the images app."""
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_headers
 from rest_framework import generics
 from rest_framework import permissions
 from django_filters.rest_framework import DjangoFilterBackend
 
+from eyesedge.async_views import AsyncDetailView, AsyncListCreateView
+from eyesedge.cache import CachedResponseMixin
+from eyesedge.conditional import ConditionalGetMixin
+from eyesedge.fastpath import FastListMixin
+from eyesedge.pagination import CreatedAtKeysetPagination
+
 from .models import Image
 from .serializers import ImageSerializer
 
 
-@method_decorator(cache_page(300), name="dispatch")
-@method_decorator(vary_on_headers("Authorization"), name="dispatch")
-class ImageList(generics.ListCreateAPIView):
+class ImageList(
+    ConditionalGetMixin, CachedResponseMixin, FastListMixin, generics.ListCreateAPIView
+):
     """
     GET: List all images
     POST: Upload a new image
     """
-    queryset = Image.objects.all()
+    cache_resources = ("image", "motion")
+    queryset = Image.objects.visible()
     serializer_class = ImageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["motion_event"]
 
 
-class ImageDetail(generics.RetrieveUpdateDestroyAPIView):
+class ImageDetail(ConditionalGetMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     GET: Retrieve a specific image
     PUT: Update image metadata
     DELETE: Delete an image
     """
-    queryset = Image.objects.all()
+    cache_resources = ("image", "motion")
+    queryset = Image.objects.visible()
     serializer_class = ImageSerializer
     permission_classes = [permissions.IsAuthenticated]
+
+
+class AsyncImageList(AsyncListCreateView):
+    """
+    GET: List all images, without filters
+    POST: Upload a new image
+    """
+    serializer_class = ImageSerializer
+    pagination_class = CreatedAtKeysetPagination
+    allow_create = True
+
+    def get_queryset(self):
+        return Image.objects.visible()
+
+
+class AsyncImageDetail(AsyncDetailView):
+    """
+    GET: Retrieve a specific image
+    """
+    serializer_class = ImageSerializer
+
+    def get_queryset(self):
+        return Image.objects.visible()
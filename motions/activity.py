@@ -0,0 +1,256 @@
+"""
+Time-bucketed motion activity per camera.
+
+Activity (event count, total duration and mean threshold) is aggregated in
+the database. Closed hours and days are rolled up incrementally into
+``MotionActivityRollup`` rows, so long ranges are answered from a few hundred
+precomputed rows plus a live aggregate over the still-open tail.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .history import HistoryChunk, motion_history_settings
+from .models import (
+    MotionActivityCheckpoint, MotionActivityRollup, MotionEvent, MotionHistoryChunk,
+)
+
+BUCKET_SIZES = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Rollup tiers, coarsest first. Each tier is built from the next finer one.
+ROLLUP_TIERS = [MotionActivityRollup.BUCKET_DAY, MotionActivityRollup.BUCKET_HOUR]
+
+
+def floor_to_bucket(value, bucket):
+    """Return the start of the ``bucket``-sized period containing ``value``."""
+    value = value.astimezone(timezone.get_current_timezone())
+    if bucket == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(second=0, microsecond=0)
+
+
+def _live_activity(camera_id, bucket, start, end):
+    """Aggregate live motion events in ``[start, end)`` into ``bucket`` periods."""
+    # Events marked for deletion are taken out of the rollups when marked.
+    return (
+        MotionEvent.objects
+        .filter(camera_id=camera_id, timestamp__gte=start, timestamp__lt=end, deleting=False)
+        .annotate(period=Trunc("timestamp", bucket))
+        .values("period")
+        .annotate(
+            count=Count("id"),
+            total_duration=Sum("duration"),
+            threshold_sum=Sum("threshold"),
+        )
+        .order_by("period")
+    )
+
+
+def _compacted_activity(camera_id, bucket, start, end):
+    """Aggregate compacted motion events in ``[start, end)`` into ``bucket`` periods."""
+    chunks = MotionHistoryChunk.objects.filter(
+        camera_id=camera_id, last_timestamp__gte=start, first_timestamp__lt=end
+    )
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for chunk in chunks.iterator():
+        for row in HistoryChunk.decode(chunk).rows():
+            if start <= row["timestamp"] < end:
+                period = totals[floor_to_bucket(row["timestamp"], bucket)]
+                period[0] += 1
+                period[1] += row["duration"]
+                period[2] += row["threshold"]
+    return [
+        {"period": period, "count": count, "total_duration": duration, "threshold_sum": threshold}
+        for period, (count, duration, threshold) in totals.items()
+    ]
+
+
+def _rolled_activity(camera_id, tier, bucket, start, end):
+    """Aggregate ``tier`` rollups in ``[start, end)`` into ``bucket`` periods."""
+    return (
+        MotionActivityRollup.objects
+        .filter(
+            camera_id=camera_id, bucket=tier,
+            bucket_start__gte=start, bucket_start__lt=end,
+        )
+        .annotate(period=Trunc("bucket_start", bucket))
+        .values("period")
+        .annotate(
+            count=Sum("count"),
+            total_duration=Sum("total_duration"),
+            threshold_sum=Sum("threshold_sum"),
+        )
+        .order_by("period")
+    )
+
+
+def motion_activity(camera_id, bucket, start, end):
+    """
+    Return the motion activity of a camera in ``[start, end)`` per ``bucket``.
+
+    ``start`` is floored to a bucket boundary; ``end`` is exact. Periods
+    covered by rollup tiers no larger than ``bucket`` are read from the
+    rollups and only the rest, including a partial last period, is aggregated
+    from live events and compacted history. Empty periods are omitted.
+    """
+    start = floor_to_bucket(start, bucket)
+    checkpoints = dict(
+        MotionActivityCheckpoint.objects
+        .filter(camera_id=camera_id)
+        .values_list("bucket", "rolled_until")
+    )
+
+    sources = []
+    cursor = start
+    for tier in ROLLUP_TIERS:
+        rolled_until = checkpoints.get(tier)
+        if BUCKET_SIZES[tier] > BUCKET_SIZES[bucket] or rolled_until is None:
+            continue
+        # A rollup counts its whole bucket, so stop at the last one before ``end``.
+        upper = min(rolled_until, floor_to_bucket(end, tier))
+        if upper > cursor:
+            sources.append(_rolled_activity(camera_id, tier, bucket, cursor, upper))
+            cursor = upper
+    if cursor < end:
+        sources.append(_live_activity(camera_id, bucket, cursor, end))
+        if motion_history_settings()["ENABLED"]:
+            # Compacted days are rolled up, but finer buckets still need their events.
+            sources.append(_compacted_activity(camera_id, bucket, cursor, end))
+
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for source in sources:
+        for row in source:
+            period = totals[row["period"]]
+            period[0] += row["count"]
+            period[1] += row["total_duration"]
+            period[2] += row["threshold_sum"]
+
+    return [
+        {
+            "bucket_start": period,
+            "count": count,
+            "total_duration": total_duration,
+            "mean_threshold": threshold_sum / count,
+        }
+        for period, (count, total_duration, threshold_sum) in sorted(totals.items())
+    ]
+
+
+def _roll_tier(camera_id, tier, source, until):
+    """Store the ``tier`` rollups in ``source`` and advance the checkpoint to ``until``."""
+    rows = [
+        MotionActivityRollup(
+            camera_id=camera_id,
+            bucket=tier,
+            bucket_start=row["period"],
+            count=row["count"],
+            total_duration=row["total_duration"],
+            threshold_sum=row["threshold_sum"],
+        )
+        for row in source
+    ]
+    with transaction.atomic():
+        MotionActivityRollup.objects.bulk_create(rows)
+        MotionActivityCheckpoint.objects.update_or_create(
+            camera_id=camera_id, bucket=tier, defaults={"rolled_until": until}
+        )
+    return len(rows)
+
+
+def roll_up_camera(camera_id, now=None):
+    """
+    Roll up the closed hours and days of one camera since its checkpoints.
+
+    Hours are aggregated from motion events and days from hour rollups.
+    Returns the number of rollup rows written per tier.
+    """
+    now = now or timezone.now()
+    checkpoints = dict(
+        MotionActivityCheckpoint.objects
+        .filter(camera_id=camera_id)
+        .values_list("bucket", "rolled_until")
+    )
+    written = {}
+
+    hour = MotionActivityRollup.BUCKET_HOUR
+    hour_since = checkpoints.get(hour)
+    if hour_since is None:
+        first = MotionEvent.objects.filter(camera_id=camera_id).aggregate(
+            first=Min("timestamp")
+        )["first"]
+        hour_since = floor_to_bucket(first, hour) if first else None
+    hour_until = floor_to_bucket(now, hour)
+    if hour_since is not None and hour_since < hour_until:
+        source = _live_activity(camera_id, hour, hour_since, hour_until)
+        written[hour] = _roll_tier(camera_id, hour, source, hour_until)
+        checkpoints[hour] = hour_until
+
+    day = MotionActivityRollup.BUCKET_DAY
+    if checkpoints.get(hour) is not None:
+        day_since = checkpoints.get(day)
+        if day_since is None:
+            first = MotionActivityRollup.objects.filter(
+                camera_id=camera_id, bucket=hour
+            ).aggregate(first=Min("bucket_start"))["first"]
+            day_since = floor_to_bucket(first, day) if first else None
+        day_until = floor_to_bucket(checkpoints[hour], day)
+        if day_since is not None and day_since < day_until:
+            source = _rolled_activity(camera_id, hour, day, day_since, day_until)
+            written[day] = _roll_tier(camera_id, day, source, day_until)
+    return written
+
+
+def adjust_rollups(events, sign):
+    """
+    Add (``sign`` 1) or remove (``sign`` -1) motion events from the closed
+    rollups that already cover them.
+
+    Rollups are only written once, so saving an event with a different
+    camera, duration or threshold, or marking it for deletion, has to
+    correct them in place. They cannot be rebuilt from live events, which
+    no longer hold purged or compacted history. Buckets left empty are
+    deleted, as empty periods are omitted.
+    """
+    events = list(events)
+    checkpoints = {
+        (camera_id, bucket): rolled_until
+        for camera_id, bucket, rolled_until in MotionActivityCheckpoint.objects.filter(
+            camera_id__in={event.camera_id for event in events}
+        ).values_list("camera_id", "bucket", "rolled_until")
+    }
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for event in events:
+        for tier in ROLLUP_TIERS:
+            rolled_until = checkpoints.get((event.camera_id, tier))
+            if rolled_until is not None and event.timestamp < rolled_until:
+                delta = deltas[(event.camera_id, tier, floor_to_bucket(event.timestamp, tier))]
+                delta[0] += sign
+                delta[1] += sign * event.duration
+                delta[2] += sign * event.threshold
+
+    with transaction.atomic():
+        for (camera_id, tier, bucket_start), (count, duration, threshold) in deltas.items():
+            rollups = MotionActivityRollup.objects.filter(
+                camera_id=camera_id, bucket=tier, bucket_start=bucket_start
+            )
+            updated = rollups.update(
+                count=F("count") + count,
+                total_duration=F("total_duration") + duration,
+                threshold_sum=F("threshold_sum") + threshold,
+            )
+            if not updated and count > 0:
+                MotionActivityRollup.objects.create(
+                    camera_id=camera_id, bucket=tier, bucket_start=bucket_start,
+                    count=count, total_duration=duration, threshold_sum=threshold,
+                )
+            rollups.filter(count=0).delete()
@@ -0,0 +1,93 @@
+"""
+Moving sealed motion events into the compact history store.
+
+A day is sealed once it ends ``MOTION_HISTORY["COMPACT_AFTER_DAYS"]`` days
+before now. Its events without images or detections are encoded into the
+camera's ``MotionHistoryChunk`` of that day and their rows are deleted, one
+day per transaction. Activity is rolled up first, so hourly and daily
+activity keeps answering from rollups. A day compacted again, for example
+after its images were purged, is merged into the existing chunk.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from detections.models import Detection
+from eyesedge.cache import bump_generation
+from images.models import Image
+
+from .activity import floor_to_bucket, roll_up_camera
+from .history import HistoryChunk, motion_history_settings
+from .models import MotionEvent, MotionHistoryChunk
+from .purge import _raw_delete
+
+# Motion events deleted per statement, within the day's transaction.
+DELETE_BATCH_SIZE = 500
+
+
+def compactable_events(camera_id, sealed_until):
+    """Return the camera's events before ``sealed_until`` that nothing else references."""
+    return (
+        MotionEvent.objects
+        .filter(camera_id=camera_id, deleting=False, timestamp__lt=sealed_until)
+        .exclude(Exists(Image.objects.filter(motion_event=OuterRef("pk"))))
+        .exclude(Exists(Detection.objects.filter(motion_event=OuterRef("pk"))))
+    )
+
+
+def compact_day(camera_id, events, day_start):
+    """
+    Move ``events`` of the day starting at ``day_start`` into its chunk.
+
+    Returns the number of events compacted.
+    """
+    day_events = events.filter(
+        timestamp__gte=day_start, timestamp__lt=day_start + timedelta(days=1)
+    )
+    with transaction.atomic():
+        rows = list(day_events.values("id", "timestamp", "duration", "threshold", "created_at"))
+        if not rows:
+            return 0
+        decoded = HistoryChunk.from_rows(camera_id, rows)
+        existing = (
+            MotionHistoryChunk.objects.select_for_update()
+            .filter(camera_id=camera_id, day_start=day_start)
+            .first()
+        )
+        if existing is not None:
+            decoded = decoded.merge(HistoryChunk.decode(existing))
+        chunk = decoded.to_chunk(day_start)
+        chunk.pk = existing.pk if existing is not None else None
+        chunk.save()
+
+        ids = [row["id"] for row in rows]
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            _raw_delete(MotionEvent.objects.filter(pk__in=ids[start:start + DELETE_BATCH_SIZE]))
+        # Raw deletes send no model signals, so invalidate cached responses here.
+        bump_generation("motion")
+    return len(rows)
+
+
+def compact_camera(camera_id, now=None, after_days=None):
+    """
+    Compact the camera's sealed days, oldest first.
+
+    ``after_days`` overrides ``MOTION_HISTORY["COMPACT_AFTER_DAYS"]``.
+    Returns the number of days and events compacted.
+    """
+    now = now or timezone.now()
+    if after_days is None:
+        after_days = motion_history_settings()["COMPACT_AFTER_DAYS"]
+    sealed_until = floor_to_bucket(now, "day") - timedelta(days=after_days)
+    roll_up_camera(camera_id, now=now)
+
+    events = compactable_events(camera_id, sealed_until)
+    totals = {"days": 0, "motion_events": 0}
+    while True:
+        first = events.order_by("timestamp").values_list("timestamp", flat=True).first()
+        if first is None:
+            return totals
+        totals["days"] += 1
+        totals["motion_events"] += compact_day(camera_id, events, floor_to_bucket(first, "day"))
@@ -0,0 +1,328 @@
+"""
+Compact columnar storage of sealed motion history.
+
+A busy camera records thousands of motion events a day, and every one is a
+wide ``MotionEvent`` row with two timestamps and two floats, plus its
+entries in three indexes. Once a day is sealed (older than
+``MOTION_HISTORY["COMPACT_AFTER_DAYS"]``) its events never change again,
+so ``manage.py compact_motion_history`` moves the events of each camera and
+day that have no images or detections into one ``MotionHistoryChunk``.
+
+A chunk stores its events column by column: IDs and timestamps as
+microsecond deltas from the previous event, ``created_at`` as the offset
+from ``timestamp``, then the durations and thresholds as doubles, all
+compressed with zlib. Consecutive events have small, similar deltas, so a
+chunk takes a few bytes per event. Decoding is exact, so compacted events
+are served byte-identical to rows.
+
+``MotionHistoryListMixin`` merges the chunks into the keyset pages of the
+motion list endpoints, with the same filters, when the store is enabled.
+"""
+import bisect
+import heapq
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.http import Http404
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.response import Response
+
+from eyesedge.fastpath import ReadPlan
+
+from .models import MotionEvent, MotionHistoryChunk
+
+FORMAT_VERSION = 1
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+# Motion event columns a chunk stores, keyed as ``values()`` returns them.
+COLUMNS = ("id", "camera", "timestamp", "duration", "threshold", "created_at")
+
+
+def motion_history_settings():
+    """Return ``settings.MOTION_HISTORY`` merged over the defaults."""
+    defaults = {"ENABLED": False, "COMPACT_AFTER_DAYS": 7}
+    return {**defaults, **getattr(settings, "MOTION_HISTORY", {})}
+
+
+def to_microseconds(value):
+    """Return an aware datetime as integer microseconds since the epoch."""
+    return (value - EPOCH) // MICROSECOND
+
+
+def from_microseconds(value):
+    """Return the UTC datetime of integer microseconds since the epoch."""
+    return EPOCH + timedelta(microseconds=value)
+
+
+def _deltas(values):
+    return [current - previous for previous, current in zip([0] + values, values)]
+
+
+def _accumulate(values):
+    total, result = 0, []
+    for value in values:
+        total += value
+        result.append(total)
+    return result
+
+
+def _little_endian(column):
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+class HistoryChunk:
+    """
+    The decoded events of one ``MotionHistoryChunk``, kept as columns.
+
+    Events are ordered on ``(timestamp, id)``, the keyset order of the list
+    endpoints. Timestamps are kept in microseconds, and rows are only built
+    for the events a reader asks for.
+    """
+
+    def __init__(self, camera_id, ids, timestamps, created_offsets, durations, thresholds):
+        self.camera_id = camera_id
+        self.ids = ids
+        self.timestamps = timestamps
+        self.created_offsets = created_offsets
+        self.durations = durations
+        self.thresholds = thresholds
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, camera_id, rows):
+        """Build a chunk from motion event dicts with the ``COLUMNS`` keys."""
+        rows = sorted(rows, key=lambda row: (row["timestamp"], row["id"]))
+        timestamps = [to_microseconds(row["timestamp"]) for row in rows]
+        return cls(
+            camera_id,
+            [row["id"] for row in rows],
+            timestamps,
+            [
+                to_microseconds(row["created_at"]) - timestamp
+                for row, timestamp in zip(rows, timestamps)
+            ],
+            [row["duration"] for row in rows],
+            [row["threshold"] for row in rows],
+        )
+
+    @classmethod
+    def decode(cls, chunk):
+        """Decode a ``MotionHistoryChunk``."""
+        data = bytes(chunk.data)
+        if data[0] != FORMAT_VERSION:
+            raise ValueError(f"Unknown motion history chunk format {data[0]}.")
+        raw = zlib.decompress(data[1:])
+        count = struct.unpack_from("<I", raw)[0]
+        columns, offset = [], 4
+        for typecode in "qqqdd":
+            column = array(typecode)
+            size = count * column.itemsize
+            column.frombytes(raw[offset:offset + size])
+            columns.append(_little_endian(column).tolist())
+            offset += size
+        ids, timestamps, created_offsets, durations, thresholds = columns
+        return cls(
+            chunk.camera_id, _accumulate(ids), _accumulate(timestamps),
+            created_offsets, durations, thresholds,
+        )
+
+    def encode(self):
+        """Return the compressed column data of the chunk."""
+        columns = [
+            array("q", _deltas(self.ids)),
+            array("q", _deltas(self.timestamps)),
+            array("q", self.created_offsets),
+            array("d", self.durations),
+            array("d", self.thresholds),
+        ]
+        raw = struct.pack("<I", len(self)) + b"".join(
+            _little_endian(column).tobytes() for column in columns
+        )
+        return bytes([FORMAT_VERSION]) + zlib.compress(raw, 9)
+
+    def merge(self, other):
+        """Return a chunk of the events of both chunks."""
+        return HistoryChunk.from_rows(self.camera_id, self.rows() + other.rows())
+
+    def row(self, index):
+        """Return the event at ``index`` as a dict with the ``COLUMNS`` keys."""
+        timestamp = self.timestamps[index]
+        return {
+            "id": self.ids[index],
+            "camera": self.camera_id,
+            "timestamp": from_microseconds(timestamp),
+            "duration": self.durations[index],
+            "threshold": self.thresholds[index],
+            "created_at": from_microseconds(timestamp + self.created_offsets[index]),
+        }
+
+    def rows(self, start=0):
+        """Return the events from ``start`` on as dicts."""
+        return [self.row(index) for index in range(start, len(self))]
+
+    def index_after(self, key):
+        """Return the index of the first event after the ``(timestamp, id)`` key."""
+        timestamp, pk = key
+        return bisect.bisect_right(
+            list(zip(self.timestamps, self.ids)), (to_microseconds(timestamp), pk)
+        )
+
+    def find(self, pk):
+        """Return the event with ID ``pk`` as a dict, or ``None``."""
+        try:
+            return self.row(self.ids.index(pk))
+        except ValueError:
+            return None
+
+    def to_chunk(self, day_start):
+        """Return an unsaved ``MotionHistoryChunk`` of the events."""
+        return MotionHistoryChunk(
+            camera_id=self.camera_id,
+            day_start=day_start,
+            count=len(self),
+            first_id=min(self.ids),
+            last_id=max(self.ids),
+            first_timestamp=from_microseconds(self.timestamps[0]),
+            last_timestamp=from_microseconds(self.timestamps[-1]),
+            data=self.encode(),
+        )
+
+
+def _row_key(row):
+    return row["timestamp"], row["id"]
+
+
+def compacted_rows(chunks, lookups=None, after=None, limit=None, bound=None):
+    """
+    Return the compacted events of ``chunks`` in ``(timestamp, id)`` order.
+
+    Only events equal to every ``lookups`` value and after the ``after`` key
+    are returned, at most ``limit`` of them. Events past the ``bound`` key
+    are left out; chunks are read in order of their first timestamp and
+    reading stops at the first chunk that cannot contain a qualifying event.
+    """
+    lookups = lookups or {}
+    if after is not None:
+        chunks = chunks.filter(last_timestamp__gte=after[0])
+    if bound is not None:
+        chunks = chunks.filter(first_timestamp__lte=bound[0])
+    found = []
+    for chunk in chunks.order_by("first_timestamp", "pk").iterator():
+        if bound is not None and chunk.first_timestamp > bound[0]:
+            break
+        decoded = HistoryChunk.decode(chunk)
+        start = decoded.index_after(after) if after is not None else 0
+        for index in range(start, len(decoded)):
+            row = decoded.row(index)
+            if bound is not None and _row_key(row) > bound:
+                break
+            if all(row[name] == value for name, value in lookups.items()):
+                found.append(row)
+                if limit is not None and len(found) > limit:
+                    found = heapq.nsmallest(limit, found, key=_row_key)
+                    bound = _row_key(found[-1])
+    return sorted(found, key=_row_key)
+
+
+def compacted_event(pk):
+    """Return the visible compacted event with ID ``pk`` as a dict, or ``None``."""
+    chunks = MotionHistoryChunk.objects.visible().filter(first_id__lte=pk, last_id__gte=pk)
+    for chunk in chunks.iterator():
+        row = HistoryChunk.decode(chunk).find(pk)
+        if row is not None:
+            return row
+    return None
+
+
+class MotionHistoryListMixin:
+    """
+    Merge compacted motion history into the keyset pages of ``list``.
+
+    Place it after ``CachedResponseMixin`` and before ``FastListMixin``.
+    Views override ``get_history_chunks`` to narrow the chunks they read.
+    Exact ``filterset_fields`` filters apply to compacted events too.
+    """
+
+    def get_history_chunks(self):
+        """Return the chunks the view reads compacted events from."""
+        return MotionHistoryChunk.objects.visible()
+
+    def history_lookups(self, request, queryset):
+        """Return the request's filters as ``{column: value}``."""
+        filterset = DjangoFilterBackend().get_filterset(request, queryset, self)
+        lookups = {}
+        if filterset is None or not filterset.is_valid():
+            return lookups
+        for name, value in filterset.form.cleaned_data.items():
+            if value is None or value == "":
+                continue
+            field = MotionEvent._meta.get_field(name)
+            lookups[name] = value.pk if field.is_relation else field.get_prep_value(value)
+        return lookups
+
+    def filter_history_chunks(self, chunks, lookups):
+        """Narrow ``chunks`` to those that can hold events matching ``lookups``."""
+        if "camera" in lookups:
+            chunks = chunks.filter(camera_id=lookups["camera"])
+        if "timestamp" in lookups:
+            chunks = chunks.filter(
+                first_timestamp__lte=lookups["timestamp"],
+                last_timestamp__gte=lookups["timestamp"],
+            )
+        if "id" in lookups:
+            chunks = chunks.filter(first_id__lte=lookups["id"], last_id__gte=lookups["id"])
+        return chunks
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_read_plan()
+        if plan is None or self.paginator is None or not motion_history_settings()["ENABLED"]:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = self.paginator
+        rows = list(paginator.page_queryset(
+            plan.rows(queryset, "id", paginator.ordering_field), request
+        ))
+        limit = paginator.page_size + 1
+        lookups = self.history_lookups(request, queryset)
+        compacted = compacted_rows(
+            self.filter_history_chunks(self.get_history_chunks(), lookups),
+            lookups,
+            after=paginator.cursor,
+            limit=limit,
+            bound=_row_key(rows[-1]) if len(rows) == limit else None,
+        )
+        if compacted:
+            paths = plan.paths + tuple(
+                path for path in ("id", paginator.ordering_field) if path not in plan.paths
+            )
+            compacted = [{path: row[path] for path in paths} for row in compacted]
+            rows = heapq.nsmallest(limit, rows + compacted, key=_row_key)
+        page = paginator.set_page(rows)
+        return self.get_paginated_response(plan.represent(page))
+
+
+class MotionHistoryDetailMixin:
+    """Answer ``retrieve`` for compacted events when the row is gone."""
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            if not motion_history_settings()["ENABLED"]:
+                raise
+            row = compacted_event(int(self.kwargs[self.lookup_url_kwarg or self.lookup_field]))
+            if row is None:
+                raise
+        plan = ReadPlan.for_serializer_class(self.get_serializer_class())
+        return Response(plan.represent([{path: row[path] for path in plan.paths}])[0])
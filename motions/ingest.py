@@ -0,0 +1,152 @@
+"""
+Batched ingest of motion events with nested images and detections.
+
+A batch is validated in one pass and written with one ``bulk_create`` per
+model inside a single transaction, so the number of queries depends on the
+batch size only through the database's parameter limits.
+"""
+from django.db import IntegrityError, transaction
+
+from cameras.registry import registry
+from detections.models import Detection
+from detections.serializers import DetectionSerializer
+from detections.signals import detections_created
+from eyesedge.cache import bump_generation
+from eyesedge.schema_validation import (
+    compile_schema,
+    schema_registry,
+    validate_batch_with_schema,
+)
+from images.models import Image
+from images.serializers import ImageSerializer
+
+from .models import MotionEvent
+from .serializers import MotionEventSerializer
+from .signals import motion_events_created
+
+
+def detection_schema():
+    """Return the JSON Schema for a detection nested in an event or image."""
+    schema = schema_registry.schema(DetectionSerializer)
+    del schema["properties"]["motion_event"]
+    del schema["properties"]["image"]
+    return schema
+
+
+def ingest_item_schema():
+    """Return the JSON Schema for one motion event of an ingest batch."""
+    detections = {"type": "array", "items": detection_schema()}
+
+    image_schema = schema_registry.schema(ImageSerializer)
+    del image_schema["properties"]["motion_event"]
+    image_schema["required"].remove("motion_event")
+    image_schema["properties"]["detections"] = detections
+
+    schema = schema_registry.schema(MotionEventSerializer)
+    schema["properties"]["images"] = {"type": "array", "items": image_schema}
+    schema["properties"]["detections"] = detections
+    return schema
+
+
+ITEM_VALIDATOR = compile_schema(ingest_item_schema())
+
+
+def validate_batch(items):
+    """
+    Validate every item of a batch.
+
+    Returns a list aligned with ``items`` holding ``None`` for valid items and
+    an error dict for invalid ones. Camera references are checked against
+    the camera registry, with one query only when some are not in it.
+    """
+    errors = validate_batch_with_schema(items, ITEM_VALIDATOR)
+    known = registry.snapshot_with(
+        item["camera"] for item, error in zip(items, errors) if error is None
+    ).by_id
+    for index, item in enumerate(items):
+        if errors[index] is None and item["camera"] not in known:
+            errors[index] = {
+                "camera": [f'Invalid pk "{item["camera"]}" - object does not exist.']
+            }
+    return errors
+
+
+@transaction.atomic
+def write_batch(items):
+    """
+    Write validated items and return one ``{"id", "images", "detections"}``
+    dict per item with the IDs of the created rows.
+    """
+    events = [
+        MotionEvent(
+            camera_id=item["camera"],
+            duration=item["duration"],
+            threshold=item.get("threshold", 0.25),
+        )
+        for item in items
+    ]
+    MotionEvent.objects.bulk_create(events)
+
+    images = []
+    for item, event in zip(items, events):
+        for image in item.get("images", []):
+            images.append(Image(
+                motion_event=event,
+                camera_id=event.camera_id,
+                filepath=image["filepath"],
+                filesize=image.get("filesize"),
+            ))
+    Image.objects.bulk_create(images)
+
+    detections = []
+    image_iter = iter(images)
+    for item, event in zip(items, events):
+        for detection in item.get("detections", []):
+            detections.append(
+                Detection(motion_event=event, camera_id=event.camera_id, **detection)
+            )
+        for image_data, image in zip(item.get("images", []), image_iter):
+            for detection in image_data.get("detections", []):
+                detections.append(Detection(
+                    motion_event=event, image=image, camera_id=event.camera_id, **detection
+                ))
+    Detection.objects.bulk_create(detections)
+    # bulk_create sends no model signals, so invalidate cached responses here.
+    bump_generation("motion", "image", "detection")
+    motion_events_created.send(sender=MotionEvent, events=events, images=images)
+    detections_created.send(sender=Detection, detections=detections)
+
+    results = {event.pk: {"id": event.pk, "images": [], "detections": []} for event in events}
+    for image in images:
+        results[image.motion_event_id]["images"].append(image.pk)
+    for detection in detections:
+        results[detection.motion_event_id]["detections"].append(detection.pk)
+    return [results[event.pk] for event in events]
+
+
+def ingest_batch(items):
+    """
+    Validate and write a batch, returning per-item results.
+
+    Valid items are written even when others in the batch fail; each result
+    carries its ``index`` in the request and a ``status`` of ``created`` or
+    ``error``.
+    """
+    errors = validate_batch(items)
+    valid = [item for item, error in zip(items, errors) if error is None]
+    try:
+        written = iter(write_batch(valid) if valid else [])
+    except IntegrityError:
+        # The registry can still hold a camera another process has deleted.
+        registry.refresh()
+        errors = validate_batch(items)
+        valid = [item for item, error in zip(items, errors) if error is None]
+        written = iter(write_batch(valid) if valid else [])
+
+    results = []
+    for index, error in enumerate(errors):
+        if error is None:
+            results.append({"index": index, "status": "created", **next(written)})
+        else:
+            results.append({"index": index, "status": "error", "errors": error})
+    return results
@@ -0,0 +1,38 @@
+"""Move sealed days of motion events into the compact history store."""
+from django.core.management.base import BaseCommand, CommandError
+
+from cameras.models import Camera
+from motions.compaction import compact_camera
+from motions.history import motion_history_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact the motion events of sealed days without images or detections into "
+        "one compressed chunk per camera and day."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--camera", type=int, action="append", dest="cameras",
+            help="Only compact the given camera ID; may be repeated.",
+        )
+        parser.add_argument(
+            "--after-days", type=int,
+            help="Compact days older than this (default MOTION_HISTORY['COMPACT_AFTER_DAYS']).",
+        )
+
+    def handle(self, *args, **options):
+        if not motion_history_settings()["ENABLED"]:
+            raise CommandError(
+                "The compact history store is disabled; set MOTION_HISTORY['ENABLED'] first."
+            )
+        cameras = Camera.objects.filter(deleting=False).order_by("pk").values_list("pk", flat=True)
+        if options["cameras"]:
+            cameras = cameras.filter(pk__in=options["cameras"])
+        for camera_id in cameras:
+            totals = compact_camera(camera_id, after_days=options["after_days"])
+            self.stdout.write(
+                f"Camera {camera_id}: compacted {totals['motion_events']} motion events "
+                f"of {totals['days']} days."
+            )
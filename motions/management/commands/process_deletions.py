@@ -0,0 +1,36 @@
+"""Remove cameras and motion events marked for deletion, in bounded chunks."""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from motions.purge import process_deletions, retention_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete cameras and motion events marked for deletion through the API, with "
+        "their images, detections and alerts, in bounded chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int,
+            help="Rows deleted per transaction (default RETENTION['CHUNK_SIZE']).",
+        )
+        parser.add_argument(
+            "--watch", type=float, metavar="SECONDS",
+            help="Keep running, checking for new deletions every SECONDS.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"] or retention_settings()["CHUNK_SIZE"]
+        while True:
+            totals = process_deletions(chunk_size)
+            if totals:
+                summary = ", ".join(f"{count} {label}" for label, count in totals.items())
+                self.stdout.write(f"Deleted {summary}.")
+            if options["watch"] is None:
+                return
+            time.sleep(options["watch"])
+            close_old_connections()
@@ -0,0 +1,75 @@
+"""Delete, and optionally archive, motion history past its retention period."""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from django.utils import timezone
+
+from cameras.models import Camera, RetentionPolicy
+from motions.models import MotionEvent, MotionHistoryChunk
+from motions.purge import purge_camera, retention_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove motion events older than each camera's retention period, with their "
+        "images, detections and alerts, in bounded chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--camera", type=int, action="append", dest="cameras",
+            help="Only purge the given camera ID; may be repeated.",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int,
+            help="Motion events deleted per transaction (default RETENTION['CHUNK_SIZE']).",
+        )
+        parser.add_argument(
+            "--max-chunks", type=int,
+            help="Stop each camera after this many chunks; a later run continues.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only report how many motion events each camera would lose.",
+        )
+
+    def handle(self, *args, **options):
+        config = retention_settings()
+        chunk_size = options["chunk_size"] or config["CHUNK_SIZE"]
+        policies = {policy.camera_id: policy for policy in RetentionPolicy.objects.all()}
+        cameras = Camera.objects.order_by("pk").values_list("pk", flat=True)
+        if options["cameras"]:
+            cameras = cameras.filter(pk__in=options["cameras"])
+
+        for camera_id in cameras:
+            policy = policies.get(camera_id)
+            keep_days = policy.keep_days if policy else config["KEEP_DAYS"]
+            archive = policy.archive if policy else config["ARCHIVE"]
+            if keep_days is None:
+                continue
+
+            if options["dry_run"]:
+                cutoff = timezone.now() - timedelta(days=keep_days)
+                expired = MotionEvent.objects.filter(
+                    camera_id=camera_id, timestamp__lt=cutoff
+                ).count()
+                expired += MotionHistoryChunk.objects.filter(
+                    camera_id=camera_id, last_timestamp__lt=cutoff
+                ).aggregate(count=Sum("count"))["count"] or 0
+                self.stdout.write(
+                    f"Camera {camera_id}: {expired} motion events past {keep_days} days."
+                )
+                continue
+
+            totals, archives = purge_camera(
+                camera_id,
+                keep_days,
+                archive_dir=config["ARCHIVE_DIR"] if archive else None,
+                chunk_size=chunk_size,
+                max_chunks=options["max_chunks"],
+            )
+            summary = ", ".join(f"{count} {label}" for label, count in totals.items())
+            self.stdout.write(f"Camera {camera_id}: deleted {summary}.")
+            for path in archives:
+                self.stdout.write(f"  archived {path}")
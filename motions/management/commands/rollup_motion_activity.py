@@ -0,0 +1,26 @@
+"""Incrementally roll up closed hours and days of motion activity."""
+from django.core.management.base import BaseCommand
+
+from cameras.models import Camera
+from motions.activity import roll_up_camera
+
+
+class Command(BaseCommand):
+    help = "Roll up closed hours and days of motion activity since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--camera", type=int, action="append", dest="cameras",
+            help="Only roll up the given camera ID; may be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        cameras = Camera.objects.order_by("pk").values_list("pk", flat=True)
+        if options["cameras"]:
+            cameras = cameras.filter(pk__in=options["cameras"])
+        totals = {}
+        for camera_id in cameras:
+            for tier, count in roll_up_camera(camera_id).items():
+                totals[tier] = totals.get(tier, 0) + count
+        summary = ", ".join(f"{count} {tier}" for tier, count in sorted(totals.items()))
+        self.stdout.write(f"Wrote {summary or 'no'} rollup rows.")
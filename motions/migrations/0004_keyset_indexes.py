@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cameras', '0002_remove_camera_motion_sensitivity'),
+        ('motions', '0003_alter_motionevent_duration'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='motionevent',
+            index=models.Index(fields=['timestamp', 'id'], name='motion_ts_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='motionevent',
+            index=models.Index(fields=['camera', 'timestamp', 'id'], name='motion_camera_ts_id_idx'),
+        ),
+    ]
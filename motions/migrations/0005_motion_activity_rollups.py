@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cameras', '0002_remove_camera_motion_sensitivity'),
+        ('motions', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MotionActivityCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=8)),
+                ('rolled_until', models.DateTimeField()),
+                ('camera', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='motion_rollup_checkpoints', to='cameras.camera')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('camera', 'bucket'), name='motion_rollup_checkpoint_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MotionActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=8)),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField()),
+                ('total_duration', models.FloatField()),
+                ('threshold_sum', models.FloatField()),
+                ('camera', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='motion_rollups', to='cameras.camera')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('camera', 'bucket', 'bucket_start'), name='motion_rollup_unique_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motions', '0005_motion_activity_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='motionevent',
+            name='deleting',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='motionevent',
+            index=models.Index(condition=models.Q(('deleting', True)), fields=['id'], name='motion_deleting_idx'),
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from eyesedge.operations import AddBrinIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motions', '0006_deferred_delete'),
+    ]
+
+    operations = [
+        AddBrinIndex(model_name='motionevent', field='timestamp', name='motion_ts_brin'),
+    ]
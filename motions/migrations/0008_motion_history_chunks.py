@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cameras', '0004_deferred_delete'),
+        ('motions', '0007_brin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MotionHistoryChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day_start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField()),
+                ('first_id', models.BigIntegerField()),
+                ('last_id', models.BigIntegerField()),
+                ('first_timestamp', models.DateTimeField()),
+                ('last_timestamp', models.DateTimeField()),
+                ('data', models.BinaryField()),
+                ('camera', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='motion_history_chunks', to='cameras.camera')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['first_timestamp'], name='motion_chunk_first_ts_idx'), models.Index(fields=['first_id', 'last_id'], name='motion_chunk_ids_idx')],
+                'constraints': [models.UniqueConstraint(fields=('camera', 'day_start'), name='motion_chunk_unique_day')],
+            },
+        ),
+    ]
@@ -2,7 +2,15 @@
 Models for the motions app.
 Defines the MotionEvent model for recording motion detection events.
 """
-from django.db import models
+from django.db import models, transaction
+
+
+class MotionEventQuerySet(models.QuerySet):
+    """Query helpers shared by the motion event endpoints."""
+
+    def visible(self):
+        """Exclude events waiting for deferred deletion, directly or with their camera."""
+        return self.filter(deleting=False, camera__deleting=False)
 
 
 class MotionEvent(models.Model):
@@ -21,7 +29,163 @@ class MotionEvent(models.Model):
     duration = models.FloatField(null=False, blank=False, default=0.0)
     created_at = models.DateTimeField(auto_now_add=True)
     threshold = models.FloatField(default=0.25)
+    deleting = models.BooleanField(default=False)
+
+    objects = MotionEventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["timestamp", "id"], name="motion_ts_id_idx"),
+            models.Index(fields=["camera", "timestamp", "id"], name="motion_camera_ts_id_idx"),
+            models.Index(
+                fields=["id"], condition=models.Q(deleting=True), name="motion_deleting_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Save the event, move its images and detections along with its camera
+        and correct the activity rollups that counted its old values.
+        """
+        # pylint: disable=import-outside-toplevel
+        from .activity import adjust_rollups
+
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            previous = (
+                MotionEvent.objects.filter(pk=self.pk, deleting=False)
+                .only("camera_id", "timestamp", "duration", "threshold")
+                .first()
+            )
+            super().save(*args, **kwargs)
+            detections = self.detections.model.objects.filter(
+                models.Q(motion_event=self) | models.Q(image__motion_event=self)
+            )
+            for related in (self.images.all(), detections):
+                related.exclude(camera_id=self.camera_id).update(camera_id=self.camera_id)
+            fields = ("camera_id", "timestamp", "duration", "threshold")
+            if previous is not None and any(
+                getattr(previous, name) != getattr(self, name) for name in fields
+            ):
+                adjust_rollups([previous], -1)
+                adjust_rollups([self], 1)
 
     def __str__(self):
         """Return a description of the motion event."""
         return f"Motion detected by {self.camera} at {self.timestamp}"
+
+
+class MotionActivityRollup(models.Model):
+    """
+    Precomputed motion activity of one camera over one closed time bucket.
+
+    Stores sums rather than means so rollups combine exactly into coarser
+    buckets: the mean threshold is ``threshold_sum / count``.
+    """
+    BUCKET_HOUR = "hour"
+    BUCKET_DAY = "day"
+
+    BUCKET_CHOICES = [
+        (BUCKET_HOUR, "Hour"),
+        (BUCKET_DAY, "Day"),
+    ]
+    camera = models.ForeignKey(
+        'cameras.Camera',
+        on_delete=models.CASCADE,
+        related_name='motion_rollups'
+    )
+    bucket = models.CharField(max_length=8, choices=BUCKET_CHOICES)
+    bucket_start = models.DateTimeField()
+    count = models.PositiveIntegerField()
+    total_duration = models.FloatField()
+    threshold_sum = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["camera", "bucket", "bucket_start"], name="motion_rollup_unique_bucket"
+            ),
+        ]
+
+    def __str__(self):
+        """Return a description of the rolled-up bucket."""
+        return (
+            f"{self.count} motion events on camera {self.camera_id} "
+            f"({self.bucket} {self.bucket_start})"
+        )
+
+
+class MotionActivityCheckpoint(models.Model):
+    """
+    Progress of the motion activity rollup for one camera and bucket size.
+
+    Every bucket starting before ``rolled_until`` is closed and stored in
+    ``MotionActivityRollup``; later activity is aggregated from live events.
+    """
+    camera = models.ForeignKey(
+        'cameras.Camera',
+        on_delete=models.CASCADE,
+        related_name='motion_rollup_checkpoints'
+    )
+    bucket = models.CharField(max_length=8, choices=MotionActivityRollup.BUCKET_CHOICES)
+    rolled_until = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["camera", "bucket"], name="motion_rollup_checkpoint_unique"
+            ),
+        ]
+
+    def __str__(self):
+        """Return a description of the checkpoint."""
+        return f"camera {self.camera_id} {self.bucket} rollups until {self.rolled_until}"
+
+
+class MotionHistoryChunkQuerySet(models.QuerySet):
+    """Query helpers shared by the compact history readers."""
+
+    def visible(self):
+        """Exclude the chunks of cameras waiting for deferred deletion."""
+        return self.filter(camera__deleting=False)
+
+
+class MotionHistoryChunk(models.Model):
+    """
+    One camera's compacted motion events of one sealed day.
+
+    ``data`` holds the events column by column, delta-encoded and
+    compressed (see ``motions.history``). The other fields bound the events
+    in the chunk, so readers fetch only the chunks a query can touch.
+    """
+    camera = models.ForeignKey(
+        'cameras.Camera',
+        on_delete=models.CASCADE,
+        related_name='motion_history_chunks'
+    )
+    day_start = models.DateTimeField()
+    count = models.PositiveIntegerField()
+    first_id = models.BigIntegerField()
+    last_id = models.BigIntegerField()
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    data = models.BinaryField()
+
+    objects = MotionHistoryChunkQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["camera", "day_start"], name="motion_chunk_unique_day"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["first_timestamp"], name="motion_chunk_first_ts_idx"),
+            models.Index(fields=["first_id", "last_id"], name="motion_chunk_ids_idx"),
+        ]
+
+    def __str__(self):
+        """Return a description of the chunk."""
+        return f"{self.count} compacted motion events of camera {self.camera_id} ({self.day_start})"
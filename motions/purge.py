@@ -0,0 +1,252 @@
+"""
+Chunked removal of motion history and of deleted cameras and motion events.
+
+Motion events are deleted bottom-up, alerts first and the events last, with
+one plain DELETE per table and chunk. This bypasses Django's cascade
+collector, which would load every related row into memory and send a
+signal per row. Each chunk commits on its own, so memory use and lock hold
+time are bounded by the chunk size, and an interrupted run resumes where it
+stopped when started again.
+
+Cameras and motion events deleted through the API are only marked
+``deleting`` (see ``eyesedge.deletion``) and removed here by
+``process_deletions``.
+"""
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from alerts.models import Alert
+from cameras.models import Camera
+from detections.models import Detection
+from eyesedge.cache import bump_generation
+from images.models import Image
+
+from .activity import roll_up_camera
+from .history import HistoryChunk
+from .models import MotionEvent, MotionHistoryChunk
+
+
+def retention_settings():
+    """Return ``settings.RETENTION`` merged over the defaults."""
+    defaults = {"KEEP_DAYS": None, "ARCHIVE": False, "ARCHIVE_DIR": "archive", "CHUNK_SIZE": 1000}
+    return {**defaults, **getattr(settings, "RETENTION", {})}
+
+
+def _raw_delete(queryset):
+    """DELETE the rows of ``queryset`` in one statement, without signals or cascades."""
+    # An empty ``pk__in`` list is answered without a query and returns None.
+    return queryset._raw_delete(queryset.db) or 0  # pylint: disable=protected-access
+
+
+def history_querysets(event_ids):
+    """Return ``(label, queryset)`` for the events and their descendants, children first."""
+    events = MotionEvent.objects.filter(pk__in=event_ids)
+    images = Image.objects.filter(motion_event_id__in=event_ids)
+    detections = Detection.objects.filter(
+        Q(motion_event_id__in=event_ids) | Q(image__motion_event_id__in=event_ids)
+    )
+    alerts = Alert.objects.filter(detection_id__in=detections.values("pk"))
+    return [
+        ("alerts", alerts),
+        ("detections", detections),
+        ("images", images),
+        ("motion_events", events),
+    ]
+
+
+def delete_history(event_ids):
+    """
+    Delete the motion events in ``event_ids`` with everything that hangs off
+    them, in one transaction. Returns the number of rows deleted per table.
+    """
+    counts = {}
+    with transaction.atomic():
+        for label, queryset in history_querysets(event_ids):
+            counts[label] = _raw_delete(queryset)
+        # Raw deletes send no model signals, so invalidate cached responses here.
+        bump_generation("motion", "image", "detection")
+    return counts
+
+
+def delete_images(image_ids):
+    """Delete the images in ``image_ids`` with their detections and alerts."""
+    detections = Detection.objects.filter(image_id__in=image_ids)
+    with transaction.atomic():
+        counts = {
+            "alerts": _raw_delete(Alert.objects.filter(detection_id__in=detections.values("pk"))),
+            "detections": _raw_delete(detections),
+            "images": _raw_delete(Image.objects.filter(pk__in=image_ids)),
+        }
+        bump_generation("image", "detection")
+    return counts
+
+
+def _add_counts(totals, counts):
+    for label, count in counts.items():
+        totals[label] = totals.get(label, 0) + count
+    return totals
+
+
+def delete_motion_event(event_id, chunk_size=1000):
+    """
+    Delete a motion event: its images ``chunk_size`` at a time, then what is
+    left together with the event. Returns the number of rows deleted per table.
+    """
+    totals = {}
+    while True:
+        image_ids = list(
+            Image.objects.filter(motion_event_id=event_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not image_ids:
+            break
+        _add_counts(totals, delete_images(image_ids))
+    return _add_counts(totals, delete_history([event_id]))
+
+
+def delete_camera(camera_id, chunk_size=1000):
+    """
+    Delete a camera: its motion events ``chunk_size`` at a time with their
+    descendants, then its remaining dependents together with the camera.
+    Returns the number of rows deleted per table.
+    """
+    totals = {}
+    events = MotionEvent.objects.filter(camera_id=camera_id).order_by("pk")
+    while True:
+        event_ids = list(events.values_list("pk", flat=True)[:chunk_size])
+        if not event_ids:
+            break
+        _add_counts(totals, delete_history(event_ids))
+
+    with transaction.atomic():
+        # Events written after the last chunk go in the final transaction.
+        _add_counts(totals, delete_history(list(events.values_list("pk", flat=True))))
+        for relation in Camera._meta.related_objects:
+            if relation.related_model is not MotionEvent:
+                _raw_delete(
+                    relation.related_model._base_manager.filter(
+                        **{relation.field.name: camera_id}
+                    )
+                )
+        totals["cameras"] = _raw_delete(Camera.objects.filter(pk=camera_id))
+        bump_generation("camera")
+    return totals
+
+
+def process_deletions(chunk_size=1000):
+    """
+    Delete every camera and motion event marked ``deleting``.
+
+    Returns the number of rows deleted per table.
+    """
+    totals = {}
+    for camera_id in Camera.objects.filter(deleting=True).values_list("pk", flat=True):
+        _add_counts(totals, delete_camera(camera_id, chunk_size))
+    for event_id in MotionEvent.objects.filter(deleting=True).values_list("pk", flat=True):
+        _add_counts(totals, delete_motion_event(event_id, chunk_size))
+    return totals
+
+
+def archive_history(event_ids, directory, name):
+    """
+    Write the events in ``event_ids`` and their descendants to
+    ``directory/name.ndjson.gz``, one ``{"model", "fields"}`` object per row.
+
+    The file is written under a temporary name and renamed when complete,
+    so a partial archive is never mistaken for a finished one.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.ndjson.gz")
+    partial = path + ".partial"
+    with gzip.open(partial, "wt", encoding="utf-8") as handle:
+        for label, queryset in reversed(history_querysets(event_ids)):
+            for row in queryset.order_by("pk").values().iterator():
+                handle.write(json.dumps({"model": label, "fields": row}, cls=DjangoJSONEncoder))
+                handle.write("\n")
+    os.replace(partial, path)
+    return path
+
+
+def archive_compacted(chunk, directory):
+    """
+    Write the events of a ``MotionHistoryChunk`` to
+    ``directory/motions-compacted-<day>.ndjson.gz``, like ``archive_history``.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"motions-compacted-{chunk.day_start:%Y-%m-%d}.ndjson.gz")
+    partial = path + ".partial"
+    with gzip.open(partial, "wt", encoding="utf-8") as handle:
+        for row in HistoryChunk.decode(chunk).rows():
+            row["camera_id"] = row.pop("camera")
+            fields = {**row, "deleting": False}
+            handle.write(json.dumps(
+                {"model": "motion_events", "fields": fields}, cls=DjangoJSONEncoder
+            ))
+            handle.write("\n")
+    os.replace(partial, path)
+    return path
+
+
+def expired_event_chunks(camera_id, cutoff, chunk_size):
+    """Yield the IDs of the camera's events older than ``cutoff``, oldest first."""
+    while True:
+        ids = list(
+            MotionEvent.objects
+            .filter(camera_id=camera_id, timestamp__lt=cutoff)
+            .order_by("timestamp", "id")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return
+        yield ids
+
+
+def purge_camera(camera_id, keep_days, archive_dir=None, chunk_size=1000, max_chunks=None,
+                 now=None):
+    """
+    Remove the camera's motion history older than ``keep_days``.
+
+    Closed hours and days are rolled up first, so the activity endpoint
+    keeps answering for purged periods. With ``archive_dir`` every chunk is
+    archived before it is deleted. Compacted days are removed once all of
+    their events are older than ``keep_days``. Stops after ``max_chunks`` chunks when
+    given. Returns the number of rows deleted per table and the archive
+    paths written.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=keep_days)
+    roll_up_camera(camera_id, now=now)
+
+    totals = {"alerts": 0, "detections": 0, "images": 0, "motion_events": 0}
+    archives = []
+    for index, event_ids in enumerate(expired_event_chunks(camera_id, cutoff, chunk_size)):
+        if max_chunks is not None and index >= max_chunks:
+            break
+        if archive_dir is not None:
+            name = f"motions-{event_ids[0]}-{event_ids[-1]}"
+            archives.append(archive_history(
+                event_ids, os.path.join(archive_dir, f"camera-{camera_id}"), name
+            ))
+        for label, count in delete_history(event_ids).items():
+            totals[label] += count
+
+    expired = MotionHistoryChunk.objects.filter(camera_id=camera_id, last_timestamp__lt=cutoff)
+    for chunk in expired.order_by("day_start").iterator():
+        if archive_dir is not None:
+            archives.append(archive_compacted(
+                chunk, os.path.join(archive_dir, f"camera-{camera_id}")
+            ))
+        with transaction.atomic():
+            _raw_delete(MotionHistoryChunk.objects.filter(pk=chunk.pk))
+            bump_generation("motion")
+        totals["motion_events"] += chunk.count
+    return totals, archives
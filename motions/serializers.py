@@ -2,13 +2,19 @@
 Serializers for the motions app.
 Provides serialization for MotionEvent model.
 """
+from django.db import IntegrityError
 from rest_framework import serializers
+from cameras.models import Camera
+from cameras.registry import RegistryCameraField, registry
 from .models import MotionEvent
-from eyesedge.schema_validation import validate_payload_with_schema
+from eyesedge.metrics import TimedSerializerMixin
+from eyesedge.schema_validation import schema_registry, validate_payload_with_schema
 
 
-class MotionEventSerializer(serializers.ModelSerializer):
+@schema_registry.register
+class MotionEventSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for MotionEvent model with timestamp as read-only."""
+    camera = RegistryCameraField(queryset=Camera.objects.visible())
 
     @staticmethod
     def _json_schema(partial=False):
@@ -40,9 +46,24 @@ class MotionEventSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         payload = self.initial_data if isinstance(self.initial_data, dict) else attrs
-        validate_payload_with_schema(payload, self._json_schema(partial=self.partial))
+        validate_payload_with_schema(
+            payload, schema_registry.validator(type(self), partial=self.partial)
+        )
         return super().validate(attrs)
 
+    def create(self, validated_data):
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            # The registry can still hold a camera another process has deleted.
+            pk = validated_data["camera"].pk
+            if pk in registry.refresh().by_id:
+                raise
+            message = self.fields["camera"].error_messages["does_not_exist"]
+            raise serializers.ValidationError(
+                {"camera": [message.format(pk_value=pk)]}
+            ) from None
+
     class Meta:
         model = MotionEvent
         fields = ['id', 'camera', 'timestamp', 'duration', 'threshold', 'created_at']
@@ -0,0 +1,9 @@
+"""
+Signals for the motions app.
+"""
+from django.dispatch import Signal
+
+# Sent with ``events`` and ``images``, lists of saved MotionEvent and Image
+# instances, after a bulk ingest. ``bulk_create`` sends no ``post_save``, so
+# receivers that react to new rows listen to both.
+motion_events_created = Signal()
@@ -1,10 +1,30 @@
+import base64
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
-from cameras.models import Camera
-from .models import MotionEvent
+from alerts.models import Alert
+from cameras.models import Camera, RetentionPolicy
+from detections.models import Detection
+from images.models import Image
+from .activity import motion_activity, roll_up_camera
+from .compaction import compact_camera
+from .history import HistoryChunk
+from .models import MotionActivityRollup, MotionEvent, MotionHistoryChunk
+from .purge import delete_camera, delete_motion_event, process_deletions, purge_camera
 from .serializers import MotionEventSerializer
 
 
@@ -111,8 +131,8 @@ class MotionEventAPITest(APITestCase):
     def test_get_motion_list(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), MotionEvent.objects.count())
-        self.assertIn(self.motion_event.pk, [item["id"] for item in response.data])
+        self.assertEqual(len(response.data["results"]), MotionEvent.objects.count())
+        self.assertIn(self.motion_event.pk, [item["id"] for item in response.data["results"]])
 
     def test_get_motion_detail(self):
         response = self.client.get(self.detail_url)
@@ -151,7 +171,10 @@ class MotionEventAPITest(APITestCase):
     def test_delete_motion_event(self):
         count_before = MotionEvent.objects.count()
         response = self.client.delete(self.detail_url)
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+        process_deletions()
         self.assertEqual(MotionEvent.objects.count(), count_before - 1)
         self.assertFalse(MotionEvent.objects.filter(pk=self.motion_event.pk).exists())
 
@@ -172,7 +195,7 @@ class MotionEventAPITest(APITestCase):
         url = reverse('motion-images', kwargs={'pk': self.motion_event.pk})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data["results"]), 0)
 
 
 class MotionEventAuthenticationAPITest(APITestCase):
@@ -223,3 +246,579 @@ class MotionEventAuthenticationAPITest(APITestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class MotionEventPaginationAPITest(APITestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.211:8080/video",
+            resolution="1920x1080",
+        )
+        self.events = [
+            MotionEvent.objects.create(camera=self.camera, duration=float(i))
+            for i in range(7)
+        ]
+        self.user = get_user_model().objects.create_user(
+            username="motion_page_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("camera-motions", kwargs={"pk": self.camera.pk})
+
+    def test_pages_walk_every_row_in_key_order(self):
+        seen = []
+        response = self.client.get(self.url, {"page_size": 3})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 3)
+            seen.extend(item["id"] for item in response.data["results"])
+            if response.data["next"] is None:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(seen, [event.id for event in self.events])
+
+    def test_cursor_polls_only_new_rows(self):
+        response = self.client.get(self.url)
+        cursor = response.data["cursor"]
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(self.url, {"cursor": cursor})
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(response.data["cursor"], cursor)
+
+        new_event = MotionEvent.objects.create(camera=self.camera, duration=9.0)
+        response = self.client.get(self.url, {"cursor": cursor})
+        self.assertEqual([item["id"] for item in response.data["results"]], [new_event.id])
+
+    def test_rows_sharing_a_timestamp_are_not_skipped(self):
+        MotionEvent.objects.filter(camera=self.camera).update(
+            timestamp=self.events[0].timestamp
+        )
+        response = self.client.get(self.url, {"page_size": 2})
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]],
+            [self.events[2].id, self.events[3].id],
+        )
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MotionEventBulkIngestAPITest(APITestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.212:8080/video",
+            resolution="1920x1080",
+        )
+        self.user = get_user_model().objects.create_user(
+            username="motion_bulk_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("motion-bulk")
+
+    def _item(self, index):
+        return {
+            "camera": self.camera.id,
+            "duration": 1.5,
+            "threshold": 0.4,
+            "detections": [{"object_class": "person", "confidence": 0.9}],
+            "images": [
+                {
+                    "filepath": f"http://example.com/images/bulk_{index}_{frame}.jpg",
+                    "filesize": 1024,
+                    "detections": [{"object_class": "car", "confidence": 0.7}],
+                }
+                for frame in range(2)
+            ],
+        }
+
+    def test_bulk_ingest_creates_nested_rows(self):
+        response = self.client.post(self.url, [self._item(0), self._item(1)], format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+
+        result = response.data["results"][1]
+        event = MotionEvent.objects.get(pk=result["id"])
+        self.assertEqual(event.camera, self.camera)
+        self.assertEqual(
+            set(Image.objects.filter(motion_event=event).values_list("pk", flat=True)),
+            set(result["images"]),
+        )
+        self.assertEqual(Detection.objects.filter(motion_event=event).count(), 3)
+        self.assertEqual(Detection.objects.filter(image_id__in=result["images"]).count(), 2)
+
+    def test_bulk_ingest_query_count_is_constant(self):
+        def count_queries(size):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(
+                    self.url, [self._item(i) for i in range(size)], format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(ctx.captured_queries)
+
+        # The first write after a camera change rebuilds the camera registry.
+        count_queries(1)
+        self.assertEqual(count_queries(2), count_queries(30))
+
+    def test_bulk_ingest_reports_per_item_errors(self):
+        bad_schema = self._item(1)
+        bad_schema["images"][0]["filepath"] = "not-a-url"
+        bad_camera = self._item(2)
+        bad_camera["camera"] = 9999
+
+        response = self.client.post(
+            self.url, [self._item(0), bad_schema, bad_camera], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, ["created", "error", "error"])
+        self.assertIn("images.0.filepath", response.data["results"][1]["errors"])
+        self.assertIn("camera", response.data["results"][2]["errors"])
+        self.assertEqual(MotionEvent.objects.filter(camera=self.camera).count(), 1)
+
+    def test_bulk_ingest_rejects_non_list_payload(self):
+        response = self.client.post(self.url, self._item(0), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_ingest_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, [self._item(0)], format="json")
+        self.assertIn(
+            response.status_code,
+            [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN],
+        )
+
+
+class CameraMotionActivityAPITest(APITestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.213:8080/video",
+            resolution="1920x1080",
+        )
+        self.base = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        for offset, duration, threshold in [
+            (timedelta(minutes=10), 1.0, 0.2),
+            (timedelta(minutes=20), 2.0, 0.4),
+            (timedelta(hours=1, minutes=5), 3.0, 0.6),
+            (timedelta(days=1, hours=2), 4.0, 0.8),
+        ]:
+            event = MotionEvent.objects.create(
+                camera=self.camera, duration=duration, threshold=threshold
+            )
+            MotionEvent.objects.filter(pk=event.pk).update(timestamp=self.base + offset)
+        self.user = get_user_model().objects.create_user(
+            username="motion_activity_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("camera-motion-activity", kwargs={"pk": self.camera.pk})
+
+    def _activity(self, bucket):
+        response = self.client.get(self.url, {
+            "bucket": bucket,
+            "start": self.base.isoformat(),
+            "end": (self.base + timedelta(days=2)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            (row["bucket_start"], row["count"], row["total_duration"],
+             round(row["mean_threshold"], 6))
+            for row in response.data["results"]
+        ]
+
+    def test_hourly_activity_from_live_events(self):
+        self.assertEqual(self._activity("hour"), [
+            ("2026-01-01T00:00:00Z", 2, 3.0, 0.3),
+            ("2026-01-01T01:00:00Z", 1, 3.0, 0.6),
+            ("2026-01-02T02:00:00Z", 1, 4.0, 0.8),
+        ])
+
+    def test_rollups_match_live_aggregation(self):
+        live = {bucket: self._activity(bucket) for bucket in ("minute", "hour", "day")}
+        written = roll_up_camera(self.camera.pk, now=self.base + timedelta(days=1, hours=3))
+        self.assertEqual(written, {"hour": 3, "day": 1})
+        for bucket, expected in live.items():
+            self.assertEqual(self._activity(bucket), expected)
+
+    def test_closed_periods_are_served_from_rollups(self):
+        roll_up_camera(self.camera.pk, now=self.base + timedelta(days=1, hours=3))
+        MotionEvent.objects.filter(camera=self.camera).delete()
+        self.assertEqual(self._activity("day"), [
+            ("2026-01-01T00:00:00Z", 3, 6.0, 0.4),
+            ("2026-01-02T00:00:00Z", 1, 4.0, 0.8),
+        ])
+
+    def test_ranges_ending_mid_bucket_match_live_aggregation(self):
+        end = self.base + timedelta(minutes=15)
+        buckets = ("hour", "day")
+        live = [motion_activity(self.camera.pk, bucket, self.base, end) for bucket in buckets]
+        roll_up_camera(self.camera.pk, now=self.base + timedelta(days=1, hours=3))
+        rolled = [motion_activity(self.camera.pk, bucket, self.base, end) for bucket in buckets]
+        self.assertEqual(rolled, live)
+        self.assertEqual([rows[0]["count"] for rows in rolled], [1, 1])
+
+    def test_rollup_is_incremental(self):
+        now = self.base + timedelta(days=1, hours=3)
+        roll_up_camera(self.camera.pk, now=now)
+        self.assertEqual(roll_up_camera(self.camera.pk, now=now), {})
+        self.assertEqual(MotionActivityRollup.objects.filter(camera=self.camera).count(), 4)
+
+    def test_updates_correct_closed_rollups(self):
+        roll_up_camera(self.camera.pk, now=self.base + timedelta(days=1, hours=3))
+        other = Camera.objects.create(
+            address="http://192.168.1.214:8080/video", resolution="1920x1080"
+        )
+        roll_up_camera(other.pk, now=self.base + timedelta(days=1, hours=3))
+        first, second = MotionEvent.objects.filter(camera=self.camera).order_by("timestamp")[:2]
+        url = reverse("motion-detail", kwargs={"pk": first.pk})
+        response = self.client.put(
+            url, {"camera": self.camera.pk, "duration": 5.0, "threshold": 0.2}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        url = reverse("motion-detail", kwargs={"pk": second.pk})
+        response = self.client.put(
+            url, {"camera": other.pk, "duration": 2.0, "threshold": 0.4}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self._activity("hour"), [
+            ("2026-01-01T00:00:00Z", 1, 5.0, 0.2),
+            ("2026-01-01T01:00:00Z", 1, 3.0, 0.6),
+            ("2026-01-02T02:00:00Z", 1, 4.0, 0.8),
+        ])
+        self.assertEqual(self._activity("day")[0], ("2026-01-01T00:00:00Z", 2, 8.0, 0.4))
+        activity = motion_activity(other.pk, "hour", self.base, self.base + timedelta(days=1))
+        self.assertEqual([row["count"] for row in activity], [1])
+
+    def test_deletions_are_taken_out_of_closed_rollups(self):
+        roll_up_camera(self.camera.pk, now=self.base + timedelta(days=1, hours=3))
+        event = MotionEvent.objects.filter(camera=self.camera).order_by("timestamp").first()
+        for _ in range(2):
+            response = self.client.delete(reverse("motion-detail", kwargs={"pk": event.pk}))
+        expected = [
+            ("2026-01-01T00:00:00Z", 1, 2.0, 0.4),
+            ("2026-01-01T01:00:00Z", 1, 3.0, 0.6),
+            ("2026-01-02T02:00:00Z", 1, 4.0, 0.8),
+        ]
+        self.assertEqual(self._activity("hour"), expected)
+        process_deletions()
+        roll_up_camera(self.camera.pk, now=self.base + timedelta(days=2))
+        self.assertEqual(self._activity("hour"), expected)
+
+        last = MotionEvent.objects.filter(camera=self.camera).order_by("timestamp").last()
+        self.client.delete(reverse("motion-detail", kwargs={"pk": last.pk}))
+        self.assertEqual(self._activity("day"), [("2026-01-01T00:00:00Z", 2, 5.0, 0.5)])
+
+    def test_invalid_bucket_is_rejected(self):
+        response = self.client.get(self.url, {"bucket": "week"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MotionHistoryPurgeTest(TestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.235:8080/video",
+            resolution="1920x1080",
+        )
+        self.old_time = datetime(2026, 1, 1, 12, 30, tzinfo=dt_timezone.utc)
+        self.now = self.old_time + timedelta(days=40)
+        self.old_events = []
+        for index in range(5):
+            event = MotionEvent.objects.create(camera=self.camera, duration=1.0)
+            image = Image.objects.create(
+                motion_event=event,
+                filepath=f"http://example.com/images/purge_{index}.jpg",
+            )
+            detection = Detection.objects.create(
+                motion_event=event, image=image, object_class="dog", confidence=0.5
+            )
+            Alert.objects.create(detection=detection, message="dog")
+            self.old_events.append(event)
+        MotionEvent.objects.filter(pk__in=[e.pk for e in self.old_events]).update(
+            timestamp=self.old_time
+        )
+        self.new_event = MotionEvent.objects.create(camera=self.camera, duration=1.0)
+        MotionEvent.objects.filter(pk=self.new_event.pk).update(timestamp=self.now)
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+
+    def test_purge_removes_expired_history_bottom_up(self):
+        totals, archives = purge_camera(self.camera.id, 30, chunk_size=2, now=self.now)
+        self.assertEqual(
+            totals, {"alerts": 5, "detections": 5, "images": 5, "motion_events": 5}
+        )
+        self.assertEqual(archives, [])
+        self.assertEqual(
+            list(MotionEvent.objects.filter(camera=self.camera).values_list("pk", flat=True)),
+            [self.new_event.pk],
+        )
+        self.assertFalse(Image.objects.filter(filepath__contains="/purge_").exists())
+
+    def test_purged_periods_stay_in_activity_rollups(self):
+        purge_camera(self.camera.id, 30, now=self.now)
+        day = self.old_time.replace(hour=0, minute=30)
+        activity = motion_activity(self.camera.id, "day", day, day + timedelta(days=1))
+        self.assertEqual(activity[0]["count"], 5)
+
+    def test_archives_are_written_before_deletion(self):
+        _, archives = purge_camera(
+            self.camera.id, 30, archive_dir=self.archive_dir, chunk_size=3, now=self.now
+        )
+        self.assertEqual(len(archives), 2)
+        models = []
+        for path in archives:
+            self.assertTrue(path.endswith(".ndjson.gz"))
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                models.extend(json.loads(line)["model"] for line in handle)
+        self.assertEqual(models.count("motion_events"), 5)
+        self.assertEqual(models.count("alerts"), 5)
+        names = os.listdir(os.path.dirname(archives[0]))
+        self.assertFalse([name for name in names if name.endswith(".partial")])
+
+    def test_interrupted_purge_resumes(self):
+        totals, _ = purge_camera(self.camera.id, 30, chunk_size=2, max_chunks=1, now=self.now)
+        self.assertEqual(totals["motion_events"], 2)
+        totals, _ = purge_camera(self.camera.id, 30, chunk_size=2, now=self.now)
+        self.assertEqual(totals["motion_events"], 3)
+
+    def test_command_applies_camera_policies(self):
+        RetentionPolicy.objects.create(camera=self.camera, keep_days=30, archive=True)
+        MotionEvent.objects.filter(pk=self.new_event.pk).update(
+            timestamp=datetime.now(dt_timezone.utc)
+        )
+        out = StringIO()
+        with override_settings(RETENTION={"ARCHIVE_DIR": self.archive_dir}):
+            call_command("purge_history", "--camera", str(self.camera.id), stdout=out)
+        self.assertIn("5 motion_events", out.getvalue())
+        self.assertTrue(os.listdir(os.path.join(self.archive_dir, f"camera-{self.camera.id}")))
+
+
+
+@override_settings(MOTION_HISTORY={"ENABLED": True, "COMPACT_AFTER_DAYS": 7})
+class MotionHistoryCompactionTest(APITestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.241:8080/video",
+            resolution="1920x1080",
+        )
+        self.other = Camera.objects.create(
+            address="http://192.168.1.242:8080/video",
+            resolution="1920x1080",
+        )
+        self.base = datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+        self.now = self.base + timedelta(days=30)
+        for index in range(12):
+            camera = self.camera if index % 3 else self.other
+            event = MotionEvent.objects.create(
+                camera=camera, duration=index / 7, threshold=0.25 + index % 2 / 10
+            )
+            # Two days, with a timestamp shared by two events of each camera.
+            offset = timedelta(days=index // 6, minutes=min(index % 6, 4) * 37)
+            MotionEvent.objects.filter(pk=event.pk).update(timestamp=self.base + offset)
+        self.with_image = MotionEvent.objects.filter(camera=self.camera).first()
+        Image.objects.create(
+            motion_event=self.with_image, filepath="http://example.com/images/kept.jpg"
+        )
+        self.recent = MotionEvent.objects.create(camera=self.camera, duration=9.0)
+        MotionEvent.objects.filter(pk=self.recent.pk).update(timestamp=self.now)
+        self.user = get_user_model().objects.create_user(
+            username="motion_history_user",
+            password="test-pass-123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _walk(self, url, params=None):
+        rows, params = [], {"page_size": 3, **(params or {})}
+        while True:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            rows.extend(response.json()["results"])
+            if not response.data["next"]:
+                return rows
+            params["cursor"] = response.data["cursor"]
+
+    def _walks(self):
+        camera_url = reverse("camera-motions", kwargs={"pk": self.camera.pk})
+        return [
+            self._walk(reverse("motion-list")),
+            self._walk(reverse("motion-list"), {"camera": self.other.pk}),
+            self._walk(reverse("motion-list"), {"threshold": 0.35}),
+            self._walk(camera_url),
+            self._walk(camera_url, {"timestamp": (self.base + timedelta(minutes=148)).isoformat()}),
+        ]
+
+    def test_chunk_encoding_round_trips_exactly(self):
+        rows = list(MotionEvent.objects.filter(camera=self.camera).values(
+            "id", "camera", "timestamp", "duration", "threshold", "created_at"
+        ))
+        chunk = HistoryChunk.from_rows(self.camera.pk, rows).to_chunk(self.base)
+        decoded = HistoryChunk.decode(chunk).rows()
+        self.assertEqual(decoded, sorted(rows, key=lambda row: (row["timestamp"], row["id"])))
+        self.assertEqual(
+            (chunk.count, chunk.first_timestamp), (len(rows), decoded[0]["timestamp"])
+        )
+
+    def test_compaction_moves_sealed_events_without_children(self):
+        totals = compact_camera(self.camera.pk, now=self.now)
+        self.assertEqual(totals, {"days": 2, "motion_events": 7})
+        self.assertEqual(
+            set(MotionEvent.objects.filter(camera=self.camera).values_list("pk", flat=True)),
+            {self.with_image.pk, self.recent.pk},
+        )
+        self.assertEqual(
+            list(MotionHistoryChunk.objects.values_list("camera_id", "count")),
+            [(self.camera.pk, 3), (self.camera.pk, 4)],
+        )
+
+    def test_lists_read_compacted_events_transparently(self):
+        before = self._walks()
+        for camera in (self.camera, self.other):
+            compact_camera(camera.pk, now=self.now)
+        remaining = MotionEvent.objects.filter(camera__in=[self.camera, self.other])
+        self.assertEqual(remaining.count(), 2)
+        self.assertEqual(self._walks(), before)
+
+    def test_small_pages_over_interleaved_chunks_keep_every_event(self):
+        for index in range(40):
+            # Five days; each day, one camera's events fall between the other's.
+            camera = self.camera if index % 8 in (1, 2, 3, 4) else self.other
+            event = MotionEvent.objects.create(camera=camera, duration=index / 3)
+            offset = timedelta(days=2 + index // 8, minutes=index % 8 * 10)
+            MotionEvent.objects.filter(pk=event.pk).update(timestamp=self.base + offset)
+            if index % 7 == 0:
+                Image.objects.create(
+                    motion_event=event, filepath=f"http://example.com/images/live_{index}.jpg"
+                )
+        before = [row["id"] for row in self._walk(reverse("motion-list"), {"page_size": 4})]
+        for camera in (self.camera, self.other):
+            compact_camera(camera.pk, now=self.now)
+        self.assertGreater(MotionHistoryChunk.objects.count(), 2)
+        after = [row["id"] for row in self._walk(reverse("motion-list"), {"page_size": 4})]
+        self.assertEqual(after, before)
+
+    def test_naive_cursors_read_compacted_events(self):
+        raw = json.dumps([(self.base + timedelta(minutes=40)).replace(tzinfo=None).isoformat(), 0])
+        cursor = base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii").rstrip("=")
+        params = {"cursor": cursor, "page_size": 5}
+        before = self.client.get(reverse("motion-list"), params).json()["results"]
+        for camera in (self.camera, self.other):
+            compact_camera(camera.pk, now=self.now)
+        response = self.client.get(reverse("motion-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], before)
+
+    def test_detail_serves_compacted_events(self):
+        event = MotionEvent.objects.filter(camera=self.other).last()
+        url = reverse("motion-detail", kwargs={"pk": event.pk})
+        expected = self.client.get(url).json()
+        compact_camera(self.other.pk, now=self.now)
+        self.assertFalse(MotionEvent.objects.filter(pk=event.pk).exists())
+        self.assertEqual(self.client.get(url).json(), expected)
+        response = self.client.get(reverse("motion-detail", kwargs={"pk": 999999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_recompaction_merges_into_the_day_chunk(self):
+        compact_camera(self.camera.pk, now=self.now)
+        Image.objects.filter(motion_event=self.with_image).delete()
+        totals = compact_camera(self.camera.pk, now=self.now)
+        self.assertEqual(totals["motion_events"], 1)
+        self.assertEqual(
+            sorted(MotionHistoryChunk.objects.values_list("count", flat=True)), [4, 4]
+        )
+
+    def test_minute_activity_includes_compacted_events(self):
+        end = self.base + timedelta(days=2)
+        before = motion_activity(self.camera.pk, "minute", self.base, end)
+        compact_camera(self.camera.pk, now=self.now)
+        self.assertEqual(motion_activity(self.camera.pk, "minute", self.base, end), before)
+
+    def test_purge_removes_expired_chunks(self):
+        compact_camera(self.camera.pk, now=self.now)
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+        totals, archives = purge_camera(
+            self.camera.pk, 10, archive_dir=archive_dir, now=self.now
+        )
+        self.assertEqual(totals["motion_events"], 8)
+        self.assertFalse(MotionHistoryChunk.objects.exists())
+        with gzip.open(archives[-1], "rt", encoding="utf-8") as handle:
+            self.assertEqual(len(handle.readlines()), 4)
+
+    def test_command_requires_the_store_to_be_enabled(self):
+        with override_settings(MOTION_HISTORY={"ENABLED": False}):
+            with self.assertRaises(CommandError):
+                call_command("compact_motion_history", stdout=StringIO())
+        out = StringIO()
+        call_command("compact_motion_history", "--camera", str(self.other.pk), stdout=out)
+        self.assertIn("compacted 4 motion events of 2 days", out.getvalue())
+
+
+class DeferredDeletionTest(TestCase):
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            address="http://192.168.1.236:8080/video",
+            resolution="1920x1080",
+        )
+        RetentionPolicy.objects.create(camera=self.camera, keep_days=7)
+        self.events = []
+        for index in range(3):
+            event = MotionEvent.objects.create(camera=self.camera, duration=1.0)
+            for frame in range(2):
+                image = Image.objects.create(
+                    motion_event=event,
+                    filepath=f"http://example.com/images/deferred_{index}_{frame}.jpg",
+                )
+                detection = Detection.objects.create(
+                    motion_event=event, image=image, object_class="dog", confidence=0.5
+                )
+                Alert.objects.create(detection=detection, message="dog")
+            self.events.append(event)
+        roll_up_camera(self.camera.id)
+
+    def test_delete_motion_event_in_image_chunks(self):
+        event = self.events[0]
+        totals = delete_motion_event(event.pk, chunk_size=1)
+        self.assertEqual(
+            totals, {"alerts": 2, "detections": 2, "images": 2, "motion_events": 1}
+        )
+        self.assertFalse(MotionEvent.objects.filter(pk=event.pk).exists())
+        self.assertEqual(Image.objects.filter(motion_event__camera=self.camera).count(), 4)
+
+    def test_delete_camera_removes_every_dependent(self):
+        totals = delete_camera(self.camera.id, chunk_size=2)
+        self.assertEqual(totals["motion_events"], 3)
+        self.assertEqual(totals["alerts"], 6)
+        self.assertEqual(totals["cameras"], 1)
+        self.assertFalse(Camera.objects.filter(pk=self.camera.pk).exists())
+        self.assertFalse(RetentionPolicy.objects.filter(camera_id=self.camera.pk).exists())
+        self.assertFalse(MotionActivityRollup.objects.filter(camera_id=self.camera.pk).exists())
+        self.assertFalse(Image.objects.filter(filepath__contains="/deferred_").exists())
+
+    def test_marked_rows_are_hidden_until_processed(self):
+        user = get_user_model().objects.create_user(username="deleter", password="test-pass-123")
+        self.client.force_login(user)
+        event = self.events[0]
+        response = self.client.delete(reverse("motion-detail", kwargs={"pk": event.pk}))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(MotionEvent.objects.filter(pk=event.pk, deleting=True).exists())
+        self.assertFalse(MotionEvent.objects.visible().filter(pk=event.pk).exists())
+        self.assertEqual(
+            Image.objects.visible().filter(motion_event__camera=self.camera).count(), 4
+        )
+
+        Camera.objects.filter(pk=self.camera.pk).update(deleting=True)
+        self.assertFalse(MotionEvent.objects.visible().filter(camera=self.camera).exists())
+
+        out = StringIO()
+        call_command("process_deletions", "--chunk-size", "1", stdout=out)
+        self.assertIn("1 cameras", out.getvalue())
+        self.assertFalse(MotionEvent.objects.filter(camera_id=self.camera.pk).exists())
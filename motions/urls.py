@@ -3,6 +3,15 @@ from . import views
 
 urlpatterns = [
     path('', views.MotionEventList.as_view(), name='motion-list'),
+    path('bulk/', views.MotionEventBulkIngest.as_view(), name='motion-bulk'),
     path('<int:pk>/', views.MotionEventDetail.as_view(), name='motion-detail'),
     path('<int:pk>/images/', views.MotionEventImagesList.as_view(), name='motion-images'),
 ]
+
+async_urlpatterns = [
+    path('', views.AsyncMotionEventList.as_view(), name='async-motion-list'),
+    path('<int:pk>/', views.AsyncMotionEventDetail.as_view(), name='async-motion-detail'),
+    path(
+        '<int:pk>/images/', views.AsyncMotionEventImagesList.as_view(), name='async-motion-images'
+    ),
+]
@@ -1,48 +1,124 @@
 """Views for the motions app."""
+from django.db import transaction
 from rest_framework import generics
 from rest_framework import permissions
 from django_filters.rest_framework import DjangoFilterBackend
 
+from eyesedge.async_views import AsyncDetailView, AsyncListCreateView
+from eyesedge.bulk import BulkIngestView
+from eyesedge.cache import CachedResponseMixin
+from eyesedge.conditional import ConditionalGetMixin
+from eyesedge.fastpath import FastListMixin
+from eyesedge.deletion import DeferredDestroyMixin
+from eyesedge.pagination import CreatedAtKeysetPagination, TimestampKeysetPagination
+
 from images.models import Image
 from images.serializers import ImageSerializer
 
+from .activity import adjust_rollups
+from .history import MotionHistoryDetailMixin, MotionHistoryListMixin
+from .ingest import ingest_batch
 from .models import MotionEvent
 from .serializers import MotionEventSerializer
 
 
-class MotionEventList(generics.ListCreateAPIView):
+class MotionEventList(
+    ConditionalGetMixin, CachedResponseMixin, MotionHistoryListMixin, FastListMixin,
+    generics.ListCreateAPIView,
+):
     """
     GET: List all motion events
     POST: Create a new motion event
     """
-    queryset = MotionEvent.objects.all()
+    cache_resources = ("motion",)
+    queryset = MotionEvent.objects.visible()
     serializer_class = MotionEventSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimestampKeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["id", "camera", "duration", "threshold", "timestamp", "created_at"]
 
 
-class MotionEventDetail(generics.RetrieveUpdateDestroyAPIView):
+class MotionEventBulkIngest(BulkIngestView):
+    """
+    POST: Create a batch of motion events with nested images and detections
+    """
+    ingest = staticmethod(ingest_batch)
+    expected_message = "Expected a list of motion events."
+
+
+class MotionEventDetail(
+    DeferredDestroyMixin, ConditionalGetMixin, CachedResponseMixin, MotionHistoryDetailMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     """
     GET: Retrieve a specific motion event
     PUT: Update a motion event
-    DELETE: Delete a motion event
+    DELETE: Mark a motion event for deletion; it is removed in the background
     """
-    queryset = MotionEvent.objects.all()
+    cache_resources = ("motion",)
+    deferred_delete_resources = ("motion", "image", "detection")
+    queryset = MotionEvent.objects.visible()
     serializer_class = MotionEventSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def mark_for_deletion(self, instance):
+        """Mark the event and take it out of the activity rollups that count it."""
+        with transaction.atomic():
+            marked = super().mark_for_deletion(instance)
+            if marked:
+                adjust_rollups([instance], -1)
+        return marked
+
 
-class MotionEventImagesList(generics.ListAPIView):
+class MotionEventImagesList(
+    ConditionalGetMixin, CachedResponseMixin, FastListMixin, generics.ListAPIView
+):
     """
     GET: List all images for a specific motion event
     """
+    cache_resources = ("image", "motion")
     serializer_class = ImageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["id", "filepath", "filesize", "created_at", "motion_event"]
 
     def get_queryset(self):
         """Return images filtered by the motion event ID from URL."""
         motion_id = self.kwargs['pk']
-        return Image.objects.filter(motion_event_id=motion_id)
+        return Image.objects.visible().filter(motion_event_id=motion_id)
+
+
+class AsyncMotionEventList(AsyncListCreateView):
+    """
+    GET: List all motion events, without filters
+    POST: Create a new motion event
+    """
+    serializer_class = MotionEventSerializer
+    pagination_class = TimestampKeysetPagination
+    allow_create = True
+
+    def get_queryset(self):
+        return MotionEvent.objects.visible()
+
+
+class AsyncMotionEventDetail(AsyncDetailView):
+    """
+    GET: Retrieve a specific motion event
+    """
+    serializer_class = MotionEventSerializer
+
+    def get_queryset(self):
+        return MotionEvent.objects.visible()
+
+
+class AsyncMotionEventImagesList(AsyncListCreateView):
+    """
+    GET: List all images for a specific motion event, without filters
+    """
+    serializer_class = ImageSerializer
+    pagination_class = CreatedAtKeysetPagination
+
+    def get_queryset(self):
+        return Image.objects.visible().filter(motion_event_id=self.kwargs["pk"])